@@ -6,28 +6,49 @@ import plotly.express as px
 from datetime import datetime
 # Robust imports: prefer split packages, fallback to monolithic langchain if unavailable
 try:
-    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+    from langchain_openai import ChatOpenAI
 except Exception:
     st.error("Missing dependency: langchain-openai. Ensure requirements.txt installs langchain-openai on Streamlit Cloud.")
     st.stop()
+import logging
 import os
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
 import re
-try:
-    import docx  # python-docx package provides this module
-    DOCX_AVAILABLE = True
-except Exception:
-    DOCX_AVAILABLE = False
+import time
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+except ImportError:
+    add_script_run_ctx = None
+
+from legal_engine.answer_cache import answer_scope, document_records, get_answer_cache, records_to_documents
+from legal_engine.bm25 import BM25Index
+from legal_engine.chunking import StructuredChunker, describe_location
+from legal_engine.corpus_index import CorpusIndex
+from legal_engine.embedding_cache import get_embedding_cache
+from legal_engine.extraction_cache import get_extraction_cache
+from legal_engine.hybrid import embed_query, embedding_model, make_retriever
+from legal_engine.incremental import DocumentRegistry
+from legal_engine.keywords import COMPARISON_TOPICS, RISK_KEYWORDS, get_keyword_matcher
+from legal_engine.pipeline import IngestPipeline
+from legal_engine.prebuilt import load_corpus_index, read_manifest
+from legal_engine.providers import embeddings_for_model, make_embeddings
+from legal_engine.query_cache import get_query_cache, new_index_version
+from legal_engine.streaming import stream_answer
+from legal_engine.text_store import get_text_store
+from legal_engine.uploads import UploadBuffer
+from legal_engine.warmup import cancel_warmup, restart_warmup
+
 FAISS_AVAILABLE = True
 try:
     from langchain_community.vectorstores import FAISS
 except Exception:
     FAISS_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 
 # Vibrant Gradient UI/UX CSS and button animations
 st.markdown("""
@@ -227,42 +248,18 @@ class CitationExtractor:
         return citations
 
 # --------- Fallback retriever when FAISS is unavailable ---------
-class SimpleRetriever:
-    def __init__(self, texts):
-        self.texts = texts or []
-    def get_relevant_documents(self, query, k=4):
-        q = (query or "").lower()
-        # simple scoring by count of query words present
-        words = [w for w in re.findall(r"[A-Za-z0-9]+", q) if len(w) > 2]
-        scored = []
-        for t in self.texts:
-            tl = t.lower()
-            score = sum(1 for w in words if w in tl)
-            scored.append((score, t))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = [type("Doc", (), {"page_content": s[1]}) for s in scored[:k]]
-        return top
-
 # ==================== FEATURE 2: MULTI-DOCUMENT COMPARISON ====================
 class DocumentComparator:
-    def analyze_risk_level(self, text):
-        """Analyze risk level based on keywords in text"""
-        # Define risk keywords
-        risk_keywords = {
-            'high': ['fraud', 'criminal', 'penalty', 'termination', 'illegal', 'breach', 'void', 'forfeit', 'liability'],
-            'medium': ['dispute', 'arbitration', 'notice', 'delay', 'amendment', 'compliance', 'audit', 'review'],
-            'low': ['agreement', 'party', 'payment', 'service', 'duration', 'jurisdiction', 'clause', 'contract']
-        }
-        text_lower = text.lower()
-        risk_scores = {
-            'high': 0,
-            'medium': 0,
-            'low': 0
-        }
-        for level, keywords in risk_keywords.items():
-            for keyword in keywords:
-                count = text_lower.count(keyword)
-                risk_scores[level] += count
+    @staticmethod
+    def risk_counts(text):
+        """{level: risk keyword occurrences}, every keyword located in one pass over the text"""
+        matcher = get_keyword_matcher()
+        found = matcher.scan(text)
+        return {level: sum(matcher.counts(found, f"risk_{level}").values()) for level in RISK_KEYWORDS}
+
+    def analyze_risk_level(self, text, risk_scores=None):
+        """Analyze risk level based on keywords in text (`risk_scores`: its per-level counts, if already taken)"""
+        risk_scores = self.risk_counts(text) if risk_scores is None else risk_scores
         total_risks = sum(risk_scores.values())
         if total_risks == 0:
             return 'low', risk_scores
@@ -279,18 +276,19 @@ class DocumentComparator:
         return overall, risk_scores
     """Compare multiple documents and find similarities/differences"""
     
-    def __init__(self, embeddings):
+    def __init__(self, embeddings, index=None):
         self.embeddings = embeddings
-        self.vector_stores = {}
+        # One shared index for every document; each owns a row range
+        self.index = index if index is not None else CorpusIndex(embeddings)
     
-    def add_document(self, doc_id, text_chunks):
+    def add_document(self, doc_id, text_chunks, metadatas=None):
         """Add a document to comparison pool"""
-        self.vector_stores[doc_id] = FAISS.from_texts(text_chunks, self.embeddings)
+        self.index.add_document(doc_id, text_chunks, metadatas)
     
-    def compare_documents(self, query_topics):
-        """Compare documents across specific topics (placeholder logic)"""
-        # This method can be expanded to use retrievers per document.
-        return {topic: [] for topic in query_topics}
+    def compare_documents(self, query_topics, doc_ids=None, k=1):
+        """Best passages per (topic, document): {topic: {doc_id: [{text, similarity, start, end, ...}]}}"""
+        # All topics are embedded in one batch and scored against every document in one matmul
+        return self.index.search_grid(query_topics, k, doc_ids)
     
     def extract_key_entities(self, text):
         """Extract key entities (dates, amounts, parties)"""
@@ -391,17 +389,158 @@ class DocumentComparator:
 # Initialize session state
 if 'vector_store' not in st.session_state:
     st.session_state.vector_store = None
+if 'lexical_index' not in st.session_state:
+    st.session_state.lexical_index = None
+if 'index_version' not in st.session_state:
+    st.session_state.index_version = None
+if 'corpus_version' not in st.session_state:
+    st.session_state.corpus_version = None
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 if 'docs_processed' not in st.session_state:
     st.session_state.docs_processed = False
 if 'all_documents' not in st.session_state:
     st.session_state.all_documents = {}
+if 'risk_counts' not in st.session_state:
+    # content hash -> risk keyword counts, so a sync only scans new or changed documents
+    st.session_state.risk_counts = {}
 if 'citations' not in st.session_state:
     st.session_state.citations = None
 if 'analytics' not in st.session_state:
     st.session_state.analytics = None
 
+@st.cache_resource
+def load_statute_library():
+    """Memory-map the prebuilt data/ statute index once per server process"""
+    try:
+        api_key = st.secrets.get("OPENAI_API_KEY")
+    except Exception:
+        api_key = None
+    if not api_key:
+        load_dotenv()
+        api_key = os.getenv("OPENAI_API_KEY")
+    try:
+        # A corrupt or partially written manifest must not take the app down
+        manifest = read_manifest()
+        if manifest is None or not FAISS_AVAILABLE:
+            return None
+        # A library built with local embeddings loads without any key
+        embeddings = embeddings_for_model(manifest["embedding_model"], manifest.get("dimension"), api_key=api_key)
+        if embeddings is None:
+            return None
+        return load_corpus_index(embeddings)
+    except Exception as e:
+        logger.warning("Statute library unavailable: %s", e)
+        return None
+
+# Cold sessions can query the bundled statutes with zero ingest time
+statute_library = load_statute_library()
+if statute_library and st.session_state.vector_store is None:
+    st.session_state.vector_store = statute_library["vector_store"]
+    st.session_state.lexical_index = statute_library["lexical"]
+    # Shared by every session on the library, so cached answers carry across sessions
+    st.session_state.index_version = f"statutes-{statute_library['manifest']['corpus_version']}"
+    st.session_state.corpus_version = statute_library["manifest"]["corpus_version"]
+    st.session_state.docs_processed = True
+    st.session_state.knowledge_base = "statutes"
+
+# Canned chat questions (quick buttons and suggested prompts), answered in the background once indexed
+QUICK_QUESTIONS = [
+    ("📋 Summarize", "sum_btn", "Summarize the key legal points"),
+    ("⚠️ Risks", "risk_btn", "What are the main risks?"),
+    ("✅ Compliance", "comp_btn", "Check compliance requirements"),
+    ("🎯 Citations", "cite_btn", "List all legal citations mentioned"),
+]
+SUGGESTED_PROMPTS = [
+    "Extract termination clause and summarize",
+    "List payment terms with due dates",
+    "Identify high-risk clauses and explain",
+    "Show citations (IPC/Articles/Cases)"
+]
+
+def retrieve_sources(question, vector_store, lexical_index, index_version, budget_ms, k=4):
+    """Source Documents for a question; safe to run off the script thread"""
+    # BM25 + FAISS fused by rank, or the BM25 fallback index alone
+    retriever = make_retriever(vector_store, lexical_index, k=k, budget_ms=budget_ms,
+                               cache=get_query_cache(), index_version=index_version)
+    return retriever.get_relevant_documents(question)
+
+def chat_prompt(question, docs):
+    context = "\n\n".join([d.page_content for d in docs])
+    return (
+        "You are a legal assistant. Use the provided context to answer the user's question.\n"
+        "If the answer is not in the context, say you are unsure.\n\n"
+        f"Context:\n{context}\n\nQuestion: {question}\nAnswer:"
+    )
+
+def search_prompt(query, docs):
+    context = "\n\n".join([d.page_content for d in docs])
+    return (
+        "You are a legal assistant. Use the provided context to answer the user's query succinctly.\n"
+        "Cite relevant sections if present. If unsure, say so.\n\n"
+        f"Context:\n{context}\n\nQuery: {query}\nAnswer:"
+    )
+
+def chat_answer(question, vector_store, lexical_index, index_version, model, budget_ms):
+    """(answer, source Documents) for a Legal Chat question; safe to run off the script thread"""
+    docs = retrieve_sources(question, vector_store, lexical_index, index_version, budget_ms)
+    return ChatOpenAI(model=model, temperature=0.1).invoke(chat_prompt(question, docs)).content, docs
+
+def show_sources(docs, divider=False):
+    with st.expander("📚 Source Documents"):
+        for idx, doc in enumerate(docs, 1):
+            st.markdown(f"**Source {idx}:** {describe_location(getattr(doc, 'metadata', None))}")
+            st.text(doc.page_content[:300] + "...")
+            if divider:
+                st.divider()
+
+def stream_into_page(model, prompt, started):
+    """Generate with token streaming, rendering the partial answer in place; returns (answer, timings)"""
+    answer_area = st.empty()
+    answer_area.caption("🤔 Writing the answer...")
+    answer, timings = stream_answer(ChatOpenAI(model=model, temperature=0.1, streaming=True), prompt,
+                                    on_text=lambda partial: answer_area.markdown(partial + "▌"),
+                                    started=started)
+    answer_area.markdown(answer)
+    return answer, timings
+
+def warm_up_answers():
+    """Answer the canned chat questions in the background, once per corpus.
+
+    Starts when a corpus becomes ready in the session and an OpenAI key is
+    set, with the model and language of that moment; reruns and setting
+    changes leave the job alone, so they never start another LLM batch. A new
+    corpus cancels it and starts another. Returns the session's job, if any.
+    """
+    if not st.session_state.docs_processed or st.session_state.vector_store is None:
+        return None
+    try:
+        api_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
+    except Exception:
+        api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    corpus_version = st.session_state.corpus_version
+    job = st.session_state.get("warmup")
+    if job is not None and not job.cancelled.is_set() and st.session_state.get("warmup_corpus") == corpus_version:
+        return job
+    model = st.session_state.get("model_select", "gpt-4o-mini")
+    language = st.session_state.get("lang_select", "English")
+    # Captured now: the worker threads cannot read session state
+    store = st.session_state.vector_store
+    lexical = st.session_state.lexical_index
+    index_version = st.session_state.index_version
+    budget_ms = st.session_state.get("budget_slider", 1500)
+    st.session_state.warmup_corpus = corpus_version
+    st.session_state.warmup = restart_warmup(
+        job,
+        answer_scope(corpus_version, model, "", language, "chat"),
+        [question for _, _, question in QUICK_QUESTIONS] + SUGGESTED_PROMPTS,
+        lambda question: chat_answer(question, store, lexical, index_version, model, budget_ms),
+        embed=lambda question: embed_query(store, question, get_query_cache())
+    )
+    return st.session_state.warmup
+
 # Header
 st.markdown("""
 <style>
@@ -545,13 +684,18 @@ with st.sidebar:
             # Fallback to local .env
             load_dotenv()
             openai_api_key = os.getenv("OPENAI_API_KEY")
-        if openai_api_key:
-            embeddings = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=openai_api_key)
+        if FAISS_AVAILABLE:
+            # Local embeddings keep the demo searchable without a key
+            embeddings = make_embeddings(api_key=openai_api_key)
             st.session_state.vector_store = FAISS.from_texts(chunks, embedding=embeddings)
+            st.session_state.lexical_index = BM25Index.from_vector_store(st.session_state.vector_store)
+            st.session_state.index_version = new_index_version(st.session_state.index_version)
         else:
-            # Fallback minimal store to allow UI demo without embeddings
-            st.session_state.vector_store = None
+            # Lexical BM25 retrieval keeps the demo searchable without FAISS
+            st.session_state.vector_store = BM25Index.from_texts(chunks)
         st.session_state.all_documents = sample_docs
+        st.session_state.knowledge_base = "demo"
+        st.session_state.corpus_version = "demo"
         citation_extractor = CitationExtractor()
         citations = citation_extractor.extract_all_citations(all_text)
         analytics_engine = DocumentComparator(None)
@@ -561,8 +705,7 @@ with st.sidebar:
         st.session_state.analytics = {
             'risk_level': risk_level,
             'risk_scores': risk_scores,
-            'entities': entities,
-            'full_text': all_text
+            'entities': entities
         }
         st.session_state.docs_processed = True
         st.session_state.demo_initialized = True
@@ -574,11 +717,17 @@ with st.sidebar:
     st.markdown("### Settings")
     model = st.selectbox("Model:", ["gpt-4o-mini", "gpt-3.5-turbo"], key="model_select")
     language = st.selectbox("Language:", ["English", "Hindi", "Spanish"], key="lang_select")
+    retrieval_budget_ms = st.slider("Retrieval budget (ms):", 100, 5000, 1500, 100, key="budget_slider",
+                                    help="Keyword results are used alone if semantic search is still running")
     
     st.divider()
     
     # Status indicators
-    if st.session_state.docs_processed:
+    if st.session_state.get("knowledge_base") == "statutes":
+        manifest = statute_library["manifest"]
+        st.success("📚 Statute Library Ready")
+        st.info(f"⚖️ {len(manifest['documents'])} bundled statute(s), {manifest['chunks']} chunks")
+    elif st.session_state.docs_processed:
         st.success("✅ Documents Ready")
         st.info(f"📄 {len(st.session_state.all_documents)} document(s) loaded")
     else:
@@ -593,6 +742,18 @@ with st.sidebar:
     st.markdown("### 📈 Quick Stats")
     st.metric("Total Queries", len(st.session_state.chat_history))
     st.metric("Documents", len(st.session_state.all_documents))
+    cache_stats = get_extraction_cache().stats()
+    st.caption(f"🗄️ Extraction cache: {cache_stats['entries']} docs, "
+               f"{cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    embed_stats = get_embedding_cache().stats()
+    st.caption(f"🧠 Embedding cache: {embed_stats['entries']:,} vectors, "
+               f"{embed_stats['hit_ratio']:.0%} hit ratio")
+    query_stats = get_query_cache().stats()
+    st.caption(f"⚡ Query cache: {query_stats['hit_ratio']:.0%} hit ratio "
+               f"({query_stats['hits']:,} / {query_stats['hits'] + query_stats['misses']:,} lookups)")
+    answer_stats = get_answer_cache().stats()
+    st.caption(f"♻️ Answer cache: {answer_stats['entries']:,} answers, {answer_stats['hits']:,} reused "
+               f"({answer_stats['near_hits']:,} near-duplicates)")
 
     # API key status indicator for deployment sanity check
     try:
@@ -602,9 +763,7 @@ with st.sidebar:
     if api_key_present:
         st.success("🔑 OpenAI key detected")
     else:
-        st.warning("🔑 OpenAI key missing. Set in Secrets or .env")
-    if not DOCX_AVAILABLE:
-        st.warning("📄 python-docx not installed. DOCX processing will be skipped.")
+        st.warning("🔑 OpenAI key missing. Search uses local embeddings; set it in Secrets or .env for AI answers")
 
     # Sidebar developer footer (placed near bottom of sidebar)
     st.markdown("---")
@@ -620,6 +779,8 @@ with st.sidebar:
         except Exception:
             st.caption("Abhishek Kumar")
 
+warm_up_answers()
+
 # ==================== MODE 1: DOCUMENT ANALYSIS ====================
 if mode == "📚 Document Analysis":
     st.header("📚 Document Analysis")
@@ -664,36 +825,8 @@ if mode == "📚 Document Analysis":
         if st.button("🚀 Process Documents", key="process_btn", type="primary"):
             with st.spinner("Processing documents..."):
                 try:
-                    all_text = ""
                     progress_bar = st.progress(0)
-                    if not DOCX_AVAILABLE:
-                        st.info("DOCX support not available. Install python-docx to process .docx files.")
-                    else:
-                        from docx import Document
-                    for idx, file in enumerate(uploaded_files):
-                        doc_text = ""
-                        if file.name.lower().endswith('.pdf'):
-                            reader = PdfReader(file)
-                            for page in reader.pages:
-                                doc_text += page.extract_text() + "\n"
-                        elif file.name.lower().endswith('.docx'):
-                            doc = Document(file)
-                            for para in doc.paragraphs:
-                                doc_text += para.text + "\n"
-                        elif file.name.lower().endswith('.txt'):
-                            doc_text = file.read().decode('utf-8')
-                        # Clean text
-                        doc_text = re.sub(r'\s+', ' ', doc_text)
-                        st.session_state.all_documents[file.name] = doc_text
-                        all_text += doc_text
-                        progress_bar.progress((idx + 1) / len(uploaded_files))
-                    
-                    # Split text
-                    splitter = RecursiveCharacterTextSplitter(
-                        chunk_size=1000,
-                        chunk_overlap=100
-                    )
-                    chunks = splitter.split_text(all_text)
+                    page_status = st.empty()
                     
                     # Fetch API key from Streamlit Secrets (preferred) or .env fallback
                     openai_api_key = None
@@ -705,37 +838,118 @@ if mode == "📚 Document Analysis":
                         load_dotenv()
                         openai_api_key = os.getenv("OPENAI_API_KEY")
                     if not openai_api_key:
-                        st.error("OPENAI_API_KEY not found. Set it in Streamlit Secrets or .env.")
-                        st.stop()
-                    embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=openai_api_key)
-                    if FAISS_AVAILABLE:
-                        vector_store = FAISS.from_texts(chunks, embedding=embeddings)
+                        st.info("OPENAI_API_KEY not found. Indexing with local embeddings; AI answers need a key.")
+                    # Cached concurrent OpenAI embeddings with a key, local CPU embeddings without
+                    embeddings = make_embeddings(api_key=openai_api_key)
+                    if not FAISS_AVAILABLE:
+                        st.warning("FAISS not available. Using BM25 keyword retrieval instead.")
+                    
+                    def extract_upload(name, data):
+                        # Runs on the ingest thread; re-uploads are served from the disk cache
+                        def report_pages(done, total):
+                            page_status.caption(f"📄 {name}: page {done}/{total}")
+                        return get_extraction_cache().open_pages(name, data, progress=report_pages)
+                    
+                    # Pages are cleaned, split at Article/Section/Clause boundaries and embedded
+                    # as a stream; every chunk carries its document, page and offsets
+                    splitter = StructuredChunker(chunk_size=1000, chunk_overlap=100, joiner=" ")
+                    pipeline = IngestPipeline(
+                        embeddings if FAISS_AVAILABLE else None,
+                        splitter,
+                        clean=lambda page: re.sub(r'\s+', ' ', page),
+                        joiner=" ",
+                        extractor=extract_upload,
+                        thread_hook=add_script_run_ctx,
+                        text_store=get_text_store()
+                    )
+                    def report_ingest(stats):
+                        eta = stats["eta_seconds"]
+                        progress_bar.progress(stats["fraction"], text=(
+                            f"🧠 {stats['embedded']:,} / ~{stats['estimated_chunks']:,} chunks embedded"
+                            + (f" · ~{eta:.0f}s left" if eta is not None else "")
+                        ))
+                    
+                    # Answers being warmed up for the previous corpus are no longer wanted
+                    cancel_warmup(st.session_state.get("warmup"))
+                    # Sync the live index with the uploader: only new or changed files are
+                    # extracted and embedded, removed files are deleted by chunk ID
+                    if st.session_state.get("knowledge_base") != "uploads" or "doc_registry" not in st.session_state:
+                        st.session_state.doc_registry = DocumentRegistry()
+                        st.session_state.vector_store = None
+                    registry = st.session_state.doc_registry
+                    # Hashed, sized and parsed in place; the bytes are never copied
+                    uploads = {file.name: UploadBuffer.from_upload(file) for file in uploaded_files}
+                    current_store = st.session_state.vector_store if FAISS_AVAILABLE else None
+                    vector_store, ingest, removed = registry.sync(
+                        pipeline,
+                        uploads,
+                        current_store,
+                        progress=report_ingest
+                    )
+                    page_status.empty()
+                    for name, error in ingest["errors"]:
+                        st.warning(f"Could not process {name}: {error}")
+                    for meta in ingest["metadata"]:
+                        if meta.get("page_errors"):
+                            skipped = ", ".join(str(page) for page, _ in meta["page_errors"][:10])
+                            st.warning(f"{meta['filename']}: skipped unreadable page(s) {skipped}")
+                    ingest_stats = ingest["stats"]
+                    
+                    # Handles into the shared memory-mapped text store, not per-session copies
+                    st.session_state.all_documents = {
+                        name: ingest["documents"].get(name) or st.session_state.all_documents.get(name, "")
+                        for name in registry.documents
+                    }
+                    all_text = "".join(str(text) for text in st.session_state.all_documents.values())
+                    if not FAISS_AVAILABLE:
+                        # Lexical BM25 index over the chunks when no vector store is available
+                        vector_store = registry.fallback_index()
+                        st.session_state.lexical_index = None
                     else:
-                        st.warning("FAISS not available. Using a simple fallback retriever.")
-                        vector_store = {"fallback_texts": chunks}
+                        # BM25 side of hybrid retrieval, over exactly the chunks now in the store
+                        st.session_state.lexical_index = BM25Index.from_vector_store(vector_store)
+                        # New corpus: cached query results of the previous one no longer apply
+                        st.session_state.index_version = new_index_version(st.session_state.index_version)
                     
                     # Extract citations
                     citation_extractor = CitationExtractor()
                     citations = citation_extractor.extract_all_citations(all_text)
                     
-                    # Analyze risk
+                    # Analyze risk: unchanged documents reuse their counts, new ones are scanned once
                     analytics_engine = DocumentComparator(None)
-                    risk_level, risk_scores = analytics_engine.analyze_risk_level(all_text)
+                    risk_counts = {
+                        doc["sha256"]: st.session_state.risk_counts.get(doc["sha256"])
+                        or analytics_engine.risk_counts(str(st.session_state.all_documents[name]))
+                        for name, doc in registry.documents.items()
+                    }
+                    st.session_state.risk_counts = risk_counts
+                    risk_scores = {level: sum(counts[level] for counts in risk_counts.values()) for level in RISK_KEYWORDS}
+                    risk_level, risk_scores = analytics_engine.analyze_risk_level(all_text, risk_scores)
                     entities = analytics_engine.extract_key_entities(all_text)
                     
                     # Store in session
                     st.session_state.vector_store = vector_store
                     st.session_state.docs_processed = True
+                    st.session_state.knowledge_base = "uploads"
+                    # Content-derived, so cached answers survive restarts and re-uploads
+                    st.session_state.corpus_version = registry.corpus_version()
                     st.session_state.citations = citations
                     st.session_state.analytics = {
                         'risk_level': risk_level,
                         'risk_scores': risk_scores,
-                        'entities': entities,
-                        'full_text': all_text
+                        'entities': entities
                     }
                     
                     progress_bar.empty()
-                    st.success(f"✅ Processed {len(chunks)} text chunks!")
+                    st.success(f"✅ Processed {ingest['chunk_count']} text chunks!")
+                    warmup = warm_up_answers()
+                    if warmup is not None:
+                        st.caption(f"🔥 Preparing answers to {warmup.status()['total']} "
+                                   "suggested questions in the background")
+                    st.caption(f"🔁 {len(ingest['chunk_ids'])} document(s) added, {len(removed)} removed, "
+                               f"{registry.total_chunks()} chunks indexed in total")
+                    st.caption(f"⏱️ Ingested {ingest_stats['embedded']:,} chunks from {ingest_stats['pages']:,} pages "
+                               f"in {ingest_stats['elapsed']:.1f}s ({ingest_stats['chunks_per_second']:.1f} chunks/s)")
                     st.balloons()
 
                     # Quick action buttons
@@ -751,7 +965,7 @@ if mode == "📚 Document Analysis":
                     # Show quick summary
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("Text Chunks", len(chunks))
+                        st.metric("Text Chunks", registry.total_chunks())
                     with col2:
                         total_citations = sum(len(v) for v in citations.values())
                         st.metric("Citations Found", total_citations)
@@ -813,33 +1027,25 @@ elif mode == "💬 Legal Chat":
         st.success("✅ Ready to chat!")
         
         # Quick buttons
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            if st.button("📋 Summarize", key="sum_btn"):
-                st.session_state.user_input = "Summarize the key legal points"
-        with col2:
-            if st.button("⚠️ Risks", key="risk_btn"):
-                st.session_state.user_input = "What are the main risks?"
-        with col3:
-            if st.button("✅ Compliance", key="comp_btn"):
-                st.session_state.user_input = "Check compliance requirements"
-        with col4:
-            if st.button("🎯 Citations", key="cite_btn"):
-                st.session_state.user_input = "List all legal citations mentioned"
+        for column, (label, button_key, question) in zip(st.columns(4), QUICK_QUESTIONS):
+            with column:
+                if st.button(label, key=button_key):
+                    st.session_state.user_input = question
         
         # Chat input
         # Suggested prompts row
         sp1, sp2, sp3, sp4 = st.columns(4)
-        suggested_prompts = [
-            "Extract termination clause and summarize",
-            "List payment terms with due dates",
-            "Identify high-risk clauses and explain",
-            "Show citations (IPC/Articles/Cases)"
-        ]
-        for i, p in enumerate(suggested_prompts):
+        for i, p in enumerate(SUGGESTED_PROMPTS):
             with [sp1, sp2, sp3, sp4][i]:
                 if st.button(p, key=f"prompt_{i}"):
                     st.session_state.user_input = p
+        warmup = st.session_state.get("warmup")
+        if warmup is not None:
+            warm = warmup.status()
+            if warm["running"]:
+                st.caption(f"🔥 Preparing suggested answers: {warm['ready']}/{warm['total']} ready")
+            elif warm["ready"]:
+                st.caption(f"⚡ {warm['ready']} suggested answers ready")
         user_query = st.text_input(
             "Ask a question:",
             value=st.session_state.get('user_input', ''),
@@ -852,48 +1058,51 @@ elif mode == "💬 Legal Chat":
             del st.session_state.user_input
         
         if user_query:
-            with st.spinner("🤔 Analyzing..."):
-                try:
-                    # Create LLM
-                    llm = ChatOpenAI(model=model, temperature=0.1)
-                    # Retrieve relevant docs
-                    if hasattr(st.session_state.vector_store, "as_retriever"):
-                        retriever = st.session_state.vector_store.as_retriever(search_kwargs={"k": 4})
-                        docs = retriever.get_relevant_documents(user_query)
-                    else:
-                        texts = st.session_state.vector_store.get("fallback_texts", [])
-                        docs = SimpleRetriever(texts).get_relevant_documents(user_query, k=4)
-                    context = "\n\n".join([d.page_content for d in docs])
-                    prompt = (
-                        "You are a legal assistant. Use the provided context to answer the user's question.\n"
-                        "If the answer is not in the context, say you are unsure.\n\n"
-                        f"Context:\n{context}\n\nQuestion: {user_query}\nAnswer:"
-                    )
-                    result_text = llm.invoke(prompt).content
-                    # Display answer
-                    st.markdown("### 🤖 Answer:")
+            try:
+                started = time.perf_counter()
+                # Repeated or near-duplicate questions on the same corpus reuse the stored answer
+                answer_cache = get_answer_cache()
+                scope = answer_scope(st.session_state.corpus_version, model, "", language, "chat")
+                question_vector = embed_query(st.session_state.vector_store, user_query, get_query_cache())
+                cached = answer_cache.lookup(scope, user_query, question_vector,
+                                             model=embedding_model(st.session_state.vector_store))
+                st.markdown("### 🤖 Answer:" + (" ♻️ *cached*" if cached else ""))
+                if cached:
+                    if not cached["exact"]:
+                        st.caption(f"Reused the answer to a similar question ({cached['similarity']:.0%}): {cached['question']}")
+                    docs = records_to_documents(cached["sources"])
+                    show_sources(docs, divider=True)
+                    result_text = cached["answer"]
                     st.write(result_text)
-                    # Show sources
-                    with st.expander("📚 Source Documents"):
-                        for idx, doc in enumerate(docs, 1):
-                            st.markdown(f"**Source {idx}:**")
-                            st.text(doc.page_content[:300] + "...")
-                            st.divider()
-                    # Save to history
-                    st.session_state.chat_history.append({
-                        "time": datetime.now().strftime("%H:%M:%S"),
-                        "question": user_query,
-                        "answer": result_text
-                    })
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+                    timings = {"first_token_s": time.perf_counter() - started}
+                    timings["total_s"] = timings["first_token_s"]
+                else:
+                    with st.spinner("🤔 Analyzing..."):
+                        docs = retrieve_sources(user_query, st.session_state.vector_store, st.session_state.lexical_index,
+                                                st.session_state.index_version, retrieval_budget_ms)
+                    # Sources are shown as soon as retrieval finishes; the answer streams in below them
+                    show_sources(docs, divider=True)
+                    result_text, timings = stream_into_page(model, chat_prompt(user_query, docs), started)
+                    answer_cache.store(scope, user_query, result_text, document_records(docs), question_vector)
+                st.caption(f"⏱️ First words after {timings['first_token_s']:.2f}s, complete in {timings['total_s']:.2f}s")
+                # Save to history
+                st.session_state.chat_history.append({
+                    "time": datetime.now().strftime("%H:%M:%S"),
+                    "question": user_query,
+                    "answer": result_text,
+                    "first_token_time": timings["first_token_s"],
+                    "response_time": timings["total_s"],
+                    "cached": bool(cached)
+                })
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
         
         # Show recent chats
         if st.session_state.chat_history:
             st.divider()
             st.markdown("### 💬 Recent Conversations")
             for chat in reversed(st.session_state.chat_history[-5:]):
-                with st.expander(f"🕐 {chat['time']} - {chat['question'][:60]}..."):
+                with st.expander(f"🕐 {chat['time']} - {chat['question'][:60]}..." + (" ♻️" if chat.get("cached") else "")):
                     st.markdown(f"**Q:** {chat['question']}")
                     st.markdown(f"**A:** {chat['answer']}")
 
@@ -981,8 +1190,7 @@ elif mode == "📑 Compare Documents":
             # Comparison topics
             topics = st.multiselect(
                 "What aspects to compare?",
-                ["Termination Clause", "Payment Terms", "Confidentiality", 
-                 "Liability", "Duration", "Jurisdiction"],
+                COMPARISON_TOPICS,
                 default=["Termination Clause", "Payment Terms"]
             )
             
@@ -992,8 +1200,12 @@ elif mode == "📑 Compare Documents":
                     st.markdown("### 📊 Document Statistics")
                     
                     stats_data = []
+                    # Literal topic mentions with offsets, one keyword scan per document
+                    matcher = get_keyword_matcher()
+                    mentions = {}
                     for doc_name in selected_docs:
-                        text = st.session_state.all_documents[doc_name]
+                        text = str(st.session_state.all_documents[doc_name])
+                        mentions[doc_name] = matcher.scan(text)
                         word_count = len(text.split())
                         char_count = len(text)
                         
@@ -1012,6 +1224,27 @@ elif mode == "📑 Compare Documents":
                     df = pd.DataFrame(stats_data)
                     st.dataframe(df, use_container_width=True)
                     
+                    # Use API key from secrets/env for embeddings in comparator
+                    api_key_cmp = None
+                    try:
+                        api_key_cmp = st.secrets.get("OPENAI_API_KEY")
+                    except Exception:
+                        api_key_cmp = None
+                    if not api_key_cmp:
+                        api_key_cmp = os.getenv("OPENAI_API_KEY")
+                    store = st.session_state.vector_store
+                    if st.session_state.get("knowledge_base") == "uploads" and FAISS_AVAILABLE and store is not None:
+                        # Uploaded chunks are already embedded: reuse the session index's vectors
+                        comparator = DocumentComparator(None, CorpusIndex.from_vector_store(store))
+                    else:
+                        comparator = DocumentComparator(make_embeddings(api_key=api_key_cmp))
+                    splitter = StructuredChunker(chunk_size=1000, chunk_overlap=100, joiner=" ")
+                    for doc_name in selected_docs:
+                        if doc_name not in comparator.index:
+                            pieces = list(splitter.chunks([str(st.session_state.all_documents[doc_name])], doc_name))
+                            comparator.add_document(doc_name, [text for text, _ in pieces], [meta for _, meta in pieces])
+                    matches = comparator.compare_documents(topics, selected_docs)
+                    
                     # Compare topics
                     st.markdown("### 🔍 Topic Comparison")
                     
@@ -1022,34 +1255,27 @@ elif mode == "📑 Compare Documents":
                         for idx, doc_name in enumerate(selected_docs):
                             with cols[idx]:
                                 st.markdown(f"**{doc_name}**")
-                                text = st.session_state.all_documents[doc_name]
-                                
-                                # Simple keyword search in text
-                                topic_lower = topic.lower()
-                                if topic_lower in text.lower():
-                                    # Find context around topic
-                                    start = text.lower().find(topic_lower)
-                                    context = text[max(0, start-100):start+200]
-                                    st.text_area("Context:", context, height=150, key=f"{doc_name}_{topic}")
+                                best = matches[topic].get(doc_name)
+                                if best:
+                                    # Closest passage by meaning, not just the literal topic words
+                                    passage = best[0]
+                                    st.text_area("Context:", passage["text"], height=150, key=f"{doc_name}_{topic}")
+                                    location = describe_location(passage["metadata"])
+                                    st.caption(f"{location} · match {passage['similarity']:.0%}" if location
+                                               else f"match {passage['similarity']:.0%}")
                                 else:
                                     st.warning("Not found")
+                                offsets = mentions[doc_name][topic.lower()]
+                                if offsets:
+                                    shown = ", ".join(f"{o:,}" for o in offsets[:5]) + (" …" if len(offsets) > 5 else "")
+                                    st.caption(f"🔎 \"{topic}\" appears {len(offsets)}× (at char {shown})")
                         
                         st.divider()
                     
                     # Common themes
                     st.markdown("### 🎯 Common Themes")
-                    # Use API key from secrets/env for embeddings in comparator
-                    api_key_cmp = None
-                    try:
-                        api_key_cmp = st.secrets.get("OPENAI_API_KEY")
-                    except Exception:
-                        api_key_cmp = None
-                    if not api_key_cmp:
-                        api_key_cmp = os.getenv("OPENAI_API_KEY")
-                    comparator_embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key_cmp) if api_key_cmp else None
-                    comparator = DocumentComparator(comparator_embeddings)
                     
-                    all_texts = [st.session_state.all_documents[doc] for doc in selected_docs]
+                    all_texts = [str(st.session_state.all_documents[doc]) for doc in selected_docs]
                     common_themes = comparator.find_common_themes(all_texts)
                     
                     if common_themes:
@@ -1346,27 +1572,43 @@ if mode == "🔎 Semantic Search & Q&A":
     st.markdown("Search across all uploaded documents using natural language. Get context-aware answers!")
     query = st.text_input("Enter your legal question or search query:")
     if query and st.session_state.docs_processed:
-        with st.spinner("Searching and analyzing..."):
-            if hasattr(st.session_state.vector_store, "as_retriever"):
-                retriever = st.session_state.vector_store.as_retriever(search_kwargs={"k": 5})
-                docs = retriever.get_relevant_documents(query)
-            else:
-                texts = st.session_state.vector_store.get("fallback_texts", [])
-                docs = SimpleRetriever(texts).get_relevant_documents(query, k=5)
-            llm = ChatOpenAI(model=model, temperature=0.1)
-            context = "\n\n".join([d.page_content for d in docs])
-            prompt = (
-                "You are a legal assistant. Use the provided context to answer the user's query succinctly.\n"
-                "Cite relevant sections if present. If unsure, say so.\n\n"
-                f"Context:\n{context}\n\nQuery: {query}\nAnswer:"
-            )
-            answer = llm.invoke(prompt).content
-            st.markdown("### 🤖 Answer:")
+        started = time.perf_counter()
+        answer_cache = get_answer_cache()
+        scope = answer_scope(st.session_state.corpus_version, model, "", language, "search")
+        question_vector = embed_query(st.session_state.vector_store, query, get_query_cache())
+        cached = answer_cache.lookup(scope, query, question_vector,
+                                     model=embedding_model(st.session_state.vector_store))
+        st.markdown("### 🤖 Answer:" + (" ♻️ *cached*" if cached else ""))
+        if cached:
+            if not cached["exact"]:
+                st.caption(f"Reused the answer to a similar query ({cached['similarity']:.0%}): {cached['question']}")
+            docs = records_to_documents(cached["sources"])
+            show_sources(docs)
+            answer = cached["answer"]
             st.write(answer)
-            with st.expander("📚 Source Documents"):
-                for idx, doc in enumerate(docs, 1):
-                    st.markdown(f"**Source {idx}:**")
-                    st.text(doc.page_content[:300] + "...")
+            timings = {"first_token_s": time.perf_counter() - started}
+            timings["total_s"] = timings["first_token_s"]
+        else:
+            with st.spinner("Searching and analyzing..."):
+                docs = retrieve_sources(query, st.session_state.vector_store, st.session_state.lexical_index,
+                                        st.session_state.index_version, retrieval_budget_ms, k=5)
+            show_sources(docs)
+            answer, timings = stream_into_page(model, search_prompt(query, docs), started)
+            answer_cache.store(scope, query, answer, document_records(docs), question_vector)
+        st.caption(f"⏱️ First words after {timings['first_token_s']:.2f}s, complete in {timings['total_s']:.2f}s")
+        # Recorded with the chat so query analytics and timings cover searches too;
+        # reruns keep the query in the box, so the same search is recorded once
+        last = st.session_state.chat_history[-1] if st.session_state.chat_history else {}
+        if not (last.get("kind") == "search" and last.get("question") == query):
+            st.session_state.chat_history.append({
+                "time": datetime.now().strftime("%H:%M:%S"),
+                "question": query,
+                "answer": answer,
+                "first_token_time": timings["first_token_s"],
+                "response_time": timings["total_s"],
+                "cached": bool(cached),
+                "kind": "search"
+            })
 
 # ==================== MODE: INTERACTIVE LEGAL TIMELINE & CASE TRACKING ====================
 if mode == "📅 Legal Timeline & Case Tracking":
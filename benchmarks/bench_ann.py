@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - ANN Index Benchmark
+=====================================
+Embeds the chunks of the documents in `data/` with the local embedder, grows
+them to --vectors with jittered copies (the bundled corpus alone is too small
+for approximate search to matter) and builds every index family from
+`legal_engine.ann` with its automatically chosen parameters. Reports build
+time, index size, recall@k against exact flat search and single-query
+latency (p50/p99), the shape of request the apps send.
+
+Usage:
+    python benchmarks/bench_ann.py [--data data] [--vectors 50000] [--queries 300] [--k 10]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from legal_engine.ann import INDEX_TYPES, build_index
+from legal_engine.chunking import StructuredChunker
+from legal_engine.compat import faiss
+from legal_engine.extraction import extract_pdf_pages
+from legal_engine.local_embeddings import HashedNgramEmbeddings
+from legal_engine.prebuilt import DEFAULT_DATA_DIR
+
+QUERIES = [
+    "termination notice period", "right to equality before law", "payment within thirty days",
+    "work from home eligibility", "disciplinary action misconduct", "Article 21 personal liberty",
+    "fundamental duties of citizens", "leave encashment", "arbitration and jurisdiction",
+    "confidential information disclosure", "President of India election", "धारा",
+]
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+def jittered(base: np.ndarray, count: int, scale: float, rng) -> np.ndarray:
+    """`count` unit vectors drawn around the rows of `base`"""
+    picks = base[np.arange(count) % len(base)]
+    noisy = picks + rng.standard_normal(picks.shape).astype(np.float32) * scale / np.sqrt(base.shape[1])
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index families on the data/ corpus")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--vectors", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES[1:], default=list(INDEX_TYPES[1:]))
+    args = parser.parse_args()
+
+    if faiss is None:
+        print("❌ faiss is not installed (pip install faiss-cpu)")
+        sys.exit(1)
+
+    print("🧭 AI Legal Oracle - ANN Index Benchmark")
+    print("=" * 45)
+    chunker = StructuredChunker(chunk_size=1000, chunk_overlap=100)
+    texts = []
+    for path in sorted(Path(args.data).glob("*.pdf")):
+        pages, _ = extract_pdf_pages(path)
+        texts.extend(text for text, _ in chunker.chunks(pages, path.name))
+    embeddings = HashedNgramEmbeddings()
+    base = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    rng = np.random.default_rng(0)
+    vectors = np.vstack([base, jittered(base, max(args.vectors - len(base), 0), 1.0, rng)])
+    # Real questions plus held-out near-duplicates of corpus chunks
+    questions = np.asarray(embeddings.embed_documents(QUERIES), dtype=np.float32)
+    queries = np.vstack([questions, jittered(base, max(args.queries - len(questions), 0), 1.0, rng)])
+    print(f"📄 {len(base):,} chunks from {args.data} grown to {len(vectors):,} × {vectors.shape[1]} vectors, "
+          f"{len(queries):,} queries")
+
+    # Flat always runs first: its results are the exact neighbours recall is measured against
+    exact = None
+    print(f"{'index':<6} {'params':<48} {'build':>8} {'size':>9} {'recall@' + str(args.k):>10} "
+          f"{'p50':>8} {'p99':>8}")
+    for kind in ["flat"] + [t for t in args.types if t != "flat"]:
+        started = time.perf_counter()
+        index, params = build_index(vectors, kind)
+        build = time.perf_counter() - started
+        size = len(faiss.serialize_index(index)) / 1024 / 1024
+
+        found, latencies = [], []
+        for query in queries:
+            started = time.perf_counter()
+            _, ids = index.search(query[None], args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found.append(ids[0])
+        found = np.asarray(found)
+        if exact is None:
+            exact = found
+        recall = np.mean([len(np.intersect1d(a, b)) / args.k for a, b in zip(found, exact)])
+        shown = ", ".join(f"{key}={value}" for key, value in params.items() if key != "type")
+        print(f"{params['type']:<6} {shown or '-':<48} {build:>7.2f}s {size:>7.1f}MB {recall:>10.3f} "
+              f"{statistics.median(latencies):>6.2f}ms {percentile(latencies, 0.99):>6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - BM25 Retrieval Benchmark
+==========================================
+Builds the BM25 inverted index over the chunks of the PDFs in `data/`,
+replicated up to --chunks, and reports build time, index size and query
+latency (p50/p99) against the substring scan the Legal Chat fallback used
+before (lowercase every chunk, test every query word, sort everything).
+
+Usage:
+    python benchmarks/bench_bm25.py [--data data] [--chunks 100000] [--queries 200]
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from legal_engine.bm25 import BM25Index
+from legal_engine.chunking import StructuredChunker
+from legal_engine.extraction import extract_pdf_pages
+from legal_engine.prebuilt import DEFAULT_DATA_DIR
+
+QUERIES = [
+    "termination notice period", "right to equality before law", "payment within thirty days",
+    "work from home eligibility", "disciplinary action misconduct", "Article 21 personal liberty",
+    "fundamental duties of citizens", "leave encashment", "arbitration and jurisdiction",
+    "confidential information disclosure", "President of India election", "धारा",
+]
+
+
+def substring_scan(texts, query, k):
+    """The previous fallback: O(chunks x query words) per query"""
+    words = [w for w in re.findall(r"[A-Za-z0-9]+", query.lower()) if len(w) > 2]
+    scored = [(sum(1 for w in words if w in t.lower()), t) for t in texts]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:k]
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BM25 fallback retriever")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--scan-queries", type=int, default=5, help="Queries timed with the old substring scan")
+    args = parser.parse_args()
+
+    print("🔤 AI Legal Oracle - BM25 Retrieval Benchmark")
+    print("=" * 45)
+    chunker = StructuredChunker(chunk_size=1000, chunk_overlap=100)
+    base = []
+    for path in sorted(Path(args.data).glob("*.pdf")):
+        pages, _ = extract_pdf_pages(path)
+        base.extend(text for text, _ in chunker.chunks(pages, path.name))
+    texts = [base[i % len(base)] for i in range(max(args.chunks, len(base)))]
+    print(f"📄 {len(base):,} unique chunks replicated to {len(texts):,}")
+
+    started = time.perf_counter()
+    index = BM25Index(texts)
+    build = time.perf_counter() - started
+    print(f"🏗️ Built in {build:.2f}s · {len(index.terms):,} terms · "
+          f"{len(index.postings):,} postings · {index.nbytes() / 1024 / 1024:.1f} MB")
+
+    latencies = []
+    for i in range(args.queries):
+        query = QUERIES[i % len(QUERIES)]
+        started = time.perf_counter()
+        index.search(query, args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"⚡ BM25 query: p50 {statistics.median(latencies):.2f} ms · p99 {percentile(latencies, 0.99):.2f} ms")
+
+    scan = []
+    for query in QUERIES[:args.scan_queries]:
+        started = time.perf_counter()
+        substring_scan(texts, query, args.k)
+        scan.append((time.perf_counter() - started) * 1000)
+    print(f"🐢 Substring scan: p50 {statistics.median(scan):.1f} ms "
+          f"({statistics.median(scan) / max(statistics.median(latencies), 1e-9):.0f}x slower)")
+
+    for query in QUERIES[:3]:
+        top = index.search(query, 1)
+        if top:
+            print(f"🔎 {query!r}: {texts[top[0][0]][:80]!r} (score {top[0][1]:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - Chunking Benchmark
+====================================
+Compares `StructuredChunker` with LangChain's `RecursiveCharacterTextSplitter`
+on the PDFs in `data/`: wall time per document, chunk count and size, and how
+many chunks start exactly at an Article/Section/Clause heading. The recursive
+splitter is measured both on the whole joined text and page-streamed the way
+the ingest pipeline used to drive it (`StreamingChunker`).
+
+Text is extracted once up front so only chunking is timed.
+
+Usage:
+    python benchmarks/bench_chunking.py [--data data] [--chunk-size 1000] [--chunk-overlap 100] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+except ImportError:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from legal_engine.chunking import LABEL_RE, StructuredChunker
+from legal_engine.extraction import extract_pdf_pages
+from legal_engine.pipeline import StreamingChunker
+from legal_engine.prebuilt import DEFAULT_DATA_DIR
+
+
+def run_recursive(splitter, pages):
+    return splitter.split_text("\n".join(pages))
+
+
+def run_streamed(chunker, pages):
+    return [text for text, _ in chunker.chunks(pages)]
+
+
+def run_structured(chunker, pages):
+    return [text for text, _ in chunker.chunks(pages, "doc")]
+
+
+def time_best(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), chunks
+
+
+def heading_share(chunks):
+    if not chunks:
+        return 0.0
+    return sum(1 for chunk in chunks if LABEL_RE.match(chunk)) / len(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark structure-aware chunking")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print("✂️ AI Legal Oracle - Chunking Benchmark")
+    print("=" * 45)
+
+    recursive = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    streamed = StreamingChunker(recursive)
+    structured = StructuredChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    header = f"{'document':<38} {'pages':>5} {'chars':>9}  {'splitter':<10} {'ms':>8} {'chunks':>6} {'avg':>5} {'max':>5} {'@head':>6}"
+    print(header)
+    print("-" * len(header))
+    totals = {"recursive": 0.0, "streamed": 0.0, "structured": 0.0}
+    for path in sorted(Path(args.data).glob("*.pdf")):
+        pages, _ = extract_pdf_pages(path)
+        chars = sum(len(page) for page in pages)
+        for label, fn in (("recursive", lambda: run_recursive(recursive, pages)),
+                          ("streamed", lambda: run_streamed(streamed, pages)),
+                          ("structured", lambda: run_structured(structured, pages))):
+            seconds, chunks = time_best(fn, args.repeat)
+            totals[label] += seconds
+            sizes = [len(chunk) for chunk in chunks] or [0]
+            print(f"{path.name[:38]:<38} {len(pages):>5} {chars:>9,}  {label:<10} {seconds * 1000:>8.1f} "
+                  f"{len(chunks):>6} {statistics.mean(sizes):>5.0f} {max(sizes):>5} {heading_share(chunks):>6.0%}")
+    print("-" * len(header))
+    for label, seconds in totals.items():
+        print(f"⏱️ {label:<10} total {seconds * 1000:.1f} ms")
+    if totals["structured"]:
+        print(f"🚀 structured vs recursive: {totals['recursive'] / totals['structured']:.2f}x, "
+              f"vs streamed: {totals['streamed'] / totals['structured']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
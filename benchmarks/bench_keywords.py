@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - Keyword Matcher Benchmark
+===========================================
+Concatenates the text of the PDFs in `data/`, replicated up to --chars,
+and times the shared `KeywordMatcher` (every risk keyword, legal term and
+comparison topic located in one scan) against the per-keyword loops it
+replaced: risk scoring (`text.lower()` once, `count` per keyword), the
+summary's legal terms (`text.lower().count` per term) and topic lookup
+(`text.lower().find` per topic). Also checks that the counts agree.
+
+Usage:
+    python benchmarks/bench_keywords.py [--data data] [--chars 5000000] [--runs 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from legal_engine.extraction import extract_pdf_text
+from legal_engine.keywords import COMPARISON_TOPICS, LEGAL_TERMS, RISK_KEYWORDS, get_keyword_matcher
+from legal_engine.prebuilt import DEFAULT_DATA_DIR
+
+
+def per_keyword(text):
+    """The three previous consumers, one scan per keyword"""
+    text_lower = text.lower()
+    risk = {level: sum(text_lower.count(k) for k in words) for level, words in RISK_KEYWORDS.items()}
+    terms = {term: text.lower().count(term) for term in LEGAL_TERMS}
+    topics = {topic: text.lower().find(topic.lower()) for topic in COMPARISON_TOPICS}
+    return risk, terms, topics
+
+
+def shared_scan(text):
+    matcher = get_keyword_matcher()
+    found = matcher.scan(text)
+    risk = {level: sum(matcher.counts(found, f"risk_{level}").values()) for level in RISK_KEYWORDS}
+    terms = matcher.counts(found, "legal_terms")
+    topics = {topic: (found[topic.lower()] or [-1])[0] for topic in COMPARISON_TOPICS}
+    return risk, terms, topics
+
+
+def timed(fn, text, runs):
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(text)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the one-pass keyword matcher")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--chars", type=int, default=5_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🔎 AI Legal Oracle - Keyword Matcher Benchmark")
+    print("=" * 48)
+    text = " ".join(extract_pdf_text(path)[0] for path in sorted(Path(args.data).glob("*.pdf")))
+    if not text.strip():
+        print(f"❌ No PDF text found in {args.data}")
+        sys.exit(1)
+    text = (text * (args.chars // len(text) + 1))[:args.chars]
+    matcher = get_keyword_matcher()
+    print(f"📄 {len(text):,} characters, {len(matcher.patterns)} patterns")
+
+    old, old_ms = timed(per_keyword, text, args.runs)
+    new, new_ms = timed(shared_scan, text, args.runs)
+    print(f"🐢 Per-keyword scans: {old_ms:8.1f} ms")
+    print(f"⚡ One shared scan:   {new_ms:8.1f} ms ({old_ms / new_ms:.1f}x), every offset included")
+    print(f"{'✅' if old == new else '❌'} Risk scores, term counts and first topic offsets "
+          f"{'match' if old == new else 'differ'}")
+
+
+if __name__ == "__main__":
+    main()
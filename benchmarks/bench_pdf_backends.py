@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - PDF Backend Benchmark
+=======================================
+Extracts every PDF in `data/` (or --data) with each installed parser, groups
+the documents into classes (scanned, long, short) and records the fastest
+backend per class in the cache directory. `open_pdf_pages` reads that file
+to pick a parser for new uploads of the same class.
+
+A backend only qualifies for a document if it skipped no pages and extracted
+at least 90% of the text the best backend found, and the winner of a class
+is the fastest backend among those that qualified on the most documents of
+that class, so speed is never bought with missing text.
+
+Usage:
+    python benchmarks/bench_pdf_backends.py [--data data] [--dry-run]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from legal_engine.extraction import CLASSIFY_SAMPLE_PAGES, extract_pdf_pages
+from legal_engine.pdf_backends import available_backends, classify_document, get_backend, selection_path
+from legal_engine.prebuilt import DEFAULT_DATA_DIR
+
+MIN_TEXT_SHARE = 0.9
+
+
+def document_class(data: bytes) -> str:
+    document = get_backend().open(data)
+    sample = min(CLASSIFY_SAMPLE_PAGES, document.page_count)
+    chars = sum(len(document.page_text(i)) for i in range(sample))
+    return classify_document(document.page_count, chars, sample)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick the fastest PDF backend per document class")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--dry-run", action="store_true", help="Print results without saving the selection")
+    args = parser.parse_args()
+    # Parsers warn about every odd font; only the numbers matter here
+    logging.disable(logging.WARNING)
+
+    print("📑 AI Legal Oracle - PDF Backend Benchmark")
+    print("=" * 45)
+    backends = available_backends()
+    print(f"🔌 Installed backends: {', '.join(backends)}")
+
+    header = f"{'document':<38} {'class':<8} {'backend':<9} {'ms/page':>8} {'chars':>9} {'skipped':>7}"
+    print(header)
+    print("-" * len(header))
+    # class -> backend -> [qualifying documents, seconds, pages]
+    totals = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0]))
+    results = []
+    for path in sorted(Path(args.data).glob("*.pdf")):
+        data = path.read_bytes()
+        doc_class = document_class(data)
+        runs = {}
+        for name in backends:
+            started = time.perf_counter()
+            try:
+                pages, metadata = extract_pdf_pages(data, workers=1, backend=name)
+            except Exception as e:
+                print(f"{path.name[:38]:<38} {doc_class:<8} {name:<9} failed: {e}")
+                continue
+            seconds = time.perf_counter() - started
+            runs[name] = (seconds, len(pages), sum(len(page) for page in pages), len(metadata["page_errors"]))
+        best_chars = max((chars for _, _, chars, _ in runs.values()), default=0)
+        for name, (seconds, page_count, chars, skipped) in runs.items():
+            qualifies = skipped == 0 and chars >= MIN_TEXT_SHARE * best_chars
+            tally = totals[doc_class][name]
+            tally[1] += seconds
+            tally[2] += page_count
+            if qualifies:
+                tally[0] += 1
+            results.append({"document": path.name, "class": doc_class, "backend": name, "seconds": seconds,
+                            "pages": page_count, "chars": chars, "skipped": skipped, "qualifies": qualifies})
+            print(f"{path.name[:38]:<38} {doc_class:<8} {name:<9} {seconds * 1000 / max(page_count, 1):>8.1f} "
+                  f"{chars:>9,} {skipped:>7}{'' if qualifies else '  ✗'}")
+    print("-" * len(header))
+
+    winners = {}
+    for doc_class, by_backend in sorted(totals.items()):
+        most = max(qualified for qualified, _, _ in by_backend.values())
+        if not most:
+            continue
+        candidates = {name: tally for name, tally in by_backend.items() if tally[0] == most}
+        name, (_, seconds, pages) = min(candidates.items(), key=lambda item: item[1][1] / max(item[1][2], 1))
+        winners[doc_class] = name
+        print(f"🏆 {doc_class:<8} -> {name} ({seconds * 1000 / max(pages, 1):.1f} ms/page, "
+              f"qualified on {most} document(s))")
+
+    if args.dry_run:
+        return
+    path = selection_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"),
+                   "winners": winners, "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"💾 Selection saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
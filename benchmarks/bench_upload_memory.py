@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - Upload Memory Benchmark
+=========================================
+Measures the Python heap a single upload costs on its way from the
+Streamlit buffer to the hasher and the parser, stage by stage, for the
+previous byte-copying path and for `UploadBuffer`:
+
+    receive   take the upload's bytes from the (BytesIO-like) uploaded file
+    size      the preview's size check
+    hash      SHA-256 for the registry / extraction cache
+    open      open the PDF with the parser backend
+    handoff   what is pickled to each extraction worker
+    pages     extract the first --pages pages
+
+Peaks come from tracemalloc and are relative to the heap before the stage;
+native allocations inside C parsers are not counted. By default the largest
+PDF in `data/` is repeated until it reaches --size-mb, approximating a big
+gazette or judgment bundle.
+
+Usage:
+    python benchmarks/bench_upload_memory.py [--pdf big.pdf] [--size-mb 50] [--backend pymupdf] [--pages 20]
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from legal_engine.pdf_backends import get_backend
+from legal_engine.prebuilt import DEFAULT_DATA_DIR
+from legal_engine.uploads import UploadBuffer
+
+MB = 1024 * 1024
+
+
+class FakeUpload(io.BytesIO):
+    """Stands in for Streamlit's UploadedFile, a BytesIO over the request body"""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def build_pdf(size_mb: float, data_dir: Path) -> Path:
+    """Repeat the largest PDF in data_dir until the file reaches size_mb"""
+    from PyPDF2 import PdfReader, PdfWriter
+
+    source = max(Path(data_dir).glob("*.pdf"), key=lambda p: p.stat().st_size)
+    reader = PdfReader(str(source))
+    path = Path(tempfile.gettempdir()) / f"legal-oracle-bench-{size_mb:g}mb.pdf"
+    if path.exists() and path.stat().st_size >= size_mb * MB:
+        return path
+    writer = PdfWriter()
+    copies = max(1, round(size_mb * MB / source.stat().st_size))
+    for _ in range(copies):
+        for page in reader.pages:
+            writer.add_page(page)
+        # Re-read so every repetition is written as separate objects
+        reader = PdfReader(str(source))
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def measure(stage, results, fn):
+    """Run fn, recording (peak heap growth, seconds) under `stage`"""
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    value = fn()
+    results[stage] = (tracemalloc.get_traced_memory()[1] - before, time.perf_counter() - started)
+    return value
+
+
+def legacy_path(upload, backend, pages, workers):
+    results = {}
+    data = measure("receive", results, upload.getvalue)
+    measure("size", results, lambda: len(upload.getvalue()))
+    measure("hash", results, lambda: hashlib.sha256(data).hexdigest())
+    # The old entry point normalised every source with bytes(); a no-op for bytes,
+    # a full copy for the memoryviews other callers passed
+    document = measure("open", results, lambda: backend.open(bytes(data)))
+    # Pool initargs: the whole PDF is pickled once per worker
+    measure("handoff", results, lambda: [pickle.dumps(data) for _ in range(workers)])
+    measure("pages", results, lambda: [document.page_text(i) for i in range(min(pages, document.page_count))])
+    return results
+
+
+def buffer_path(upload, backend, pages, workers):
+    results = {}
+    buffer = measure("receive", results, lambda: UploadBuffer.from_upload(upload))
+    measure("size", results, lambda: upload.size)
+    measure("hash", results, lambda: buffer.sha256)
+    document = measure("open", results, lambda: backend.open(buffer))
+    measure("handoff", results, lambda: [pickle.dumps(buffer.worker_source()) for _ in range(workers)])
+    measure("pages", results, lambda: [document.page_text(i) for i in range(min(pages, document.page_count))])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage heap cost of one upload")
+    parser.add_argument("--pdf", help="PDF to upload (default: generated from data/)")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--size-mb", type=float, default=50)
+    parser.add_argument("--backend", default=None, help="PDF backend (default: first installed)")
+    parser.add_argument("--pages", type=int, default=20, help="Pages to extract in the last stage")
+    parser.add_argument("--workers", type=int, default=3, help="Extraction workers the bytes are handed to")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("🧮 AI Legal Oracle - Upload Memory Benchmark")
+    print("=" * 45)
+    path = Path(args.pdf) if args.pdf else build_pdf(args.size_mb, Path(args.data))
+    data = path.read_bytes()
+    backend = get_backend(args.backend)
+    print(f"📄 {path.name}: {len(data) / MB:.1f} MB · backend {backend.name}")
+
+    tracemalloc.start()
+    runs = {}
+    for label, run in (("copying", legacy_path), ("buffer", buffer_path)):
+        runs[label] = run(FakeUpload(data, path.name), backend, args.pages, args.workers)
+    tracemalloc.stop()
+
+    header = f"{'stage':<9} {'copying MB':>11} {'buffer MB':>10} {'copying s':>10} {'buffer s':>9}"
+    print(header)
+    print("-" * len(header))
+    for stage in runs["copying"]:
+        (old_mb, old_s), (new_mb, new_s) = runs["copying"][stage], runs["buffer"][stage]
+        print(f"{stage:<9} {old_mb / MB:>11.1f} {new_mb / MB:>10.1f} {old_s:>10.2f} {new_s:>9.2f}")
+    print("-" * len(header))
+    for label, stages in runs.items():
+        peak = max(growth for growth, _ in stages.values())
+        print(f"📈 {label:<8} worst stage {peak / MB:.1f} MB ({peak / len(data):.2f}x the upload), "
+              f"all stages {sum(growth for growth, _ in stages.values()) / MB:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
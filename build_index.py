@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+AI Legal Oracle - Statute Index Builder
+=======================================
+Turns the bundled `data/` statute corpus into a prebuilt, versioned knowledge
+base (chunk texts, metadata, vectors and FAISS index) that both apps load at
+startup, so sessions can query the statutes without uploading anything.
+
+Usage:
+    python build_index.py [--data data] [--out index/statutes] [--provider auto|openai|local]
+                          [--model text-embedding-3-small] [--index auto|flat|ivf|hnsw|pq]
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from legal_engine.ann import INDEX_TYPES
+from legal_engine.chunking import StructuredChunker
+from legal_engine.prebuilt import DEFAULT_DATA_DIR, DEFAULT_INDEX_DIR, build_corpus_index
+from legal_engine.providers import EMBEDDING_PROVIDERS, make_embeddings, resolve_provider
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the prebuilt statute index")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_DIR), help="Directory of source documents")
+    parser.add_argument("--out", default=str(DEFAULT_INDEX_DIR), help="Artifact output directory")
+    parser.add_argument("--provider", choices=EMBEDDING_PROVIDERS, default=None,
+                        help="Embedding provider (default: $LEGAL_ORACLE_EMBEDDINGS or auto)")
+    parser.add_argument("--model", default=None, help="OpenAI embedding model")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4, help="Embedding requests in flight at once")
+    parser.add_argument("--index", choices=INDEX_TYPES, default="auto",
+                        help="FAISS index family (auto picks by corpus size)")
+    args = parser.parse_args()
+
+    print("📚 AI Legal Oracle - Statute Index Builder")
+    print("=" * 45)
+
+    load_dotenv()
+    provider = resolve_provider(args.provider)
+    if provider == "openai" and not os.getenv("OPENAI_API_KEY"):
+        print("❌ OPENAI_API_KEY not set. Add it to your environment or .env file, or use --provider local.")
+        sys.exit(1)
+    embeddings = make_embeddings(provider, model=args.model, max_concurrency=args.concurrency)
+    print(f"🧬 Embeddings: {provider} ({embeddings.model})")
+
+    splitter = StructuredChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    def report(stats):
+        print(f"\r🧠 {stats['documents_done']}/{stats['documents_total']} documents, "
+              f"{stats['chunks']} chunks, {stats['embedded']} embedded", end="", flush=True)
+
+    manifest = build_corpus_index(embeddings, splitter, embeddings.model,
+                                  data_dir=args.data, out_dir=args.out, progress=report,
+                                  index_type=args.index)
+    print()
+    for name, error in manifest["errors"]:
+        print(f"⚠️ Skipped {name}: {error}")
+    print(f"✅ Indexed {len(manifest['documents'])} documents into {manifest['chunks']} chunks")
+    print(f"🗂️ Index: {manifest['index']}")
+    print(f"🏷️ Corpus version {manifest['corpus_version']} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,7 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from PyPDF2 import PdfReader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.chains import RetrievalQA, ConversationalRetrievalChain
+from langchain.chains import ConversationalRetrievalChain
 from langchain.chat_models import ChatOpenAI
 from langchain.memory import ConversationBufferWindowMemory
 from langchain.prompts import PromptTemplate
@@ -14,15 +10,12 @@ import json
 import pandas as pd
 from datetime import datetime, timedelta
 import hashlib
+import logging
 import pickle
 from pathlib import Path
 import re
 import time
 from io import BytesIO
-try:
-    import docx
-except ImportError:
-    docx = None
 from PIL import Image
 try:
     from wordcloud import WordCloud
@@ -40,6 +33,34 @@ try:
 except ImportError:
     aiohttp = None
 
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+except ImportError:
+    add_script_run_ctx = None
+
+from legal_engine.answer_cache import answer_scope, document_records, get_answer_cache, records_to_documents
+from legal_engine.bm25 import BM25Index
+from legal_engine.chunking import StructuredChunker, describe_location
+from legal_engine.docx_extraction import extract_docx_text
+from legal_engine.extraction import extract_pdf_text
+from legal_engine.embedding_cache import get_embedding_cache
+from legal_engine.extraction_cache import get_extraction_cache
+from legal_engine.hybrid import embed_query, embedding_model, make_retriever
+from legal_engine.incremental import DocumentRegistry
+from legal_engine.keywords import get_keyword_matcher
+from legal_engine.pipeline import IngestPipeline
+from legal_engine.prebuilt import load_corpus_index, read_manifest
+from legal_engine.providers import embeddings_for_model, make_embeddings
+from legal_engine.query_cache import get_query_cache, new_index_version
+from legal_engine.streaming import stream_answer
+from legal_engine.text_store import get_text_store
+from legal_engine.uploads import UploadBuffer
+from legal_engine.warmup import cancel_warmup, restart_warmup
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = {"Auto": "auto", "OpenAI": "openai", "Local (offline)": "local"}
+
 # Enhanced Configuration - MUST BE FIRST, BEFORE ANYTHING ELSE
 st.set_page_config(
     page_title="⚖️ AI Legal Oracle - Enterprise Edition",
@@ -84,11 +105,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 if "OPENAI_API_KEY" not in os.environ:
-    if "OPENAI_API_KEY" in st.secrets:
-        os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
+    try:
+        secret_key = st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        secret_key = None
+    if secret_key:
+        os.environ["OPENAI_API_KEY"] = secret_key
     else:
-        st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY in your environment variables or Streamlit secrets.")
-        st.stop()
+        # Retrieval still works offline with local embeddings; only chat needs the key
+        st.warning("⚠️ OpenAI API key not found. Documents will be indexed with local embeddings; "
+                   "set OPENAI_API_KEY in your environment variables or Streamlit secrets to enable AI answers.")
 
 # Custom CSS for Professional Look
 st.markdown("""
@@ -146,11 +172,16 @@ def init_database():
                 timestamp DATETIME,
                 query TEXT,
                 response_time FLOAT,
+                first_token_time FLOAT,
                 document_type TEXT,
                 user_session TEXT,
                 confidence_score FLOAT
             )
         ''')
+        # Databases created before time-to-first-token was recorded gain the column in place
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(query_analytics)")}
+        if "first_token_time" not in columns:
+            cursor.execute("ALTER TABLE query_analytics ADD COLUMN first_token_time FLOAT")
         conn.commit()
         conn.close()
         return True
@@ -171,6 +202,12 @@ def initialize_session_state():
             st.session_state.document_processed = False
         if 'vector_store' not in st.session_state:
             st.session_state.vector_store = None
+        if 'lexical_index' not in st.session_state:
+            st.session_state.lexical_index = None
+        if 'index_version' not in st.session_state:
+            st.session_state.index_version = None
+        if 'corpus_version' not in st.session_state:
+            st.session_state.corpus_version = None
         if 'session_id' not in st.session_state:
             st.session_state.session_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
         if 'current_mode' not in st.session_state:
@@ -189,6 +226,31 @@ try:
 except Exception as e:
     st.error(f"Session state initialization failed: {str(e)}")
 
+@st.cache_resource
+def load_statute_library():
+    """Memory-map the prebuilt data/ statute index once per server process"""
+    try:
+        # A corrupt or partially written manifest must not take the app down
+        manifest = read_manifest()
+        if manifest is None:
+            return None
+        embeddings = embeddings_for_model(manifest["embedding_model"], manifest.get("dimension"))
+        return load_corpus_index(embeddings) if embeddings is not None else None
+    except Exception as e:
+        logger.warning("Statute library unavailable: %s", e)
+        return None
+
+# Cold sessions start with the bundled statutes as a ready-made knowledge base
+statute_library = load_statute_library()
+if statute_library and st.session_state.vector_store is None:
+    st.session_state.vector_store = statute_library["vector_store"]
+    st.session_state.lexical_index = statute_library["lexical"]
+    # Shared by every session on the library, so cached answers carry across sessions
+    st.session_state.index_version = f"statutes-{statute_library['manifest']['corpus_version']}"
+    st.session_state.corpus_version = statute_library["manifest"]["corpus_version"]
+    st.session_state.document_processed = True
+    st.session_state.knowledge_base = "statutes"
+
 # Enhanced Header
 st.markdown("""
 <div class="main-header">
@@ -243,11 +305,26 @@ with st.sidebar:
     temperature = 0.1
     max_tokens = 300
     search_depth = 3
+    retrieval_budget_ms = 1500
+    embed_batch_size = 128
+    ingest_memory_mb = 64
+    embed_concurrency = 4
+    embedding_backend = "Auto"
     
     with st.expander("⚙️ Advanced Settings"):
         temperature = st.slider("🌡️ Response Creativity", 0.0, 1.0, 0.1, 0.1)
         max_tokens = st.slider("📝 Max Response Length", 100, 1000, 300, 50)
         search_depth = st.slider("🔍 Search Depth", 1, 10, 3)
+        retrieval_budget_ms = st.slider("⏱️ Retrieval Budget (ms)", 100, 5000, 1500, 100,
+                                        help="Keyword results are used alone if semantic search is still running")
+        embed_batch_size = st.slider("📦 Embedding Batch Size", 16, 512, 128, 16,
+                                     help="Chunks handed to the embedder at a time")
+        ingest_memory_mb = st.slider("🧮 Ingest Memory Ceiling (MB)", 16, 512, 64, 16,
+                                     help="Maximum chunk text buffered ahead of embedding")
+        embed_concurrency = st.slider("🔀 Concurrent Embedding Requests", 1, 16, 4,
+                                      help="Embedding requests kept in flight at once")
+        embedding_backend = st.selectbox("🧬 Embeddings", list(EMBEDDING_BACKENDS),
+                                         help="Auto uses OpenAI when a key is set, otherwise local CPU embeddings")
         
     # System Status and Quick Actions
     st.markdown("### 📈 Session Stats")
@@ -256,6 +333,22 @@ with st.sidebar:
         st.metric("Queries", len(st.session_state.chat_history))
     with col2:
         st.metric("Session", st.session_state.session_id)
+    if st.session_state.get("knowledge_base") == "statutes":
+        manifest = statute_library["manifest"]
+        st.caption(f"📚 Statute library: {len(manifest['documents'])} docs, "
+                   f"{manifest['chunks']} chunks (v{manifest['corpus_version'][:8]})")
+    cache_stats = get_extraction_cache().stats()
+    st.caption(f"🗄️ Extraction cache: {cache_stats['entries']} docs, "
+               f"{cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    embed_stats = get_embedding_cache().stats()
+    st.caption(f"🧠 Embedding cache: {embed_stats['entries']:,} vectors, "
+               f"{embed_stats['hit_ratio']:.0%} hit ratio")
+    query_stats = get_query_cache().stats()
+    st.caption(f"⚡ Query cache: {query_stats['hit_ratio']:.0%} hit ratio "
+               f"({query_stats['hits']:,} / {query_stats['hits'] + query_stats['misses']:,} lookups)")
+    answer_stats = get_answer_cache().stats()
+    st.caption(f"♻️ Answer cache: {answer_stats['entries']:,} answers, {answer_stats['hits']:,} reused "
+               f"({answer_stats['near_hits']:,} near-duplicates)")
     
     # Quick Actions
     st.markdown("### ⚡ Quick Actions")
@@ -276,6 +369,8 @@ with st.sidebar:
         try:
             st.cache_data.clear()
             st.cache_resource.clear()
+            get_extraction_cache().clear()
+            get_embedding_cache().clear()
             st.success("Cache cleared!")
         except Exception as e:
             st.error(f"Cache clear failed: {str(e)}")
@@ -308,79 +403,19 @@ def safe_operation(operation_name, operation_func, *args, **kwargs):
         return None
 
 def cleanup_memory():
-    """Clean up memory and cache"""
+    """Clean up memory (the extraction cache lives on disk and is kept)"""
     try:
         import gc
         gc.collect()
-        st.cache_data.clear()
     except Exception as e:
         pass
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def cached_text_extraction(file_content, file_name, file_type):
-    """Cache text extraction to avoid reprocessing same files"""
-    if file_type == "pdf":
-        return extract_text_from_pdf_content(file_content)
-    elif file_type == "docx" and docx is not None:
-        return extract_text_from_docx_content(file_content)
-    else:
-        return file_content.decode("utf-8"), {"filename": file_name, "type": "TXT"}
-
-def extract_text_from_pdf_content(file_content):
-    """Extract text from PDF content"""
-    text = ""
-    metadata = {"pages": 0, "title": "", "author": ""}
-    
-    try:
-        from io import BytesIO
-        pdf_file = BytesIO(file_content)
-        reader = PdfReader(pdf_file)
-        metadata["pages"] = len(reader.pages)
-        
-        if reader.metadata:
-            metadata["title"] = reader.metadata.get("/Title", "")
-            metadata["author"] = reader.metadata.get("/Author", "")
-        
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-            
-    except Exception as e:
-        raise Exception(f"PDF extraction failed: {str(e)}")
-    
-    return text, metadata
-
-def extract_text_from_docx_content(file_content):
-    """Extract text from DOCX content"""
-    if docx is None:
-        raise Exception("python-docx not installed")
-    
-    try:
-        from io import BytesIO
-        docx_file = BytesIO(file_content)
-        doc = docx.Document(docx_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
-    except Exception as e:
-        raise Exception(f"DOCX extraction failed: {str(e)}")
 def extract_text_from_pdf(file):
     """Enhanced PDF extraction with metadata using PyPDF2"""
-    text = ""
     metadata = {"pages": 0, "title": "", "author": ""}
     
     try:
-        reader = PdfReader(file)
-        metadata["pages"] = len(reader.pages)
-        
-        # Try to get metadata
-        if reader.metadata:
-            metadata["title"] = reader.metadata.get("/Title", "")
-            metadata["author"] = reader.metadata.get("/Author", "")
-        
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-            
+        text, metadata = extract_pdf_text(file)
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return "", metadata
@@ -389,16 +424,8 @@ def extract_text_from_pdf(file):
 
 def extract_text_from_docx(file):
     """Extract text from DOCX files"""
-    if docx is None:
-        st.error("python-docx not installed. Please install it to process DOCX files.")
-        return ""
-    
     try:
-        doc = docx.Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return extract_docx_text(file)
     except Exception as e:
         st.error(f"Error reading DOCX file: {str(e)}")
         return ""
@@ -416,23 +443,142 @@ def generate_document_summary(text: str) -> Dict[str, Any]:
         "avg_sentence_length": len(words) / len(sentences) if sentences else 0
     }
     
-    # Extract key legal terms
-    legal_terms = []
-    legal_keywords = [
-        "contract", "agreement", "liability", "clause", "provision", "party",
-        "defendant", "plaintiff", "jurisdiction", "compliance", "violation",
-        "breach", "damages", "penalty", "regulation", "statute", "law"
-    ]
-    
-    for term in legal_keywords:
-        count = text.lower().count(term)
-        if count > 0:
-            legal_terms.append({"term": term, "frequency": count})
+    # Extract key legal terms, all located in one pass over the text
+    matcher = get_keyword_matcher()
+    term_counts = matcher.counts(matcher.scan(text), "legal_terms")
+    legal_terms = [{"term": term, "frequency": count} for term, count in term_counts.items() if count > 0]
     
     stats["legal_terms"] = sorted(legal_terms, key=lambda x: x["frequency"], reverse=True)[:10]
     
     return stats
 
+# Configure LLM based on user selection
+MODEL_MAP = {
+    "gpt-4o-mini (Cost Optimized)": "gpt-4o-mini",
+    "gpt-4 (Premium)": "gpt-4",
+    "gpt-3.5-turbo (Standard)": "gpt-3.5-turbo"
+}
+
+# Quick chat questions, answered in the background as soon as a knowledge base is ready
+QUICK_QUESTIONS = [
+    ("📋 Summarize key points", "chat_summarize_btn",
+     "Please provide a comprehensive summary of the key legal points in these documents."),
+    ("⚠️ Identify risks", "chat_risks_btn",
+     "What are the main legal risks and liabilities mentioned in these documents?"),
+    ("✅ Check compliance", "chat_compliance_btn",
+     "Are there any compliance requirements or regulatory obligations mentioned?"),
+]
+
+# Advanced prompt template for legal context
+LEGAL_PROMPT = PromptTemplate(
+    template="""You are an expert legal AI assistant. Based on the provided legal documents, answer the user's question with:
+
+1. **Direct Answer**: Provide a clear, concise response
+2. **Legal Context**: Explain relevant legal principles
+3. **Document References**: Cite specific sections when possible
+4. **Risk Assessment**: Highlight any potential legal risks
+5. **Recommendations**: Suggest next steps if applicable
+
+Legal Domain: {legal_domain}
+Language: {language}
+
+Question: {question}
+
+Context from documents:
+{context}
+
+Please provide a comprehensive legal analysis:""",
+    input_variables=["legal_domain", "language", "question", "context"]
+)
+
+def build_retriever(vector_store, lexical_index, index_version, vectors, search_depth, budget_ms):
+    """Legal Chat retriever; reads no session state, so it can also run on warm-up threads"""
+    # BM25 + vector search fused by rank, then diversified with MMR;
+    # Search Depth sets the candidate pool (50-500)
+    return make_retriever(
+        vector_store,
+        lexical_index,
+        k=min(search_depth, 3),
+        fetch_k=search_depth * 50,
+        search_type="mmr",
+        vectors=vectors,
+        budget_ms=budget_ms,
+        cache=get_query_cache(),
+        index_version=index_version
+    )
+
+def build_llm(model_name, temperature, max_tokens):
+    return ChatOpenAI(
+        model_name=model_name,
+        temperature=temperature,
+        max_tokens=min(max_tokens, 500),  # Cap tokens for stability
+        timeout=30,  # 30 second timeout
+        streaming=True
+    )
+
+def legal_prompt_text(question, docs, domain, lang):
+    """LEGAL_PROMPT filled the way a "stuff" QA chain fills it"""
+    return LEGAL_PROMPT.format(
+        legal_domain=domain,
+        language=lang,
+        question=question,
+        context="\n\n".join(doc.page_content for doc in docs)
+    )
+
+def render_sources(docs):
+    with st.expander("📚 Sources & References"):
+        for j, doc in enumerate(docs, 1):
+            st.markdown(f"**📄 Source {j}:** {describe_location(doc.metadata)}")
+            st.text(doc.page_content[:300] + "...")
+            if j < len(docs):
+                st.markdown("---")
+
+def warm_up_answers():
+    """Answer the quick questions in the background, once per knowledge base.
+
+    Starts when a corpus becomes ready in the session (fresh ingest or the
+    statute library) and an OpenAI key is set, with the settings of that
+    moment. Reruns and model, domain or language changes leave the job alone,
+    so sidebar toggles never start another LLM batch; a new corpus cancels it
+    and starts another. Returns the session's job, if any.
+    """
+    if not st.session_state.get("document_processed") or st.session_state.get("vector_store") is None:
+        return None
+    if not os.getenv("OPENAI_API_KEY"):
+        return None
+    corpus_version = st.session_state.get("corpus_version")
+    job = st.session_state.get("warmup")
+    if job is not None and not job.cancelled.is_set() and st.session_state.get("warmup_corpus") == corpus_version:
+        return job
+    # Captured now: the worker threads cannot read session state or widgets
+    retriever_args = (
+        st.session_state.vector_store,
+        st.session_state.get("lexical_index"),
+        st.session_state.get("index_version"),
+        statute_library["vectors"] if st.session_state.get("knowledge_base") == "statutes" else None,
+        search_depth,
+        retrieval_budget_ms
+    )
+    llm_args = (MODEL_MAP[model_choice], temperature, max_tokens)
+    domain, lang = legal_domain, language
+    
+    def answer(question):
+        docs = build_retriever(*retriever_args).get_relevant_documents(question)
+        return build_llm(*llm_args).invoke(legal_prompt_text(question, docs, domain, lang)).content, docs
+    
+    store = st.session_state.vector_store
+    st.session_state.warmup_corpus = corpus_version
+    st.session_state.warmup = restart_warmup(
+        job,
+        answer_scope(corpus_version, MODEL_MAP[model_choice], legal_domain, language),
+        [question for _, _, question in QUICK_QUESTIONS],
+        answer,
+        embed=lambda question: embed_query(store, question, get_query_cache())
+    )
+    return st.session_state.warmup
+
+warm_up_answers()
+
 # Main Content Area with Enhanced Error Handling
 required_keys = ["chat_history", "document_processed", "vector_store", "session_id", "current_mode", "error_log", "processing_status"]
 for k in required_keys:
@@ -461,16 +607,13 @@ try:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            # Determine supported file types based on available libraries
-            file_types = ['pdf', 'txt']
-            if docx is not None:
-                file_types.append('docx')
+            file_types = ['pdf', 'txt', 'docx']
             
             uploaded_files = st.file_uploader(
                 "📄 Upload Legal Documents",
                 accept_multiple_files=True,
                 type=file_types,
-                help=f"Supported formats: {', '.join(file_types).upper()}. Maximum 10 files."
+                help=f"Supported formats: {', '.join(file_types).upper()}."
             )
         
         with col2:
@@ -479,100 +622,130 @@ try:
                 
                 # File preview
                 for file in uploaded_files[:3]:  # Show first 3 files
-                    file_size = len(file.getvalue()) / 1024  # KB
+                    file_size = file.size / 1024  # KB
                     st.write(f"📄 {file.name} ({file_size:.1f} KB)")
         
-        if uploaded_files and len(uploaded_files) <= 10:  # Limit to 10 files
+        if uploaded_files:
             if st.button("🚀 Process Documents", type="primary", key="process_docs_btn"):
                 def process_documents():
                     """Process documents with error handling"""
                     with st.spinner("🔄 Processing documents with AI..."):
                         progress_bar = st.progress(0)
-                        all_text = ""
-                        all_metadata = []
+                        page_status = st.empty()
                         
-                        for i, file in enumerate(uploaded_files):
-                            try:
-                                progress_bar.progress((i + 1) / len(uploaded_files))
-                                
-                                file_content = file.getvalue()
-                                file_type = file.name.split('.')[-1].lower()
-                                
-                                # Use cached extraction
-                                if file_type == "pdf":
-                                    text, metadata = cached_text_extraction(file_content, file.name, "pdf")
-                                    metadata["filename"] = file.name
-                                    metadata["type"] = "PDF"
-                                elif file_type == "docx" and docx is not None:
-                                    text = cached_text_extraction(file_content, file.name, "docx")
-                                    metadata = {"filename": file.name, "type": "DOCX"}
-                                else:  # .txt
-                                    text = file_content.decode("utf-8")
-                                    metadata = {"filename": file.name, "type": "TXT"}
-                                
-                                all_text += f"\n\n--- Document: {file.name} ---\n\n" + text
-                                all_metadata.append(metadata)
-                                
-                                # Cleanup memory after each file
-                                if i % 3 == 0:  # Cleanup every 3 files
-                                    cleanup_memory()
-                                    
-                            except Exception as e:
-                                st.warning(f"⚠️ Could not process {file.name}: {str(e)}")
-                                continue
+                        def extract_upload(name, upload):
+                            """Extract one upload through the cache; runs on the ingest thread"""
+                            def report_pages(done, total):
+                                page_status.caption(f"📄 {name}: page {done}/{total}")
+                            
+                            # Pages stream straight from the shared upload buffer (no joined copy)
+                            return get_extraction_cache().open_pages(name, upload, progress=report_pages)
                         
-                        progress_bar.progress(1.0)
+                        # Split at Article/Section/Clause boundaries; chunks keep document, page and offsets
+                        splitter = StructuredChunker(
+                            chunk_size=1200,  # Reduced for stability
+                            chunk_overlap=150
+                        )
                         
-                        if not all_text.strip():
-                            raise Exception("No text could be extracted from uploaded files")
+                        # Create embeddings: cached concurrent OpenAI requests, or local CPU vectors
+                        embeddings = make_embeddings(
+                            EMBEDDING_BACKENDS[embedding_backend],
+                            max_concurrency=embed_concurrency
+                        )
                         
-                        # Enhanced text splitting with document awareness
-                        splitter = RecursiveCharacterTextSplitter(
-                            chunk_size=1200,  # Reduced for stability
-                            chunk_overlap=150,
-                            separators=["\n\n--- Document:", "\n\n", "\n", ".", "!", "?", ",", " ", ""]
+                        # Extraction/chunking and embedding run concurrently
+                        pipeline = IngestPipeline(
+                            embeddings,
+                            splitter,
+                            extractor=extract_upload,
+                            batch_size=embed_batch_size,
+                            max_pending_mb=ingest_memory_mb,
+                            thread_hook=add_script_run_ctx,
+                            text_store=get_text_store()
                         )
-                        chunks = splitter.split_text(all_text)
                         
-                        # Limit chunks for stability
-                        if len(chunks) > 80:  # Reduced limit
-                            chunks = chunks[:80]
-                            st.warning(f"⚠️ Limited to 80 chunks for optimal performance.")
+                        def report_ingest(stats):
+                            eta = stats["eta_seconds"]
+                            progress_bar.progress(stats["fraction"], text=(
+                                f"🧠 {stats['embedded']:,} / ~{stats['estimated_chunks']:,} chunks embedded"
+                                + (f" · ~{eta:.0f}s left" if eta is not None else "")
+                            ))
                         
-                        # Create embeddings with progress tracking
-                        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+                        # Only new or changed uploads are extracted and embedded; files
+                        # removed from the uploader are deleted from the live index
+                        # Answers being warmed up for the previous corpus are no longer wanted
+                        cancel_warmup(st.session_state.get("warmup"))
+                        if st.session_state.get("knowledge_base") != "uploads" or "doc_registry" not in st.session_state:
+                            st.session_state.doc_registry = DocumentRegistry()
+                            st.session_state.vector_store = None
+                        registry = st.session_state.doc_registry
+                        # Hashed, sized and parsed in place; the bytes are never copied
+                        uploads = {file.name: UploadBuffer.from_upload(file) for file in uploaded_files}
                         
-                        with st.spinner("🧠 Creating AI knowledge base..."):
-                            vector_store = FAISS.from_texts(chunks, embedding=embeddings)
-                            st.session_state.vector_store = vector_store
-                            st.session_state.document_processed = True
+                        with st.spinner("🧠 Updating AI knowledge base..."):
+                            vector_store, ingest, removed = registry.sync(
+                                pipeline,
+                                uploads,
+                                st.session_state.vector_store,
+                                progress=report_ingest
+                            )
                         
-                        return chunks, all_metadata
+                        progress_bar.progress(1.0)
+                        page_status.empty()
+                        cleanup_memory()
+                        
+                        for name, error in ingest["errors"]:
+                            st.warning(f"⚠️ Could not process {name}: {error}")
+                        for meta in ingest["metadata"]:
+                            if meta.get("page_errors"):
+                                skipped = ", ".join(str(page) for page, _ in meta["page_errors"][:10])
+                                st.warning(f"⚠️ {meta['filename']}: skipped unreadable page(s) {skipped}")
+                        
+                        if not registry.total_chunks():
+                            raise Exception("No text could be extracted from uploaded files")
+                        
+                        st.session_state.last_ingest_stats = ingest["stats"]
+                        unchanged = len(uploads) - len(ingest["chunk_ids"]) - len(ingest["errors"])
+                        st.info(f"🔁 {len(ingest['chunk_ids'])} added, {len(removed)} removed, {unchanged} unchanged")
+                        
+                        st.session_state.vector_store = vector_store
+                        # Rebuilt per sync so BM25 sees exactly the chunks now in the store
+                        st.session_state.lexical_index = BM25Index.from_vector_store(vector_store)
+                        # New corpus: cached query results of the previous one no longer apply
+                        st.session_state.index_version = new_index_version(st.session_state.get("index_version"))
+                        # Content-derived, so cached answers survive restarts and re-uploads
+                        st.session_state.corpus_version = registry.corpus_version()
+                        st.session_state.document_processed = True
+                        st.session_state.knowledge_base = "uploads"
+                        
+                        return ingest
                 
                 # Execute document processing safely
                 result = safe_operation("Document Processing", process_documents)
                 
                 if result:
-                    chunks, all_metadata = result
-                    
                     # Document Analysis Dashboard
                     st.success("✅ Documents processed successfully!")
+                    if warm_up_answers() is not None:
+                        st.caption(f"🔥 Preparing answers to the {len(QUICK_QUESTIONS)} quick questions in the background")
                     
                     col1, col2, col3, col4 = st.columns(4)
                     
-                    total_words = sum([len(chunk.split()) for chunk in chunks[:5]])
+                    # Every indexed document counts, including ones this sync left unchanged
+                    total_words = st.session_state.doc_registry.total_words()
                     
                     with col1:
                         st.metric("📄 Documents", len(uploaded_files))
                     with col2:
-                        st.metric("🧩 Text Chunks", len(chunks))
+                        st.metric("🧩 Text Chunks", st.session_state.doc_registry.total_chunks())
                     with col3:
                         st.metric("📝 Total Words", f"{total_words:,}")
                     with col4:
                         st.metric("💾 Vector Store", "Ready")
                     
-        elif len(uploaded_files) > 10:
-            st.error("⚠️ Too many files! Please upload maximum 10 files at once.")
+                    ingest_stats = st.session_state.last_ingest_stats
+                    st.caption(f"⏱️ Ingested {ingest_stats['embedded']:,} chunks from {ingest_stats['pages']:,} pages "
+                               f"in {ingest_stats['elapsed']:.1f}s ({ingest_stats['chunks_per_second']:.1f} chunks/s)")
 
     elif app_mode == "💬 Legal Chat":
         try:
@@ -588,19 +761,17 @@ try:
                 
                 # Quick suggestion buttons
                 st.markdown("**💡 Quick Questions:**")
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    if st.button("📋 Summarize key points", key="chat_summarize_btn"):
-                        st.session_state.temp_query = "Please provide a comprehensive summary of the key legal points in these documents."
-                
-                with col2:
-                    if st.button("⚠️ Identify risks", key="chat_risks_btn"):
-                        st.session_state.temp_query = "What are the main legal risks and liabilities mentioned in these documents?"
-                
-                with col3:
-                    if st.button("✅ Check compliance", key="chat_compliance_btn"):
-                        st.session_state.temp_query = "Are there any compliance requirements or regulatory obligations mentioned?"
+                for column, (label, button_key, question) in zip(st.columns(len(QUICK_QUESTIONS)), QUICK_QUESTIONS):
+                    with column:
+                        if st.button(label, key=button_key):
+                            st.session_state.temp_query = question
+                warmup = st.session_state.get("warmup")
+                if warmup is not None:
+                    warm = warmup.status()
+                    if warm["running"]:
+                        st.caption(f"🔥 Preparing answers: {warm['ready']}/{warm['total']} ready")
+                    elif warm["ready"]:
+                        st.caption(f"⚡ {warm['ready']} quick answers ready")
                 
                 # Chat input with validation
                 user_query = st.text_input(
@@ -615,70 +786,59 @@ try:
                 
                 if user_query and len(user_query.strip()) > 5:
                     def process_chat_query():
-                        """Process chat query with error handling"""
+                        """Process chat query with error handling; the answer streams into the page"""
                         # Input validation
                         if len(user_query) > 500:
                             raise Exception("Query too long. Please keep under 500 characters.")
                         
-                        # Advanced prompt template for legal context
-                        legal_prompt = PromptTemplate(
-                            template="""You are an expert legal AI assistant. Based on the provided legal documents, answer the user's question with:
-
-1. **Direct Answer**: Provide a clear, concise response
-2. **Legal Context**: Explain relevant legal principles
-3. **Document References**: Cite specific sections when possible
-4. **Risk Assessment**: Highlight any potential legal risks
-5. **Recommendations**: Suggest next steps if applicable
-
-Legal Domain: {legal_domain}
-Language: {language}
-
-Question: {question}
-
-Context from documents:
-{context}
-
-Please provide a comprehensive legal analysis:""",
-                            input_variables=["legal_domain", "language", "question", "context"]
-                        )
-                        
-                        # Create enhanced QA chain
-                        retriever = st.session_state.vector_store.as_retriever(
-                            search_type="mmr",
-                            search_kwargs={"k": min(search_depth, 3), "fetch_k": min(search_depth * 2, 6)}
-                        )
-                        
-                        # Configure LLM based on user selection
-                        model_map = {
-                            "gpt-4o-mini (Cost Optimized)": "gpt-4o-mini",
-                            "gpt-4 (Premium)": "gpt-4",
-                            "gpt-3.5-turbo (Standard)": "gpt-3.5-turbo"
-                        }
-                        
-                        llm = ChatOpenAI(
-                            model_name=model_map[model_choice],
-                            temperature=temperature,
-                            max_tokens=min(max_tokens, 500),  # Cap tokens for stability
-                            timeout=30  # 30 second timeout
-                        )
-                        
-                        qa_chain = RetrievalQA.from_chain_type(
-                            llm=llm,
-                            chain_type="stuff",
-                            retriever=retriever,
-                            return_source_documents=True,
-                            chain_type_kwargs={"prompt": legal_prompt}
-                        )
+                        model_name = MODEL_MAP[model_choice]
+                        start_time = time.perf_counter()
                         
-                        start_time = time.time()
+                        # Repeated or near-duplicate questions on the same corpus reuse the stored answer
+                        answer_cache = get_answer_cache()
+                        scope = answer_scope(st.session_state.get("corpus_version"), model_name,
+                                             legal_domain, language)
+                        question_vector = embed_query(st.session_state.vector_store, user_query, get_query_cache())
+                        cached = answer_cache.lookup(scope, user_query, question_vector,
+                                                     model=embedding_model(st.session_state.vector_store))
                         
-                        result = qa_chain({
-                            "query": user_query,
-                            "legal_domain": legal_domain,
-                            "language": language
-                        })
-                        
-                        response_time = time.time() - start_time
+                        st.markdown("### 🧾 Answer:")
+                        if cached:
+                            result = {
+                                "result": cached["answer"],
+                                "source_documents": records_to_documents(cached["sources"]),
+                                "cached": cached
+                            }
+                            match = ("same question" if cached["exact"]
+                                     else f"similar question ({cached['similarity']:.0%}): “{cached['question']}”")
+                            st.info(f"♻️ Cached answer from {datetime.fromtimestamp(cached['created']):%d %b %H:%M}, {match}")
+                            render_sources(result["source_documents"])
+                            st.write(result["result"])
+                            response_time = first_token_time = time.perf_counter() - start_time
+                        else:
+                            with st.spinner("🔎 Finding the relevant passages..."):
+                                sources = build_retriever(
+                                    st.session_state.vector_store,
+                                    st.session_state.get("lexical_index"),
+                                    st.session_state.get("index_version"),
+                                    statute_library["vectors"] if st.session_state.get("knowledge_base") == "statutes" else None,
+                                    search_depth,
+                                    retrieval_budget_ms
+                                ).get_relevant_documents(user_query)
+                            # Sources are readable while the answer is still being generated
+                            render_sources(sources)
+                            answer_area = st.empty()
+                            answer_area.caption("🧠 AI is analyzing your legal documents...")
+                            answer, timings = stream_answer(
+                                build_llm(model_name, temperature, max_tokens),
+                                legal_prompt_text(user_query, sources, legal_domain, language),
+                                on_text=lambda partial: answer_area.markdown(partial + "▌"),
+                                started=start_time
+                            )
+                            answer_area.markdown(answer)
+                            result = {"result": answer, "source_documents": sources}
+                            first_token_time, response_time = timings["first_token_s"], timings["total_s"]
+                            answer_cache.store(scope, user_query, answer, document_records(sources), question_vector)
                         
                         # Add to chat history
                         st.session_state.chat_history.append({
@@ -686,7 +846,9 @@ Please provide a comprehensive legal analysis:""",
                             "query": user_query,
                             "response": result["result"],
                             "sources": result["source_documents"],
-                            "response_time": response_time
+                            "response_time": response_time,
+                            "first_token_time": first_token_time,
+                            "cached": bool(cached)
                         })
                         
                         # Log analytics safely
@@ -696,12 +858,13 @@ Please provide a comprehensive legal analysis:""",
                                 cursor = conn.cursor()
                                 cursor.execute('''
                                     INSERT INTO query_analytics 
-                                    (timestamp, query, response_time, document_type, user_session, confidence_score)
-                                    VALUES (?, ?, ?, ?, ?, ?)
+                                    (timestamp, query, response_time, first_token_time, document_type, user_session, confidence_score)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?)
                                 ''', (
                                     datetime.now(),
                                     user_query,
                                     response_time,
+                                    first_token_time,
                                     legal_domain,
                                     st.session_state.session_id,
                                     0.85  # Default confidence score
@@ -712,36 +875,22 @@ Please provide a comprehensive legal analysis:""",
                             # Don't break the app if database logging fails
                             pass
                         
-                        return result, response_time
+                        return result, response_time, first_token_time
                     
-                    # Execute chat query safely
-                    with st.spinner("🧠 AI is analyzing your legal documents..."):
-                        chat_result = safe_operation("Chat Query", process_chat_query)
+                    # Execute chat query safely; the answer renders as it streams
+                    chat_result = safe_operation("Chat Query", process_chat_query)
                     
                     if chat_result:
-                        result, response_time = chat_result
-                        
-                        # Display response
-                        st.success("✅ Analysis complete!")
-                        
-                        # Show response
-                        st.markdown("### 🧾 Answer:")
-                        st.write(result["result"])
+                        result, response_time, first_token_time = chat_result
+                        cached = result.get("cached")
                         
                         # Show cost estimate
                         input_tokens = len(user_query.split()) * 1.3
                         output_tokens = len(result["result"].split()) * 1.3
-                        estimated_cost = (input_tokens * 0.00015 + output_tokens * 0.0006) / 1000
-                        
-                        st.caption(f"💸 Response time: {response_time:.2f}s | Estimated cost: ~${estimated_cost:.6f}")
+                        estimated_cost = 0.0 if cached else (input_tokens * 0.00015 + output_tokens * 0.0006) / 1000
                         
-                        # Show sources
-                        with st.expander("📚 Sources & References"):
-                            for j, doc in enumerate(result["source_documents"], 1):
-                                st.markdown(f"**📄 Source {j}:**")
-                                st.text(doc.page_content[:300] + "...")
-                                if j < len(result["source_documents"]):
-                                    st.markdown("---")
+                        st.caption(f"💸 First words: {first_token_time:.2f}s | Response time: {response_time:.2f}s | "
+                                   f"Estimated cost: ~${estimated_cost:.6f}")
                 
                 elif user_query and len(user_query.strip()) <= 5:
                     st.warning("⚠️ Please enter a more detailed question (at least 6 characters).")
@@ -761,7 +910,7 @@ Please provide a comprehensive legal analysis:""",
                             
                             st.markdown(f"""
                             <div class="chat-message ai-message">
-                                <strong>🤖 AI Legal Assistant:</strong><br>
+                                <strong>🤖 AI Legal Assistant{' ♻️ (cached)' if chat.get('cached') else ''}:</strong><br>
                                 {chat['response'][:500]}{'...' if len(chat['response']) > 500 else ''}
                             </div>
                             """, unsafe_allow_html=True)
@@ -794,6 +943,8 @@ Please provide a comprehensive legal analysis:""",
                     with col2:
                         avg_response_time = df['response_time'].mean()
                         st.metric("⚡ Avg Response Time", f"{avg_response_time:.2f}s")
+                        if df['first_token_time'].notna().any():
+                            st.caption(f"First words after {df['first_token_time'].mean():.2f}s on average")
                     with col3:
                         unique_sessions = df['user_session'].nunique()
                         st.metric("👥 Unique Sessions", unique_sessions)
@@ -861,7 +1012,7 @@ Please provide a comprehensive legal analysis:""",
                     
                     # Recent queries table
                     st.subheader("📋 Recent Queries")
-                    recent_queries = df.head(10)[['timestamp', 'query', 'response_time', 'document_type']]
+                    recent_queries = df.head(10)[['timestamp', 'query', 'first_token_time', 'response_time', 'document_type']]
                     recent_queries['query'] = recent_queries['query'].str[:100] + '...'  # Truncate for display
                     st.dataframe(recent_queries, use_container_width=True)
                     
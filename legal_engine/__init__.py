@@ -0,0 +1,16 @@
+"""
+AI Legal Oracle - Processing Engine
+===================================
+Shared ingestion and retrieval machinery used by both Streamlit apps
+(`enhanced_app.py` and `app_enhanced_v2.py`).
+
+Everything in this package is free of Streamlit calls so it can run inside
+worker processes, background threads and offline build scripts.
+"""
+
+from .extraction import extract_pdf_pages, extract_pdf_text
+
+__all__ = [
+    "extract_pdf_pages",
+    "extract_pdf_text",
+]
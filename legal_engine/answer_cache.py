@@ -0,0 +1,261 @@
+"""
+Persistent semantic cache of generated answers.
+
+Users ask the same handful of questions (the quick buttons and suggested
+prompts produce literally identical text) against the same documents all
+day, and every one used to cost a full LLM round trip. `AnswerCache` keeps
+answers in SQLite under a scope of (corpus version, model, legal domain,
+language, prompt kind), so an answer is only reused where the documents
+and the instructions behind it are the same.
+
+A question is served from the cache when, within its scope,
+
+    - its normalized text (NFC, collapsed whitespace, case-folded) matches
+      a cached question exactly, or
+    - its embedding has cosine similarity >= the threshold with a cached
+      question's embedding (a near-duplicate rephrasing) and both questions
+      cite the same numbers, sections and citations.
+
+The second condition matters because embeddings barely register a changed
+number: "punishment under Section 302 IPC" and "... Section 304 IPC" score
+well above any usable threshold but ask about different offences. Each
+question's anchor tokens (numbers with their sub-clauses, e.g. "302",
+"304a", "21(1)(a)", "5.2", and roman-numbered schedules or parts) must match
+exactly for a near-duplicate hit.
+
+How close a paraphrase scores depends on the embedding model, so the
+threshold is looked up per model (`MODEL_THRESHOLDS`) unless the cache is
+given a fixed one.
+
+The embeddings of each scope are loaded once into a matrix, so a
+near-duplicate check is one matrix-vector product. Entries are evicted
+least-recently-used beyond `max_entries`.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .bm25 import _Doc
+from .compat import Document
+from .embedding_cache import normalize_text
+from .extraction_cache import DEFAULT_CACHE_DIR
+from .local_embeddings import LOCAL_MODEL_PREFIX
+
+DEFAULT_MAX_ENTRIES = 20_000
+DEFAULT_THRESHOLD = 0.95
+# Near-duplicate thresholds by embedding model (prefix). ada-002 packs all text
+# into a narrow cone (unrelated questions often score 0.8+), the text-embedding-3
+# models spread paraphrases lower, and hashed n-grams only score reworded
+# questions high when they share almost every word.
+MODEL_THRESHOLDS = {
+    "text-embedding-ada-002": 0.97,
+    "text-embedding-3-small": 0.93,
+    "text-embedding-3-large": 0.92,
+    LOCAL_MODEL_PREFIX: 0.95,
+}
+
+# Numbers (dotted clause numbers included) with trailing letters and bracketed
+# sub-clauses, and roman numerals after a unit word
+_ANCHOR = re.compile(r"\d+(?:\.\d+)*[a-z]*(?:\([0-9a-z]+\))*"
+                     r"|\b(?:part|schedule|chapter|order|article|section)\s+([ivxlcdm]+)\b")
+
+
+def question_key(question: str) -> str:
+    return hashlib.sha256(normalize_text(question).casefold().encode("utf-8")).hexdigest()
+
+
+def anchor_tokens(question: str) -> FrozenSet[str]:
+    """Numbers, section/sub-clause references and roman-numbered parts a question cites"""
+    return frozenset(match.group(1) or match.group()
+                     for match in _ANCHOR.finditer(normalize_text(question).casefold()))
+
+
+def similarity_threshold(model: Optional[str]) -> float:
+    """Near-duplicate threshold for questions embedded with `model`"""
+    for prefix, threshold in MODEL_THRESHOLDS.items():
+        if model and str(model).startswith(prefix):
+            return threshold
+    return DEFAULT_THRESHOLD
+
+
+def answer_scope(corpus_version: str, model: str, domain: str = "", language: str = "", kind: str = "chat") -> str:
+    """Opaque scope under which cached answers may be shared"""
+    payload = "\0".join(str(part) for part in (corpus_version, model, domain, language, kind))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def document_records(docs) -> List[Dict]:
+    """JSON-ready form of source Documents"""
+    return [{"page_content": str(doc.page_content), "metadata": dict(getattr(doc, "metadata", None) or {})}
+            for doc in docs]
+
+
+def records_to_documents(records: List[Dict]) -> List[object]:
+    doc_class = Document or _Doc
+    return [doc_class(page_content=r["page_content"], metadata=r.get("metadata") or {}) for r in records]
+
+
+def _unit(vector) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else None
+
+
+class AnswerCache:
+    """SQLite-backed answers, matched exactly or by question-embedding similarity"""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 threshold: Optional[float] = None):
+        self.path = Path(path) if path else DEFAULT_CACHE_DIR / "answers.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        # None: per embedding model, see similarity_threshold
+        self.threshold = threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # scope -> (row ids, unit question vectors, anchor tokens); loaded on first near-duplicate lookup
+        self._vectors: Dict[str, Tuple[np.ndarray, np.ndarray, List[FrozenSet[str]]]] = {}
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS answers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scope TEXT,
+                    question_key TEXT,
+                    question TEXT,
+                    vector BLOB,
+                    answer TEXT,
+                    sources TEXT,
+                    created REAL,
+                    last_access REAL,
+                    UNIQUE (scope, question_key)
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_access ON answers(last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _scope_vectors(self, conn: sqlite3.Connection,
+                       scope: str) -> Tuple[np.ndarray, np.ndarray, List[FrozenSet[str]]]:
+        with self._lock:
+            cached = self._vectors.get(scope)
+        if cached is None:
+            rows = conn.execute("SELECT id, vector, question FROM answers WHERE scope = ? AND vector IS NOT NULL",
+                                (scope,)).fetchall()
+            ids = np.array([row_id for row_id, _, _ in rows], dtype=np.int64)
+            vectors = [np.frombuffer(blob, dtype=np.float32) for _, blob, _ in rows]
+            # One scope means one embedding model, so every vector has the same length
+            cached = (ids, np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32),
+                      [anchor_tokens(question) for _, _, question in rows])
+            with self._lock:
+                self._vectors[scope] = cached
+        return cached
+
+    def lookup(self, scope: str, question: str, vector=None, model: Optional[str] = None) -> Optional[Dict]:
+        """Cached answer for `question` in `scope`, or None.
+
+        `model` names the embedding model `vector` came from and picks the
+        near-duplicate threshold. Returns {"answer", "sources", "question",
+        "similarity", "exact", "created"}, where `question` is the cached
+        question that matched.
+        """
+        threshold = self.threshold if self.threshold is not None else similarity_threshold(model)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, question, answer, sources, created FROM answers WHERE scope = ? AND question_key = ?",
+                (scope, question_key(question))
+            ).fetchone()
+            similarity, exact = 1.0, True
+            unit = _unit(vector)
+            if row is None and unit is not None:
+                ids, matrix, anchors = self._scope_vectors(conn, scope)
+                if len(ids) and matrix.shape[1] == len(unit):
+                    scores = matrix @ unit
+                    wanted = anchor_tokens(question)
+                    # Best-scoring candidate above the threshold that cites the same sections and numbers
+                    for best in np.flatnonzero(scores >= threshold)[np.argsort(-scores[scores >= threshold])]:
+                        if anchors[best] == wanted:
+                            similarity, exact = float(scores[best]), False
+                            row = conn.execute("SELECT id, question, answer, sources, created FROM answers "
+                                               "WHERE id = ?", (int(ids[best]),)).fetchone()
+                            break
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            conn.execute("UPDATE answers SET last_access = ? WHERE id = ?", (time.time(), row[0]))
+        with self._lock:
+            self.hits += 1
+            self.near_hits += not exact
+        return {"answer": row[2], "sources": json.loads(row[3] or "[]"), "question": row[1],
+                "similarity": similarity, "exact": exact, "created": row[4]}
+
+    def contains(self, scope: str, question: str) -> bool:
+        """Whether `question` is cached verbatim in `scope`; not counted as a lookup"""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM answers WHERE scope = ? AND question_key = ?",
+                                (scope, question_key(question))).fetchone() is not None
+
+    def store(self, scope: str, question: str, answer: str, sources: Optional[List[Dict]] = None, vector=None):
+        """Remember `answer`; `sources` is a JSON-serializable list (e.g. page_content + metadata)"""
+        unit = _unit(vector)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (scope, question_key, question, vector, answer, sources, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (scope, question_key(question), question, unit.tobytes() if unit is not None else None,
+                 answer, json.dumps(sources or [], ensure_ascii=False, default=str), now, now)
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("DELETE FROM answers WHERE id IN "
+                             "(SELECT id FROM answers ORDER BY last_access ASC LIMIT ?)", (excess,))
+        with self._lock:
+            # Reloaded with the new row (and without evicted ones) on the next lookup
+            self._vectors.clear()
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_shared_cache: Optional[AnswerCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache shared by every Streamlit session"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AnswerCache()
+        return _shared_cache
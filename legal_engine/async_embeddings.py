@@ -0,0 +1,256 @@
+"""
+Concurrent OpenAI-compatible embedding client.
+
+`AsyncEmbeddingClient.embed_documents` splits its input into request-sized
+batches and sends up to `max_concurrency` of them at once over one aiohttp
+session. Rate-limit headers (`retry-after`, `x-ratelimit-remaining-*`,
+`x-ratelimit-reset-*`) pause every in-flight worker until the window resets.
+429s, 5xx responses and timeouts are retried with jittered exponential
+backoff. Batches that finished before a call ultimately failed are kept and
+reused when the same texts are submitted again, so a retry resumes instead of
+starting over; at most `RESUME_MAX_VECTORS` such vectors are held, oldest
+dropped first.
+
+The endpoint is configurable (`base_url`, or `OPENAI_BASE_URL`), which lets
+the client run against a local stand-in server.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .compat import Embeddings
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Rough token estimate used to respect the token budget before sending
+CHARS_PER_TOKEN = 4
+# Vectors kept for resuming failed calls; a few ingest batches' worth
+RESUME_MAX_VECTORS = 2048
+
+
+class EmbeddingRequestError(Exception):
+    """A batch could not be embedded after all retries"""
+
+    def __init__(self, message: str, status: Optional[int] = None, completed: int = 0, total: int = 0):
+        super().__init__(message)
+        self.status = status
+        self.completed = completed
+        self.total = total
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from header values like '20ms', '1.5s', '6m0s' or a bare number"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class RateLimitState:
+    """Shared view of the provider's rate-limit window across concurrent workers"""
+
+    def __init__(self):
+        self.pause_until = 0.0
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+
+    def observe(self, headers) -> Optional[float]:
+        """Update from response headers; returns an explicit retry delay if given"""
+        now = time.monotonic()
+        try:
+            if "x-ratelimit-remaining-requests" in headers:
+                self.remaining_requests = int(headers["x-ratelimit-remaining-requests"])
+            if "x-ratelimit-remaining-tokens" in headers:
+                self.remaining_tokens = int(headers["x-ratelimit-remaining-tokens"])
+        except ValueError:
+            pass
+        if self.remaining_requests == 0:
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self.pause_until = max(self.pause_until, now + reset)
+        if self.remaining_tokens == 0:
+            reset = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            if reset:
+                self.pause_until = max(self.pause_until, now + reset)
+        retry_after = parse_duration(headers.get("retry-after-ms"))
+        if retry_after is not None:
+            retry_after /= 1000.0
+        else:
+            retry_after = parse_duration(headers.get("retry-after"))
+        return retry_after
+
+    async def wait(self):
+        delay = self.pause_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _text_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class AsyncEmbeddingClient(Embeddings):
+    """LangChain-compatible embeddings that issue batched requests concurrently"""
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "text-embedding-3-small",
+                 base_url: Optional[str] = None, dimensions: Optional[int] = None,
+                 request_batch_size: int = 32, max_concurrency: int = 4,
+                 max_retries: int = 6, backoff_base: float = 0.5, backoff_cap: float = 30.0,
+                 timeout: float = 60.0):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for AsyncEmbeddingClient")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.model = model
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
+        self.dimensions = dimensions
+        self.request_batch_size = request_batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        # Vectors of batches that completed in a call that later failed
+        self._resume: Dict[str, List[float]] = {}
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "resumed": 0}
+
+    # ---------- request layer ----------
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def _post_batch(self, session, texts: List[str], limits: RateLimitState) -> List[List[float]]:
+        payload = {"model": self.model, "input": texts}
+        if self.dimensions:
+            payload["dimensions"] = self.dimensions
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        estimated_tokens = sum(len(text) for text in texts) // CHARS_PER_TOKEN + 1
+
+        for attempt in range(self.max_retries + 1):
+            await limits.wait()
+            if limits.remaining_tokens is not None and limits.remaining_tokens < estimated_tokens:
+                # Out of token budget for this window: back off briefly before sending
+                await asyncio.sleep(self._backoff(attempt, None))
+            retry_after = None
+            status = None
+            try:
+                self.stats["requests"] += 1
+                async with session.post(f"{self.base_url}/embeddings", json=payload, headers=headers) as resp:
+                    status = resp.status
+                    retry_after = limits.observe(resp.headers)
+                    if status == 200:
+                        body = await resp.json()
+                        data = sorted(body["data"], key=lambda item: item["index"])
+                        return [item["embedding"] for item in data]
+                    detail = await resp.text()
+                    if status not in RETRYABLE_STATUS:
+                        raise EmbeddingRequestError(f"Embedding request failed ({status}): {detail[:200]}", status)
+                    if status == 429:
+                        self.stats["rate_limited"] += 1
+                        if retry_after:
+                            limits.pause_until = max(limits.pause_until, time.monotonic() + retry_after)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                detail = str(e) or type(e).__name__
+            if attempt == self.max_retries:
+                raise EmbeddingRequestError(f"Embedding request failed after {attempt + 1} attempts: {detail[:200]}", status)
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [_text_key(self.model, text) for text in texts]
+        results: List[Optional[List[float]]] = [self._resume.get(key) for key in keys]
+        self.stats["resumed"] += sum(1 for vector in results if vector is not None)
+        pending = [i for i, vector in enumerate(results) if vector is None]
+        batches = [pending[start:start + self.request_batch_size]
+                   for start in range(0, len(pending), self.request_batch_size)]
+        if not batches:
+            return results
+
+        limits = RateLimitState()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async def run(session, batch: List[int]):
+            async with semaphore:
+                vectors = await self._post_batch(session, [texts[i] for i in batch], limits)
+            for i, vector in zip(batch, vectors):
+                results[i] = vector
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            outcomes = await asyncio.gather(*(run(session, batch) for batch in batches), return_exceptions=True)
+
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if errors:
+            # Keep finished batches so resubmitting the same texts resumes from here
+            for key, vector in zip(keys, results):
+                if vector is not None:
+                    self._resume.pop(key, None)
+                    self._resume[key] = vector
+            # Calls that are never resubmitted must not pin their vectors forever
+            for key in list(self._resume)[:max(0, len(self._resume) - RESUME_MAX_VECTORS)]:
+                del self._resume[key]
+            done = sum(1 for vector in results if vector is not None)
+            error = errors[0]
+            if isinstance(error, EmbeddingRequestError):
+                error.completed, error.total = done, len(texts)
+            raise error
+        for key in keys:
+            self._resume.pop(key, None)
+        return results
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    # ---------- synchronous LangChain interface ----------
+    def _run(self, coro):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Called from inside an event loop: run on a private loop in a helper thread
+        outcome = {}
+
+        def target():
+            try:
+                outcome["value"] = asyncio.run(coro)
+            except BaseException as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._run(self.aembed_documents(list(texts)))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._run(self.aembed_query(text))
+
+
+def concurrent_embeddings(fallback: Callable[[], object], api_key: Optional[str] = None,
+                          model: str = "text-embedding-3-small", **kwargs):
+    """`AsyncEmbeddingClient` when aiohttp is installed, otherwise `fallback()`"""
+    if aiohttp is None:
+        return fallback()
+    return AsyncEmbeddingClient(api_key=api_key, model=model, **kwargs)
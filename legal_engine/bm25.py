@@ -0,0 +1,218 @@
+"""
+BM25 lexical retrieval over an inverted index.
+
+Chunks are tokenized once when the index is built, with tokens hashed to
+64-bit term IDs in NumPy (see `token_hashes`). Postings are kept in
+compressed-sparse-row form: for every term, a contiguous run of (chunk id,
+term frequency) pairs in two NumPy arrays, with `indptr` marking where each
+term's run starts. A query touches only the postings of its own terms and
+scores them with vectorized BM25, so latency depends on how common the
+query terms are rather than on the number of chunks, and 100k+ chunks stay
+in the low milliseconds.
+
+This is the retriever used when FAISS is unavailable; it offers the same
+`as_retriever(search_kwargs={"k": ...}).get_relevant_documents(query)`
+surface as a LangChain vector store. `BM25Index.from_vector_store` builds the
+lexical side of hybrid retrieval over a FAISS store's own chunks, keyed by
+docstore ID and reading text back from the docstore instead of copying it.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compat import Document
+
+# Characters tokenized per NumPy pass while building
+BUILD_BATCH_CHARS = 4_000_000
+# Odd 64-bit constants for the polynomial token hash and final mixing
+_BASE = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_word_table: Optional[np.ndarray] = None
+
+
+def _is_word(codes: np.ndarray) -> np.ndarray:
+    """Word characters: letters and digits of any script, plus Devanagari vowel signs"""
+    global _word_table
+    if _word_table is None:
+        table = np.fromiter((chr(c).isalnum() for c in range(0x10000)), dtype=bool, count=0x10000)
+        table[0x900:0x964] = True
+        table[0x966:0x980] = True
+        _word_table = table
+    return np.where(codes < 0x10000, _word_table[np.minimum(codes, 0xFFFF)], False)
+
+
+def token_hashes(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(text index, 64-bit term hash) of every token in `texts`, in order.
+
+    Tokens are maximal runs of word characters in the lowercased text. They
+    are hashed over their UTF-32 code points in one vectorized pass, so no
+    Python string is created per token.
+    """
+    lowered = [text.lower() for text in texts]
+    if not lowered:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint64)
+    codes = np.frombuffer("\0".join(lowered).encode("utf-32-le"), dtype=np.uint32)
+    positions = np.flatnonzero(_is_word(codes))
+    if not len(positions):
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint64)
+    starts = np.ones(len(positions), dtype=bool)
+    starts[1:] = positions[1:] != positions[:-1] + 1
+    first = np.flatnonzero(starts)
+    offset = np.arange(len(positions)) - first[np.cumsum(starts) - 1]
+    powers = np.cumprod(np.full(int(offset.max()) + 1, _BASE, dtype=np.uint64))
+    hashes = np.add.reduceat(codes[positions].astype(np.uint64) * powers[offset], first)
+    lengths = np.diff(np.append(first, len(positions))).astype(np.uint64)
+    hashes = (hashes ^ (lengths * _MIX)) * _MIX
+    hashes ^= hashes >> np.uint64(29)
+    boundaries = np.cumsum([len(text) + 1 for text in lowered])
+    owners = np.searchsorted(boundaries, positions[first], side="right").astype(np.int32)
+    return owners, hashes
+
+
+class _Doc:
+    """Minimal stand-in for a LangChain Document when langchain is not installed"""
+
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, page_content: str, metadata: Optional[Dict] = None):
+        self.page_content = page_content
+        self.metadata = metadata or {}
+
+
+class BM25Index:
+    """Okapi BM25 over an immutable CSR inverted index of chunks"""
+
+    def __init__(self, texts: Sequence[str], metadatas: Optional[Sequence[Dict]] = None,
+                 k1: float = 1.5, b: float = 0.75,
+                 ids: Optional[Sequence[str]] = None, docstore=None):
+        texts = list(texts)
+        self.size = len(texts)
+        self.ids = list(ids) if ids is not None else None
+        self.docstore = docstore
+        self._positions: Optional[Dict[str, int]] = None
+        # With a docstore the chunks are read back from it, so their text is not held twice
+        self.texts = texts if docstore is None else None
+        self.metadatas = None
+        if docstore is None:
+            self.metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        self.k1 = k1
+        self.b = b
+
+        n = self.size
+        pair_chunks, pair_terms, pair_freqs = [], [], []
+        lengths = np.zeros(n, dtype=np.float32)
+        batch_start = 0
+        while batch_start < n:
+            # Batches bound the transient code-point arrays on large corpora
+            batch_stop, chars = batch_start, 0
+            while batch_stop < n and (chars < BUILD_BATCH_CHARS or batch_stop == batch_start):
+                chars += len(texts[batch_stop])
+                batch_stop += 1
+            owners, hashes = token_hashes(texts[batch_start:batch_stop])
+            owners += batch_start
+            lengths += np.bincount(owners, minlength=n).astype(np.float32)
+            # One (term, chunk, frequency) entry per distinct term in each chunk. Tokens
+            # arrive in chunk order, so a stable sort by term leaves chunks ascending.
+            order = np.argsort(hashes, kind="stable")
+            owners, hashes = owners[order], hashes[order]
+            change = np.ones(len(hashes), dtype=bool)
+            change[1:] = (owners[1:] != owners[:-1]) | (hashes[1:] != hashes[:-1])
+            first = np.flatnonzero(change)
+            pair_chunks.append(owners[first])
+            pair_terms.append(hashes[first])
+            pair_freqs.append(np.diff(np.append(first, len(hashes))).astype(np.float32))
+            batch_start = batch_stop
+
+        chunks = np.concatenate(pair_chunks) if pair_chunks else np.zeros(0, dtype=np.int32)
+        hashes = np.concatenate(pair_terms) if pair_terms else np.zeros(0, dtype=np.uint64)
+        freqs = np.concatenate(pair_freqs) if pair_freqs else np.zeros(0, dtype=np.float32)
+        if len(pair_terms) > 1:
+            # Later batches hold later chunks, so a stable merge by term keeps chunks ascending
+            order = np.argsort(hashes, kind="stable")
+            chunks, hashes, freqs = chunks[order], hashes[order], freqs[order]
+        self.postings = chunks.astype(np.int32)
+        self.frequencies = freqs
+        # Sorted distinct term hashes are the vocabulary; a query term is found by binary search
+        starts = np.ones(len(hashes), dtype=bool)
+        starts[1:] = hashes[1:] != hashes[:-1]
+        self.terms = hashes[starts]
+        self.indptr = np.append(np.flatnonzero(starts), len(hashes)).astype(np.int64)
+        counts = np.diff(self.indptr)
+
+        self.idf = np.log1p((n - counts + 0.5) / (counts + 0.5)).astype(np.float32)
+        average = float(lengths.mean()) if n else 0.0
+        # Per-chunk length normalisation, folded into one term of the denominator
+        self.norm = (k1 * (1 - b + b * lengths / (average or 1.0))).astype(np.float32)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], metadatas: Optional[Iterable[Dict]] = None, **kwargs) -> "BM25Index":
+        return cls(list(texts), list(metadatas) if metadatas is not None else None, **kwargs)
+
+    @classmethod
+    def from_vector_store(cls, store, **kwargs) -> "BM25Index":
+        """Index the chunks of a LangChain FAISS store, in index order, keyed by docstore ID"""
+        ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+        texts = [store.docstore.search(doc_id).page_content for doc_id in ids]
+        return cls(texts, ids=ids, docstore=store.docstore, **kwargs)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.terms, self.postings, self.frequencies, self.indptr, self.idf, self.norm))
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[int, float]]:
+        """Top-k (chunk index, score) pairs, best first"""
+        if not self.size or not len(self.terms):
+            return []
+        _, hashes = token_hashes([query])
+        found = np.minimum(np.searchsorted(self.terms, hashes), len(self.terms) - 1)
+        terms, weights = np.unique(found[self.terms[found] == hashes], return_counts=True)
+        if not len(terms):
+            return []
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term, weight in zip(terms, weights):
+            start, stop = self.indptr[term], self.indptr[term + 1]
+            chunks = self.postings[start:stop]
+            tf = self.frequencies[start:stop]
+            # Chunk ids are unique within one term's postings, so a plain fancy-index add is safe
+            scores[chunks] += weight * self.idf[term] * tf * (self.k1 + 1) / (tf + self.norm[chunks])
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def positions(self, ids: Iterable[str]) -> np.ndarray:
+        """Chunk indexes of docstore IDs; for `from_vector_store` indexes these are FAISS positions"""
+        if self._positions is None:
+            self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        return np.array([self._positions[doc_id] for doc_id in ids], dtype=np.int64)
+
+    def document(self, i: int):
+        """The Document for chunk `i`"""
+        if self.docstore is not None:
+            return self.docstore.search(self.ids[i])
+        return (Document or _Doc)(page_content=self.texts[i], metadata=self.metadatas[i])
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[object, float]]:
+        return [(self.document(i), score) for i, score in self.search(query, k)]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[object]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def as_retriever(self, search_kwargs: Optional[Dict] = None) -> "BM25Retriever":
+        return BM25Retriever(self, (search_kwargs or {}).get("k", 4))
+
+
+class BM25Retriever:
+    """Retriever facade matching LangChain's `get_relevant_documents` / `invoke`"""
+
+    def __init__(self, index: BM25Index, k: int = 4):
+        self.index = index
+        self.k = k
+
+    def get_relevant_documents(self, query: str) -> List[object]:
+        return self.index.similarity_search(query, self.k)
+
+    invoke = get_relevant_documents
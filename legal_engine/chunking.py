@@ -0,0 +1,194 @@
+"""
+Structure-aware chunking with provenance.
+
+`StructuredChunker` splits a document at its legal structure (Article,
+Section, Clause, Chapter, Part, Schedule headings and numbered sections such
+as "420. Cheating") and packs consecutive sections into chunks of at most
+`chunk_size` characters. Only a section that is longer than a chunk on its
+own is cut further, at paragraph, line, sentence or word breaks, with
+`chunk_overlap` characters repeated between its pieces.
+
+Every chunk carries where it came from:
+
+    {"doc_id", "page", "page_end", "start", "end", "section"}
+
+`start`/`end` are character offsets into the document's pages joined with
+`joiner` (the text the ingest pipeline keeps per document), `page`/`page_end`
+are 1-based, and `section` is the nearest heading at or before the chunk.
+Pages are consumed as a stream, so only a window of text is held at a time.
+"""
+
+import bisect
+import itertools
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_HEADING_WORDS = (
+    r"ARTICLE|Article|Art\.|SECTION|Section|Sec\.|CLAUSE|Clause|CHAPTER|Chapter|"
+    r"PART|Part|SCHEDULE|Schedule|RULE|Rule|धारा|अनुच्छेद|अध्याय|भाग"
+)
+_LABEL = (
+    r"[ \t]*(?P<label>"
+    rf"(?:{_HEADING_WORDS})\s*[0-9०-९IVXLCDM]+[A-Z]?(?:\([0-9a-z]+\))*"
+    r"|[0-9०-९]{1,3}[A-Z]?\.(?=\s+[A-Zऀ-ॿ])"
+    r")"
+)
+# A heading at the very start of a text
+LABEL_RE = re.compile(_LABEL)
+# A heading after a line break or a sentence/clause end. Starting the match
+# at the separator (a plain character class) lets the regex engine skip
+# ahead quickly; `_headings` discards separators not followed by whitespace.
+HEADING_RE = re.compile(r"[\n.;:]" + _LABEL)
+# Break points tried, in order, when a single section exceeds the chunk size
+_BREAKS = ("\n\n", "\n", ". ", "; ", " ")
+
+Span = Tuple[int, int]
+
+
+class StructuredChunker:
+    """Chunk a stream of pages at legal-structure boundaries, keeping provenance"""
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100,
+                 joiner: str = "\n", window_chunks: int = 8):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.joiner = joiner
+        self.window = chunk_size * window_chunks
+
+    # ---------- span computation ----------
+    def _split_long(self, text: str, start: int, end: int) -> List[Span]:
+        """Cut one oversized section at the best natural breaks"""
+        spans = []
+        while start < end:
+            stop = min(start + self.chunk_size, end)
+            if stop < end:
+                floor = start + self.chunk_size // 2
+                for sep in _BREAKS:
+                    cut = text.rfind(sep, floor, stop)
+                    if cut != -1:
+                        stop = cut + len(sep)
+                        break
+            spans.append((start, stop))
+            if stop >= end:
+                break
+            next_start = max(stop - self.chunk_overlap, start + 1)
+            # Start the overlap on a word boundary
+            space = text.find(" ", next_start, stop)
+            start = space + 1 if space != -1 and self.chunk_overlap else next_start
+        return spans
+
+    def _spans(self, text: str, headings: List[int]) -> List[Span]:
+        bounds = sorted(set([0, len(text)] + headings))
+        spans: List[Span] = []
+        current: Optional[Span] = None
+        for s, e in zip(bounds, bounds[1:]):
+            if current and e - current[0] <= self.chunk_size:
+                current = (current[0], e)
+                continue
+            if current:
+                spans.append(current)
+                current = None
+            if e - s <= self.chunk_size:
+                current = (s, e)
+            else:
+                spans.extend(self._split_long(text, s, e))
+        if current:
+            spans.append(current)
+        return spans
+
+    @staticmethod
+    def _headings(text: str) -> List[Tuple[int, str]]:
+        """(offset, label) of every structural heading in `text`"""
+        found = []
+        first = LABEL_RE.match(text)
+        matches = itertools.chain([first] if first else [], HEADING_RE.finditer(text))
+        for m in matches:
+            start = m.start("label")
+            if m is not first and text[m.start()] != "\n" and m.start() + 1 == start:
+                continue  # "1.2" or "a.m." rather than the end of a sentence
+            found.append((start, " ".join(m.group("label").rstrip(".").split())))
+        return found
+
+    @staticmethod
+    def _strip(text: str, start: int, end: int) -> Span:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    # ---------- streaming ----------
+    def chunks(self, pages: Iterable[str], doc_id: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        buffer = ""
+        base = 0                     # document offset of buffer[0]
+        page_starts: List[int] = []  # document offset where each page begins
+        section = None               # heading in force at the start of the buffer
+        pending = True
+
+        def emit(spans: List[Span], headings: List[Tuple[int, str]]):
+            nonlocal section
+            positions = [pos for pos, _ in headings]
+            for s, e in spans:
+                s, e = self._strip(buffer, s, e)
+                if s >= e:
+                    continue
+                i = bisect.bisect_right(positions, s)
+                if i:
+                    section = headings[i - 1][1]
+                yield buffer[s:e], {
+                    "doc_id": doc_id,
+                    "page": bisect.bisect_right(page_starts, base + s),
+                    "page_end": bisect.bisect_right(page_starts, base + e - 1),
+                    "start": base + s,
+                    "end": base + e,
+                    "section": section,
+                }
+
+        page_iter = iter(pages)
+        while pending:
+            page = next(page_iter, None)
+            if page is None:
+                pending = False
+            else:
+                page_starts.append(base + len(buffer))
+                buffer += page + self.joiner
+                if len(buffer) < self.window:
+                    continue
+            if not buffer.strip():
+                continue
+            headings = self._headings(buffer)
+            spans = self._spans(buffer, [pos for pos, _ in headings])
+            if pending and len(spans) > 1:
+                # The last span may continue on the next page; re-chunk it with more text
+                heading_before = section
+                yield from emit(spans[:-1], headings)
+                carry = spans[-1][0]
+                positions = [pos for pos, _ in headings]
+                i = bisect.bisect_right(positions, carry)
+                section = headings[i - 1][1] if i else heading_before
+                buffer = buffer[carry:]
+                base += carry
+            elif not pending:
+                yield from emit(spans, headings)
+                buffer = ""
+
+    def split_text(self, text: str) -> List[str]:
+        """Drop-in for LangChain splitters: chunk texts only"""
+        return [chunk for chunk, _ in self.chunks([text])]
+
+
+def describe_location(metadata: Optional[Dict]) -> str:
+    """Short human-readable provenance, e.g. 'Constitution.pdf · p. 12-13 · Article 21'"""
+    metadata = metadata or {}
+    parts = []
+    name = metadata.get("doc_id") or metadata.get("source")
+    if name:
+        parts.append(str(name))
+    page, page_end = metadata.get("page"), metadata.get("page_end")
+    if page:
+        parts.append(f"p. {page}" if not page_end or page_end == page else f"p. {page}-{page_end}")
+    if metadata.get("section"):
+        parts.append(metadata["section"])
+    return " · ".join(parts)
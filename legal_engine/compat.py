@@ -0,0 +1,62 @@
+"""
+LangChain import shims.
+
+`enhanced_app.py` runs on the monolithic `langchain` package while
+`app_enhanced_v2.py` prefers the split `langchain_community` packages.
+Engine modules import vector-store and embedding classes from here so they work with either.
+"""
+
+try:
+    from langchain_community.vectorstores import FAISS
+except Exception:
+    try:
+        from langchain.vectorstores import FAISS
+    except Exception:
+        FAISS = None
+
+try:
+    from langchain_core.documents import Document
+except Exception:
+    try:
+        from langchain.schema import Document
+    except Exception:
+        Document = None
+
+try:
+    from langchain_core.retrievers import BaseRetriever
+except Exception:
+    try:
+        from langchain.schema.retriever import BaseRetriever
+    except Exception:
+        BaseRetriever = None
+
+try:
+    from langchain_core.embeddings import Embeddings
+except Exception:
+    try:
+        from langchain.embeddings.base import Embeddings
+    except Exception:
+        Embeddings = object
+
+try:
+    from langchain_openai import OpenAIEmbeddings
+except Exception:
+    try:
+        from langchain.embeddings.openai import OpenAIEmbeddings
+    except Exception:
+        OpenAIEmbeddings = None
+
+try:
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+except Exception:
+    try:
+        from langchain.docstore.in_memory import InMemoryDocstore
+    except Exception:
+        InMemoryDocstore = None
+
+try:
+    import faiss
+except Exception:
+    faiss = None
+
+FAISS_AVAILABLE = FAISS is not None and faiss is not None
@@ -0,0 +1,162 @@
+"""
+One shared vector index over the chunks of many documents.
+
+Document comparison used to build a separate FAISS store per document: one
+set of embedding calls, one index and one query per document per topic.
+`CorpusIndex` keeps every chunk vector in a single contiguous float32 matrix
+in which each document owns one row range, so scoping a search to a set of
+documents is slicing those ranges. `search_grid` embeds any number of
+queries (topics) in one batch, scores them against every selected row with
+one matrix product and takes a per-document top-k within each range,
+giving a (query, document) grid of best passages.
+
+Search is exact (squared L2, like LangChain's default `IndexFlatL2`), which
+is what comparisons over a session's uploads need. `from_vector_store` reuses
+the vectors already in a session's FAISS store, so comparing uploaded
+documents makes no embedding calls for their chunks at all.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CorpusIndex:
+    """Chunk vectors of many documents, one contiguous row range per document"""
+
+    def __init__(self, embeddings, dimension: Optional[int] = None):
+        self.embeddings = embeddings
+        self.dimension = dimension
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+        self.texts: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+
+    @classmethod
+    def from_vector_store(cls, store, key: str = "source") -> "CorpusIndex":
+        """Index of a LangChain FAISS store's chunks, grouped into documents by `metadata[key]`"""
+        embeddings = getattr(store, "embeddings", None) or store.embedding_function
+        n = store.index.ntotal
+        vectors = store.index.reconstruct_n(0, n) if n else np.zeros((0, store.index.d), dtype=np.float32)
+        grouped: Dict[str, List[int]] = {}
+        docs = []
+        for i in range(n):
+            doc = store.docstore.search(store.index_to_docstore_id[i])
+            docs.append(doc)
+            grouped.setdefault(doc.metadata.get(key), []).append(i)
+        index = cls(embeddings, store.index.d)
+        for doc_id, rows in grouped.items():
+            if doc_id is None:
+                continue
+            index.add_vectors(doc_id, vectors[rows], [docs[i].page_content for i in rows],
+                              [docs[i].metadata for i in rows])
+        return index
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.ranges
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add_document(self, doc_id: str, texts: Sequence[str], metadatas: Optional[Sequence[Dict]] = None):
+        """Embed a document's chunks (one batched call) and add them, replacing any previous version"""
+        texts = list(texts)
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32) if texts else None
+        self.add_vectors(doc_id, vectors, texts, metadatas)
+
+    def add_vectors(self, doc_id: str, vectors: Optional[np.ndarray], texts: Sequence[str],
+                    metadatas: Optional[Sequence[Dict]] = None):
+        """Append already-embedded chunks of `doc_id` as one row range"""
+        if doc_id in self.ranges:
+            self.remove_document(doc_id)
+        texts = list(texts)
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+        if not len(self.texts):
+            self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            self.dimension = vectors.shape[1]
+        start = len(self.texts)
+        self._vectors = np.vstack([self._vectors, vectors])
+        self._norms = np.concatenate([self._norms, np.einsum("ij,ij->i", vectors, vectors)])
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas if metadatas is not None else [{} for _ in texts])
+        self.ranges[doc_id] = (start, start + len(texts))
+
+    def remove_document(self, doc_id: str):
+        """Drop a document's rows; later documents' ranges shift down"""
+        start, stop = self.ranges.pop(doc_id)
+        width = stop - start
+        self._vectors = np.delete(self._vectors, np.s_[start:stop], axis=0)
+        self._norms = np.delete(self._norms, np.s_[start:stop])
+        del self.texts[start:stop]
+        del self.metadatas[start:stop]
+        for other, (a, b) in self.ranges.items():
+            if a >= stop:
+                self.ranges[other] = (a - width, b - width)
+
+    def _rows(self, doc_ids: Optional[Iterable[str]]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """(row numbers, owning document number per row, document IDs) for the selected documents"""
+        names = [d for d in dict.fromkeys(self.ranges if doc_ids is None else doc_ids) if d in self.ranges]
+        if not names:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), names
+        spans = [self.ranges[d] for d in names]
+        rows = np.concatenate([np.arange(a, b) for a, b in spans])
+        owners = np.repeat(np.arange(len(names)), [b - a for a, b in spans])
+        return rows, owners, names
+
+    def _distances(self, queries: Sequence[str], rows: np.ndarray) -> np.ndarray:
+        """(queries x rows) squared L2 distances, from one batched embedding call and one matmul"""
+        vectors = np.asarray(self.embeddings.embed_documents(list(queries)), dtype=np.float32)
+        vectors = vectors.reshape(len(queries), -1)
+        distances = self._vectors[rows] @ vectors.T
+        distances *= -2
+        distances += self._norms[rows, None]
+        distances += np.einsum("ij,ij->i", vectors, vectors)
+        return distances.T
+
+    def search(self, query: str, k: int = 4,
+               doc_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, str, float]]:
+        """Nearest k (doc_id, chunk text, distance) among the chunks of `doc_ids` (default: all)"""
+        rows, owners, names = self._rows(doc_ids)
+        if not len(rows):
+            return []
+        distances = self._distances([query], rows)[0]
+        top = np.argsort(distances, kind="stable")[:k]
+        return [(names[owners[i]], self.texts[rows[i]], float(distances[i])) for i in top]
+
+    def search_grid(self, queries: Sequence[str], k: int = 1,
+                    doc_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """{query: {doc_id: nearest k passages}} for every query and selected document.
+
+        Each passage is {"text", "distance", "similarity", "start", "end", "metadata"};
+        similarity is the cosine for unit-length embeddings (1 - distance / 2), and
+        start/end are the passage's character offsets in its document when known.
+        """
+        queries = list(queries)
+        rows, owners, names = self._rows(doc_ids)
+        grid: Dict[str, Dict[str, List[Dict]]] = {q: {name: [] for name in names} for q in queries}
+        if not len(rows) or not queries:
+            return grid
+        distances = self._distances(queries, rows)
+        bounds = np.searchsorted(owners, np.arange(len(names) + 1))
+        for d, name in enumerate(names):
+            a, b = bounds[d], bounds[d + 1]
+            block = distances[:, a:b]
+            # Nearest k of this document for every query at once
+            top = np.argsort(block, axis=1, kind="stable")[:, :k]
+            for q, query in enumerate(queries):
+                for j in top[q]:
+                    row = int(rows[a + j])
+                    metadata = self.metadatas[row]
+                    distance = float(block[q, j])
+                    grid[query][name].append({
+                        "text": self.texts[row],
+                        "distance": distance,
+                        "similarity": 1 - distance / 2,
+                        "start": metadata.get("start"),
+                        "end": metadata.get("end"),
+                        "metadata": metadata,
+                    })
+        return grid
@@ -0,0 +1,178 @@
+"""
+Persistent embedding cache.
+
+Vectors are stored in SQLite keyed by (model name, dimension, SHA-256 of the
+whitespace-normalized chunk text), so the same NDA template, the Constitution
+next to its summary, or a repeated demo upload is only ever embedded once per
+model. `CachedEmbeddings` wraps any LangChain embeddings object and consults
+the cache before calling the API. Entries are evicted least-recently-used
+once the entry budget is exceeded.
+
+Only document chunks are cached here. Queries are one-off free text that
+would crowd chunk vectors out of the LRU budget (and persist what users
+typed); they go straight to the backend and are memoized per process by
+`query_cache` instead.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .compat import Embeddings
+from .extraction_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_MAX_ENTRIES = 500_000
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, collapsed whitespace, stripped"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_key(model: str, dimension: Optional[int], text: str) -> str:
+    payload = f"{model}\0{dimension or 'default'}\0{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU store of float32 vectors"""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else DEFAULT_CACHE_DIR / "embeddings.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    dimension INTEGER,
+                    vector BLOB,
+                    last_access REAL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings(last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Vectors for whichever keys are cached"""
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+        with self._connect() as conn:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                part = keys[start:start + _LOOKUP_BATCH]
+                marks = ",".join("?" * len(part))
+                rows = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", part).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                if rows:
+                    conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                     [(now, key) for key, _ in rows])
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, model: str, dimension: Optional[int], items: Dict[str, List[float]]):
+        now = time.time()
+        rows = [(key, model, dimension or len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for key, vector in items.items()]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dimension, vector, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (excess,)
+                )
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM embeddings")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain embeddings wrapper that only sends cache misses to the backend"""
+
+    def __init__(self, embeddings, cache: Optional[EmbeddingCache] = None,
+                 model: Optional[str] = None, dimension: Optional[int] = None):
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.dimension = dimension or getattr(embeddings, "dimensions", None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.model, self.dimension, text) for text in texts]
+        found = self.cache.get_many(keys)
+        # Embed each distinct missing text once, even if it repeats within the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, self.dimension, fresh)
+            found.update({key: np.asarray(vector, dtype=np.float32) for key, vector in fresh.items()})
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Not persisted: see the module docstring
+        return self.embeddings.embed_query(text)
+
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache shared by every Streamlit session"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache()
+        return _shared_cache
@@ -0,0 +1,307 @@
+"""
+Parallel PDF text extraction.
+
+A PDF is split into page ranges which are extracted across a process pool.
+Each worker parses the document once (the upload is handed over through the
+pool initializer, not with every task; large uploads as a path to a spool
+file each worker memory-maps, so the bytes are never pickled per worker) and
+returns the text of its range.
+Pages are reassembled in document order, either streamed (`open_pdf_pages`)
+or collected (`extract_pdf_pages`), and progress is reported per page.
+
+Parsing goes through a pluggable backend (see `pdf_backends`). Every page
+gets a time budget; a page that times out or raises is skipped (empty text)
+and recorded in the metadata's `page_errors` instead of failing the file.
+Budgets are enforced with SIGALRM, which only works on a main thread, so
+when extraction is driven from a background thread (every Streamlit
+session) the document is opened, classified and parsed in a worker
+process: one worker for documents below `PARALLEL_MIN_PAGES`, where the
+whole file is parsed once, and a full pool only for large ones. Opening the
+file is time-boxed like a page, so a pathological upload cannot hang the
+session before its first page.
+"""
+
+import logging
+import math
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .docx_extraction import open_docx_pages
+from .pdf_backends import (DEFAULT_PAGE_TIMEOUT, PageTimeout, PdfDocument, can_enforce_budget,
+                           choose_backend, classify_document, get_backend, load_selection,
+                           page_budget)
+from .uploads import UploadBuffer, as_upload
+
+# Below this many pages the pool start-up cost outweighs the speed-up
+PARALLEL_MIN_PAGES = 40
+# Upper bound on pages per task; smaller tasks give smoother progress
+MAX_PAGES_PER_TASK = 16
+# Pages sampled to classify a document for backend selection
+CLASSIFY_SAMPLE_PAGES = 3
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+PageError = Tuple[int, str]
+
+# Per-worker state, populated by _init_worker (and _open_in_worker for an isolated worker)
+_worker_buffer: Optional[UploadBuffer] = None
+_worker_document: Optional[PdfDocument] = None
+_worker_timeout: Optional[float] = None
+
+
+def _extract_page(document: PdfDocument, index: int,
+                  timeout: Optional[float]) -> Tuple[str, Optional[str]]:
+    """Text of one page, or ("", reason) if it failed or ran out of time"""
+    try:
+        with page_budget(timeout):
+            return document.page_text(index), None
+    except PageTimeout:
+        return "", f"timed out after {timeout:g}s"
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}"
+
+
+def _open(backend_name: Optional[str], buffer: UploadBuffer, timeout: Optional[float]) -> PdfDocument:
+    """Open the PDF with a backend, under the same budget as one page"""
+    try:
+        with page_budget(timeout):
+            return get_backend(backend_name).open(buffer)
+    except PageTimeout:
+        raise PageTimeout(f"opening the PDF timed out after {timeout:g}s") from None
+
+
+def _init_worker(source: Union[str, bytes], backend_name: Optional[str], timeout: Optional[float]):
+    """Parse the PDF once per worker process; `source` is a spool path or small bytes.
+
+    Without `backend_name` the document is left for `_open_in_worker` to open.
+    """
+    global _worker_buffer, _worker_document, _worker_timeout
+    _worker_buffer = UploadBuffer.from_worker_source(source)
+    _worker_timeout = timeout
+    _worker_document = _open(backend_name, _worker_buffer, timeout) if backend_name else None
+
+
+def _open_in_worker(backend: Optional[str]) -> Tuple[str, int, Dict, Optional[str]]:
+    """Select a backend and open the PDF in an isolated worker, where budgets hold.
+
+    Returns (backend name, page count, title/author, document class); the
+    opened document stays in the worker for the `_extract_range` tasks.
+    """
+    global _worker_document
+    backend_name, _worker_document, document_class = _select_backend(_worker_buffer, backend, _worker_timeout)
+    return backend_name, _worker_document.page_count, _worker_document.metadata(), document_class
+
+
+def _extract_range(start: int, stop: int) -> Tuple[int, List[str], List[PageError]]:
+    """Extract pages [start, stop) in a worker process"""
+    pages, errors = [], []
+    for i in range(start, stop):
+        text, error = _extract_page(_worker_document, i, _worker_timeout)
+        pages.append(text)
+        if error:
+            errors.append((i + 1, error))
+    return start, pages, errors
+
+
+def page_ranges(num_pages: int, workers: int) -> List[Tuple[int, int]]:
+    """Split num_pages into contiguous ranges, roughly four per worker"""
+    if num_pages <= 0:
+        return []
+    size = max(1, min(MAX_PAGES_PER_TASK, math.ceil(num_pages / (workers * 4))))
+    return [(start, min(start + size, num_pages)) for start in range(0, num_pages, size)]
+
+
+def default_workers() -> int:
+    """Number of extraction processes to use"""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _iter_serial(document: PdfDocument, start: int, total: int, done: int,
+                 progress: Optional[ProgressCallback], timeout: Optional[float],
+                 errors: List[PageError]) -> Iterator[str]:
+    for i in range(start, total):
+        text, error = _extract_page(document, i, timeout)
+        if error:
+            errors.append((i + 1, error))
+        done += 1
+        if progress:
+            progress(done, total)
+        yield text
+
+
+def _iter_pool(pool: ProcessPoolExecutor, total: int, workers: int,
+               progress: Optional[ProgressCallback], errors: List[PageError],
+               emitted: List[int]) -> Iterator[str]:
+    """Yield pages in order as the pool's ranges complete; emitted[0] tracks pages yielded"""
+    ready: Dict[int, Tuple[List[str], List[PageError]]] = {}
+    done = 0
+    futures = [pool.submit(_extract_range, start, stop)
+               for start, stop in page_ranges(total, workers)]
+    for future in as_completed(futures):
+        start, texts, range_errors = future.result()
+        ready[start] = (texts, range_errors)
+        done += len(texts)
+        if progress:
+            progress(done, total)
+        # Release every range that is now contiguous with what was yielded
+        while emitted[0] in ready:
+            texts, range_errors = ready.pop(emitted[0])
+            errors.extend(range_errors)
+            for text in texts:
+                emitted[0] += 1
+                yield text
+
+
+def _iter_parallel(buffer: UploadBuffer, backend_name: str, total: int, workers: int,
+                   progress: Optional[ProgressCallback], timeout: Optional[float],
+                   errors: List[PageError], emitted: List[int]) -> Iterator[str]:
+    """Extract across a fresh pool of `workers` processes, each parsing the PDF once"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(buffer.worker_source(), backend_name, timeout)) as pool:
+        yield from _iter_pool(pool, total, workers, progress, errors, emitted)
+
+
+def _select_backend(buffer: UploadBuffer, backend: Optional[str],
+                    timeout: Optional[float] = DEFAULT_PAGE_TIMEOUT) -> Tuple[str, PdfDocument, Optional[str]]:
+    """Open the PDF with the requested backend, or the benchmarked one for its class"""
+    opened = get_backend(backend)
+    document = _open(opened.name, buffer, timeout)
+    if backend:
+        return opened.name, document, None
+    selection = load_selection()
+    if not selection:
+        return opened.name, document, None
+    sample = min(CLASSIFY_SAMPLE_PAGES, document.page_count)
+    chars = sum(len(_extract_page(document, i, timeout)[0]) for i in range(sample))
+    document_class = classify_document(document.page_count, chars, sample)
+    chosen = choose_backend(document_class, selection)
+    if chosen and chosen != opened.name:
+        try:
+            return chosen, _open(chosen, buffer, timeout), document_class
+        except Exception:
+            pass
+    return opened.name, document, document_class
+
+
+def open_pdf_pages(source, workers: Optional[int] = None,
+                   progress: Optional[ProgressCallback] = None,
+                   backend: Optional[str] = None,
+                   page_timeout: Optional[float] = DEFAULT_PAGE_TIMEOUT) -> Tuple[Iterator[str], Dict]:
+    """Open a PDF for streaming: returns (page iterator, metadata).
+
+    Pages are yielded in document order as soon as they and every page before
+    them are extracted, so downstream stages can start on page one while later
+    ranges are still in the pool. `backend` forces a parser; by default the
+    benchmarked winner for the document's class (or the first installed
+    parser) is used. Skipped pages are appended to `metadata["page_errors"]`
+    as (page number, reason) while the iterator runs; if the process pool is
+    unavailable, `metadata["serial_fallback"]` records why pages were
+    extracted on the calling thread instead.
+
+    `source` may be an `UploadBuffer`, bytes, a path or a binary file object;
+    it is wrapped without copying (see `uploads`).
+    """
+    buffer = as_upload(source)
+    workers = workers or default_workers()
+    metadata: Dict = {"page_errors": []}
+
+    def fall_back(e: Exception):
+        # Process pools can be unavailable (sandboxed hosts, broken pools);
+        # finish on this thread rather than failing the upload
+        metadata["serial_fallback"] = f"{type(e).__name__}: {e}"
+        logger.warning("Parallel PDF extraction unavailable, continuing serially: %s", e)
+
+    # Off the main thread a hung page can only be interrupted inside a worker process,
+    # so one worker opens, classifies and (for small documents) parses the whole file
+    isolated: Optional[ProcessPoolExecutor] = None
+    document: Optional[PdfDocument] = None
+    if page_timeout and not can_enforce_budget():
+        try:
+            isolated = ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                                           initargs=(buffer.worker_source(), None, page_timeout))
+            backend_name, total, info, document_class = isolated.submit(_open_in_worker, backend).result()
+        except (OSError, RuntimeError) as e:
+            if isolated is not None:
+                isolated.shutdown(wait=False, cancel_futures=True)
+            isolated = None
+            fall_back(e)
+    if isolated is None:
+        backend_name, document, document_class = _select_backend(buffer, backend, page_timeout)
+        total, info = document.page_count, document.metadata()
+
+    metadata.update({"pages": total, **info, "backend": backend_name})
+    if document_class:
+        metadata["document_class"] = document_class
+    parallel = workers > 1 and total >= PARALLEL_MIN_PAGES
+    if isolated is not None and (parallel or not total):
+        # Large documents get a full pool below; the probe worker's parse is not reused
+        isolated.shutdown(wait=False)
+        isolated = None
+
+    def pages() -> Iterator[str]:
+        nonlocal document
+        emitted = [0]
+        errors = metadata["page_errors"]
+        if isolated is not None or (total and parallel):
+            try:
+                if isolated is not None:
+                    with isolated:
+                        yield from _iter_pool(isolated, total, 1, progress, errors, emitted)
+                else:
+                    yield from _iter_parallel(buffer, backend_name, total, workers, progress,
+                                              page_timeout, errors, emitted)
+                return
+            except (OSError, RuntimeError) as e:
+                fall_back(e)
+        if document is None:
+            document = _open(backend_name, buffer, page_timeout)
+        yield from _iter_serial(document, emitted[0], total, emitted[0], progress, page_timeout, errors)
+
+    iterator = pages()
+    if isolated is not None:
+        # An iterator dropped before it is consumed must not leave its worker running
+        weakref.finalize(iterator, isolated.shutdown, wait=False, cancel_futures=True)
+    return iterator, metadata
+
+
+def extract_pdf_pages(source, workers: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      backend: Optional[str] = None) -> Tuple[List[str], Dict]:
+    """Extract every page of a PDF, in order.
+
+    Returns (pages, metadata) where metadata holds pages/title/author, the
+    parser used and any skipped `page_errors`.
+    `source` may be an `UploadBuffer`, bytes, a path or a binary file object.
+    `progress(done, total)` is called as pages complete.
+    """
+    pages, metadata = open_pdf_pages(source, workers=workers, progress=progress, backend=backend)
+    return list(pages), metadata
+
+
+def extract_pdf_text(source, workers: Optional[int] = None,
+                     progress: Optional[ProgressCallback] = None) -> Tuple[str, Dict]:
+    """Extract a PDF as one string (pages joined by newlines) plus metadata"""
+    pages, metadata = extract_pdf_pages(source, workers=workers, progress=progress)
+    return "\n".join(pages) + ("\n" if pages else ""), metadata
+
+
+def open_document_pages(name: str, source) -> Tuple[Iterator[str], Dict]:
+    """Stream any supported upload (PDF, DOCX, TXT) as a sequence of pages.
+
+    DOCX files are paginated at their own page breaks (see `docx_extraction`);
+    TXT files have no page structure and come back as a single page.
+    """
+    file_type = name.rsplit(".", 1)[-1].lower()
+    if file_type == "pdf":
+        pages, metadata = open_pdf_pages(source)
+        metadata.update({"filename": name, "type": "PDF"})
+        return pages, metadata
+    buffer = as_upload(source)
+    if file_type == "docx":
+        pages, metadata = open_docx_pages(buffer)
+        metadata["filename"] = name
+        return pages, metadata
+    return iter([buffer.text("utf-8")]), {"filename": name, "type": "TXT"}
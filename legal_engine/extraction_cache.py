@@ -0,0 +1,169 @@
+"""
+Persistent, content-addressed cache of extracted document text.
+
+Entries are keyed by the SHA-256 of the uploaded bytes and hold the per-page
+text (zlib-compressed JSON) plus the extraction metadata (pages, title,
+author). The cache lives in a SQLite file so it survives restarts and is
+shared by every server process on the host. A byte budget is enforced with
+least-recently-used eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .extraction import ProgressCallback, open_document_pages, open_pdf_pages
+from .uploads import UploadBuffer
+
+DEFAULT_CACHE_DIR = Path(os.getenv("LEGAL_ORACLE_CACHE_DIR",
+                                   Path(__file__).resolve().parent.parent / ".cache"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(data) -> str:
+    """SHA-256 hex digest of raw upload bytes (bytes, memoryview or UploadBuffer)"""
+    if isinstance(data, UploadBuffer):
+        return data.sha256  # computed once per upload, however many callers ask
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite-backed LRU cache of extracted pages keyed by content hash"""
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else DEFAULT_CACHE_DIR / "extraction.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS extractions (
+                    key TEXT PRIMARY KEY,
+                    pages BLOB,
+                    metadata TEXT,
+                    size INTEGER,
+                    last_access REAL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_access ON extractions(last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Tuple[List[str], Dict]]:
+        """Return (pages, metadata) for a content hash, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT pages, metadata FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        pages = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+        return pages, json.loads(row[1])
+
+    def put(self, key: str, pages: List[str], metadata: Dict):
+        """Store extracted pages, evicting least-recently-used entries over budget"""
+        blob = zlib.compress(json.dumps(pages).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, pages, metadata, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, json.dumps(metadata, default=str), len(blob), time.time())
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+            while total > self.max_bytes:
+                oldest = conn.execute(
+                    "SELECT key, size FROM extractions ORDER BY last_access ASC LIMIT 1"
+                ).fetchone()
+                if oldest is None:
+                    break
+                conn.execute("DELETE FROM extractions WHERE key = ?", (oldest[0],))
+                total -= oldest[1]
+
+    def open_pages(self, name: str, data, progress: Optional[ProgressCallback] = None
+                   ) -> Tuple[Iterator[str], Dict]:
+        """Like `open_document_pages`, but served from the cache when possible.
+
+        On a miss the pages are streamed from the parser as usual and written
+        to the cache once the document has been read to the end.
+        """
+        key = content_hash(data)
+        cached = self.get(key)
+        if cached is not None:
+            pages, metadata = cached
+            if progress:
+                progress(len(pages), len(pages))
+            return iter(pages), dict(metadata, filename=name)
+
+        if name.lower().endswith(".pdf"):
+            pages, metadata = open_pdf_pages(data, progress=progress)
+            metadata.update({"filename": name, "type": "PDF"})
+        else:
+            pages, metadata = open_document_pages(name, data)
+
+        def record() -> Iterator[str]:
+            seen = []
+            for page in pages:
+                seen.append(page)
+                yield page
+            # A timeout may not recur on a less busy host; don't pin the gap in the cache
+            if not any(reason.startswith("timed out") for _, reason in metadata.get("page_errors", [])):
+                self.put(key, seen, metadata)
+
+        return record(), metadata
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process plus on-disk totals"""
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM extractions")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+_shared_cache: Optional[ExtractionCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide cache instance shared by every Streamlit session"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ExtractionCache()
+        return _shared_cache
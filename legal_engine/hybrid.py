@@ -0,0 +1,233 @@
+"""
+Hybrid lexical + vector retrieval with reciprocal-rank fusion.
+
+Dense embeddings find paraphrases but blur exact terms such as section
+numbers, defined words and party names; BM25 finds those but misses
+paraphrases. `HybridRetriever` runs both searches over the same chunks in
+parallel, each returning `fetch_k` candidates, and fuses the two rankings
+with reciprocal-rank fusion (RRF): a chunk scores sum(1 / (rrf_k + rank))
+over the rankings it appears in. RRF needs no score calibration between the
+two retrievers, only ranks, and the fusion is a single `np.unique` +
+`np.bincount` pass.
+
+Both searches share a latency budget. Whatever has finished when the budget
+runs out is fused; if neither has, the first to finish is used on its own,
+so a slow embedding request degrades to keyword results instead of stalling
+the answer.
+
+With `search_type="mmr"` the fused list is kept to `fetch_k` candidates and
+re-ranked for diversity by `mmr.mmr_select`, using the vectors stored in the
+index (or the prebuilt vector matrix) rather than re-embedding them.
+
+Given a `QueryCache` and the store's index version, query embeddings and
+fused result IDs are reused across reruns; results degraded by the budget
+are not cached.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bm25 import BM25Index
+from .compat import BaseRetriever, faiss
+from .mmr import DEFAULT_LAMBDA, mmr_select, stored_vectors
+from .query_cache import QueryCache, normalize_query
+
+DEFAULT_RRF_K = 60
+DEFAULT_BUDGET_MS = 1500.0
+# Searches of concurrent sessions share one pool; a late search finishes here unobserved
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int,
+                           rrf_k: int = DEFAULT_RRF_K) -> List[Tuple[str, float]]:
+    """Top-k (key, fused score) over best-first rankings of keys, best first.
+
+    Ties are broken by the best rank the key reached in any ranking.
+    """
+    rankings = [ranking for ranking in rankings if len(ranking)]
+    if not rankings:
+        return []
+    keys = np.concatenate([np.asarray(ranking, dtype=object) for ranking in rankings])
+    ranks = np.concatenate([np.arange(1, len(ranking) + 1) for ranking in rankings])
+    unique, inverse = np.unique(keys, return_inverse=True)
+    scores = np.bincount(inverse, weights=1.0 / (rrf_k + ranks), minlength=len(unique))
+    best = np.full(len(unique), ranks.max() + 1)
+    np.minimum.at(best, inverse, ranks)
+    top = np.lexsort((best, -scores))[:k]
+    return [(unique[i], float(scores[i])) for i in top]
+
+
+def embedding_model(store) -> Optional[str]:
+    """Name of the embedding model behind a LangChain FAISS store (None for a BM25 index)"""
+    if isinstance(store, BM25Index):
+        return None
+    embeddings = getattr(store, "embeddings", None) or store.embedding_function
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+def _model_name(store) -> str:
+    embeddings = getattr(store, "embeddings", None) or store.embedding_function
+    return f"{embedding_model(store)}:{getattr(embeddings, 'dimension', None) or getattr(embeddings, 'dimensions', '')}"
+
+
+def embed_query(store, query: str, cache: Optional[QueryCache] = None) -> Optional[np.ndarray]:
+    """Query vector for a LangChain FAISS store, through `cache` when given (None for a BM25 index)"""
+    if isinstance(store, BM25Index):
+        return None
+    key = cache.embedding_key(_model_name(store), query) if cache is not None else None
+    vector = cache.get(key) if key else None
+    if vector is None:
+        embed = getattr(store, "_embed_query", None)
+        text = normalize_query(query) if key else query
+        vector = np.asarray(embed(text) if embed else store.embedding_function.embed_query(text), dtype=np.float32)
+        if key:
+            cache.put(key, vector)
+    return vector
+
+
+def vector_ranking(store, query: str, fetch_k: int, cache: Optional[QueryCache] = None) -> List[str]:
+    """Docstore IDs of a LangChain FAISS store's nearest chunks, best first"""
+    vector = embed_query(store, query, cache)[None].copy()
+    if getattr(store, "_normalize_L2", False) and faiss is not None:
+        faiss.normalize_L2(vector)
+    _, positions = store.index.search(vector, min(fetch_k, store.index.ntotal))
+    return [store.index_to_docstore_id[int(i)] for i in positions[0] if i >= 0]
+
+
+def lexical_ranking(index: BM25Index, query: str, fetch_k: int) -> List[str]:
+    """Docstore IDs of the best BM25 matches, best first"""
+    return [index.ids[i] for i, _ in index.search(query, fetch_k)]
+
+
+def _timed(search, *args):
+    started = time.perf_counter()
+    ranking = search(*args)
+    return ranking, (time.perf_counter() - started) * 1000
+
+
+def hybrid_search(store, lexical: BM25Index, query: str, k: int = 4, fetch_k: int = 20,
+                  rrf_k: int = DEFAULT_RRF_K,
+                  budget_ms: Optional[float] = DEFAULT_BUDGET_MS,
+                  cache: Optional[QueryCache] = None,
+                  index_version: Optional[str] = None,
+                  search_type: str = "similarity",
+                  lambda_mult: float = DEFAULT_LAMBDA,
+                  vectors: Optional[np.ndarray] = None) -> Tuple[List[object], Dict]:
+    """(fused Documents, stats) for `query` over a FAISS store and its BM25 index.
+
+    `vectors` is the store's embedding matrix in index order, if one is kept
+    (the prebuilt library's memory map); otherwise MMR reconstructs from the index.
+    """
+    started = time.perf_counter()
+    key = None
+    if cache is not None and index_version is not None:
+        key = cache.results_key(index_version, f"hybrid-{search_type}", query, k, fetch_k, rrf_k,
+                                lambda_mult if search_type == "mmr" else None)
+        ids = cache.get(key)
+        if ids is not None:
+            docs = [store.docstore.search(doc_id) for doc_id in ids]
+            return docs, {"cached": True, "late": [], "failed": [],
+                          "total_ms": (time.perf_counter() - started) * 1000}
+    futures = {
+        _executor.submit(_timed, vector_ranking, store, query, fetch_k, cache): "vector",
+        _executor.submit(_timed, lexical_ranking, lexical, query, fetch_k): "lexical",
+    }
+    done, pending = wait(futures, timeout=budget_ms / 1000 if budget_ms else None)
+    if not done:
+        done, pending = wait(futures, return_when=FIRST_COMPLETED)
+
+    stats = {"late": sorted(futures[f] for f in pending), "failed": []}
+    rankings, error = [], None
+    for future in done:
+        try:
+            ranking, elapsed = future.result()
+        except Exception as e:
+            stats["failed"].append(futures[future])
+            error = error or e
+            continue
+        rankings.append(ranking)
+        stats[f"{futures[future]}_ms"] = elapsed
+    if not rankings:
+        if pending:
+            # The only finished search failed; fall back to the other one however long it takes
+            rankings = [future.result()[0] for future in pending]
+        else:
+            raise error
+
+    fused = reciprocal_rank_fusion(rankings, fetch_k if search_type == "mmr" else k, rrf_k)
+    ids = [doc_id for doc_id, _ in fused[:k]]
+    if search_type == "mmr" and len(fused) > k:
+        mmr_started = time.perf_counter()
+        pool = stored_vectors(store.index, lexical.positions(doc_id for doc_id, _ in fused), vectors)
+        if pool is not None:
+            picks = mmr_select([score for _, score in fused], pool, k, lambda_mult)
+            ids = [fused[i][0] for i in picks]
+        stats["mmr_ms"] = (time.perf_counter() - mmr_started) * 1000
+    if key is not None and not stats["late"] and not stats["failed"]:
+        cache.put(key, ids)
+    stats["cached"] = False
+    stats["total_ms"] = (time.perf_counter() - started) * 1000
+    return [store.docstore.search(doc_id) for doc_id in ids], stats
+
+
+if BaseRetriever is not None:
+    _RetrieverBase = BaseRetriever
+else:
+    class _RetrieverBase:
+        """Keyword-constructed stand-in when langchain is not installed"""
+
+        def __init__(self, **fields):
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+        def invoke(self, query: str) -> List[object]:
+            return self._get_relevant_documents(query, run_manager=None)
+
+
+class HybridRetriever(_RetrieverBase):
+    """LangChain retriever fusing a FAISS store with its BM25 index; `stats` holds the last search"""
+
+    vector_store: Any = None
+    lexical: Any = None
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = DEFAULT_RRF_K
+    budget_ms: Optional[float] = DEFAULT_BUDGET_MS
+    cache: Any = None
+    index_version: Optional[str] = None
+    search_type: str = "similarity"
+    lambda_mult: float = DEFAULT_LAMBDA
+    vectors: Any = None
+    stats: Optional[Dict] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[object]:
+        docs, self.stats = hybrid_search(self.vector_store, self.lexical, query, self.k,
+                                         max(self.fetch_k, self.k), self.rrf_k, self.budget_ms,
+                                         self.cache, self.index_version,
+                                         self.search_type, self.lambda_mult, self.vectors)
+        return docs
+
+    if not hasattr(_RetrieverBase, "get_relevant_documents"):
+        def get_relevant_documents(self, query: str) -> List[object]:
+            return self.invoke(query)
+
+
+def make_retriever(store, lexical: Optional[BM25Index] = None, k: int = 4, fetch_k: Optional[int] = None,
+                   budget_ms: Optional[float] = DEFAULT_BUDGET_MS,
+                   cache: Optional[QueryCache] = None, index_version: Optional[str] = None,
+                   search_type: str = "similarity", lambda_mult: float = DEFAULT_LAMBDA,
+                   vectors: Optional[np.ndarray] = None):
+    """Hybrid retriever over `store` and its BM25 index, or the store's own retriever without one.
+
+    With `cache` and `index_version`, repeated queries skip embedding and search;
+    `search_type="mmr"` diversifies the top k out of `fetch_k` fused candidates.
+    """
+    if isinstance(store, BM25Index) or lexical is None or lexical.ids is None:
+        return store.as_retriever(search_kwargs={"k": k})
+    return HybridRetriever(vector_store=store, lexical=lexical, k=k,
+                           fetch_k=fetch_k or max(20, 5 * k), budget_ms=budget_ms,
+                           cache=cache, index_version=index_version,
+                           search_type=search_type, lambda_mult=lambda_mult, vectors=vectors)
@@ -0,0 +1,114 @@
+"""
+Incremental index maintenance.
+
+A `DocumentRegistry` remembers which uploads are in a session's vector store
+(by content hash) and which chunk IDs each one contributed. Syncing the
+registry against the current set of uploads extracts and embeds only new or
+changed files and deletes the chunks of files that were removed, instead of
+rebuilding the whole store. Chunk IDs are derived from the document's content
+hash, so an unchanged document keeps the same IDs across syncs.
+"""
+
+import hashlib
+from typing import Dict, List, Tuple
+
+from .bm25 import BM25Index
+from .extraction_cache import content_hash
+
+
+class DocumentRegistry:
+    """Tracks the documents indexed in one vector store"""
+
+    def __init__(self):
+        # name -> {"sha256": str, "words": int, "chunk_ids": [str], "chunks": [str], "metadatas": [dict]}
+        # (chunks and metadatas are kept in fallback mode only)
+        self.documents: Dict[str, Dict] = {}
+        # Embedding model the indexed vectors came from
+        self.embedding_model = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.documents
+
+    def total_chunks(self) -> int:
+        return sum(len(doc["chunk_ids"]) for doc in self.documents.values())
+
+    def total_words(self) -> int:
+        return sum(doc.get("words", 0) for doc in self.documents.values())
+
+    def corpus_version(self) -> str:
+        """Content-derived identifier of the indexed set; stable across restarts"""
+        digest = hashlib.sha256(str(self.embedding_model).encode())
+        for sha in sorted(doc["sha256"] for doc in self.documents.values()):
+            digest.update(sha.encode())
+        return digest.hexdigest()[:16]
+
+    def plan(self, uploads: Dict[str, bytes]) -> Tuple[List[str], List[str]]:
+        """Return (names to ingest, names to drop) to match `uploads`.
+
+        A file whose content changed under the same name appears in both.
+        """
+        to_add = [name for name, data in uploads.items()
+                  if self.documents.get(name, {}).get("sha256") != content_hash(data)]
+        to_drop = [name for name in self.documents if name not in uploads or name in to_add]
+        return to_add, to_drop
+
+    def remove(self, vector_store, names: List[str]):
+        """Delete the chunks of `names` from the store and forget them"""
+        ids = []
+        for name in names:
+            doc = self.documents.pop(name, None)
+            if doc:
+                ids.extend(doc["chunk_ids"])
+        if vector_store is not None and hasattr(vector_store, "delete") and ids:
+            vector_store.delete(ids)
+        return vector_store
+
+    def record(self, ingest: Dict):
+        """Register the documents a pipeline run indexed"""
+        # Without a vector store (FAISS unavailable) chunk text is kept here
+        # for the fallback retriever
+        texts_by_id = ingest["texts_by_id"]
+        metadatas_by_id = ingest.get("metadatas_by_id", {})
+        for name, ids in ingest["chunk_ids"].items():
+            self.documents[name] = {
+                "sha256": ingest["hashes"][name],
+                "words": ingest.get("words", {}).get(name, 0),
+                "chunk_ids": ids,
+                "chunks": [texts_by_id[i] for i in ids if i in texts_by_id],
+                "metadatas": [metadatas_by_id.get(i, {}) for i in ids if i in texts_by_id],
+            }
+
+    def fallback_texts(self) -> List[str]:
+        return [chunk for doc in self.documents.values() for chunk in doc["chunks"]]
+
+    def fallback_index(self) -> BM25Index:
+        """BM25 index over the kept chunk texts, for sessions without FAISS"""
+        metadatas = [meta for doc in self.documents.values()
+                     for meta in doc.get("metadatas") or [{}] * len(doc["chunks"])]
+        return BM25Index(self.fallback_texts(), metadatas)
+
+    def sync(self, pipeline, uploads: Dict[str, bytes], vector_store=None,
+             progress=None) -> Tuple[object, Dict, List[str]]:
+        """Bring `vector_store` in line with `uploads`, touching only the delta.
+
+        Returns (vector_store, ingest result for the added files, removed names).
+        """
+        model = getattr(pipeline.embeddings, "model", None)
+        if self.documents and model != self.embedding_model:
+            # Vectors from different models can't share an index: re-embed everything
+            self.documents.clear()
+            vector_store = None
+        self.embedding_model = model
+        to_add, to_drop = self.plan(uploads)
+        vector_store = self.remove(vector_store, to_drop)
+        removed = [name for name in to_drop if name not in to_add]
+        if not self.documents:
+            vector_store = None
+        ingest = pipeline.run(((name, uploads[name]) for name in to_add),
+                              progress=progress, vector_store=vector_store)
+        if ingest["failed_chunk_ids"] and ingest["vector_store"] is not None:
+            ingest["vector_store"].delete(ingest["failed_chunk_ids"])
+        self.record(ingest)
+        if ingest["vector_store"] is not None:
+            vector_store = ingest["vector_store"]
+        return vector_store, ingest, removed
@@ -0,0 +1,133 @@
+"""
+One-pass multi-pattern keyword location.
+
+Risk scoring, the document summary's legal-term counts and topic comparison
+each used to scan a document once per keyword (`text.lower().count(k)` or
+`.find(k)`), lowercasing the whole text on every call. `KeywordMatcher`
+compiles all of their dictionaries once and reports every occurrence of
+every pattern, with character offsets into the original text, from a
+single scan per document over the text lowercased once.
+
+The result is what an Aho–Corasick automaton would report (all matches,
+including patterns nested in or overlapping others), but the scan itself
+is done by the C regex engine over one alternation, longest pattern first,
+which in CPython is much faster than a per-character automaton. That scan
+returns non-overlapping matches; the occurrences it skips are recovered
+from tables built at compile time:
+
+    - patterns contained in a matched pattern (e.g. "clause" inside
+      "termination clause") are emitted at their fixed offsets;
+    - patterns that start inside a match and run past its end (a suffix of
+      the match is a prefix of the pattern) are checked in place.
+
+Matching is substring matching, like the `str.count` calls it replaces, so
+"notice" also counts inside "noticed".
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+RISK_KEYWORDS = {
+    'high': ['fraud', 'criminal', 'penalty', 'termination', 'illegal', 'breach', 'void', 'forfeit', 'liability'],
+    'medium': ['dispute', 'arbitration', 'notice', 'delay', 'amendment', 'compliance', 'audit', 'review'],
+    'low': ['agreement', 'party', 'payment', 'service', 'duration', 'jurisdiction', 'clause', 'contract']
+}
+
+LEGAL_TERMS = [
+    "contract", "agreement", "liability", "clause", "provision", "party",
+    "defendant", "plaintiff", "jurisdiction", "compliance", "violation",
+    "breach", "damages", "penalty", "regulation", "statute", "law"
+]
+
+COMPARISON_TOPICS = ["Termination Clause", "Payment Terms", "Confidentiality",
+                     "Liability", "Duration", "Jurisdiction"]
+
+
+class KeywordMatcher:
+    """Every occurrence of a fixed set of case-insensitive patterns, in one scan"""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        # group name -> its patterns (case-folded), in the order given
+        self.groups: Dict[str, List[str]] = {
+            name: list(dict.fromkeys(p.lower() for p in patterns if p)) for name, patterns in groups.items()
+        }
+        self.patterns = sorted({p for patterns in self.groups.values() for p in patterns},
+                               key=lambda p: (-len(p), p))
+        alternation = "|".join(map(re.escape, self.patterns))
+        self._regex = re.compile(alternation) if self.patterns else None
+        # Used only for the rare texts whose lowercase form has a different length
+        self._regex_ignorecase = re.compile(alternation, re.IGNORECASE) if self.patterns else None
+        self._single = {p: re.compile(re.escape(p), re.IGNORECASE) for p in self.patterns}
+        # pattern -> (offset, other pattern) of every other pattern occurring inside it
+        self._inside: Dict[str, List[Tuple[int, str]]] = {}
+        # pattern -> (offset, other pattern) where the other pattern starts inside it and runs past its end
+        self._across: Dict[str, List[Tuple[int, str]]] = {}
+        for outer in self.patterns:
+            inside, across = [], []
+            for inner in self.patterns:
+                for offset in range(len(outer)):
+                    if offset == 0 and inner == outer:
+                        continue
+                    tail = outer[offset:]
+                    if len(inner) <= len(tail):
+                        if tail.startswith(inner):
+                            inside.append((offset, inner))
+                    elif inner.startswith(tail) and offset > 0:
+                        across.append((offset, inner))
+            self._inside[outer] = inside
+            self._across[outer] = across
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """{pattern: ascending start offsets in `text`} for every pattern (empty lists included)"""
+        found: Dict[str, List[int]] = {p: [] for p in self.patterns}
+        if self._regex is None or not text:
+            return found
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            # Offsets in the lowercased text are offsets in the original
+            regex, subject = self._regex, lowered
+        else:
+            # A few letters (e.g. "İ") lowercase to two characters; match the original instead
+            regex, subject = self._regex_ignorecase, text
+        for match in regex.finditer(subject):
+            start = match.start()
+            pattern = match.group().lower()
+            if pattern not in found:
+                pattern = next(p for p in self.patterns if self._single[p].fullmatch(match.group()))
+            found[pattern].append(start)
+            for offset, inner in self._inside[pattern]:
+                found[inner].append(start + offset)
+            for offset, other in self._across[pattern]:
+                if self._single[other].match(subject, start + offset):
+                    found[other].append(start + offset)
+        for positions in found.values():
+            positions.sort()
+        return found
+
+    def counts(self, found: Dict[str, List[int]], group: Optional[str] = None) -> Dict[str, int]:
+        """{pattern: occurrences} from a `scan` result, for one group's patterns (default: all)"""
+        patterns = self.patterns if group is None else self.groups[group]
+        return {p: len(found[p]) for p in patterns}
+
+
+def build_matcher(extra: Optional[Mapping[str, Sequence[str]]] = None) -> KeywordMatcher:
+    """Matcher over the risk, legal-term and topic dictionaries (plus any `extra` groups)"""
+    groups: Dict[str, Sequence[str]] = {f"risk_{level}": words for level, words in RISK_KEYWORDS.items()}
+    groups["legal_terms"] = LEGAL_TERMS
+    groups["topics"] = COMPARISON_TOPICS
+    groups.update(extra or {})
+    return KeywordMatcher(groups)
+
+
+_shared_matcher: Optional[KeywordMatcher] = None
+_shared_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Process-wide matcher over the built-in dictionaries, compiled on first use"""
+    global _shared_matcher
+    with _shared_lock:
+        if _shared_matcher is None:
+            _shared_matcher = build_matcher()
+        return _shared_matcher
@@ -0,0 +1,94 @@
+"""
+Local CPU embeddings.
+
+`HashedNgramEmbeddings` turns text into fixed-size vectors without a model
+download or network call: character n-grams and whole words are hashed into
+`dimensions` signed buckets (the "hashing trick"), counts are damped with
+log1p and the result is L2-normalized, so FAISS inner-product and L2 searches
+rank by cosine similarity. The n-gram hashes are computed with NumPy over the
+text's code points, and the mapping is fixed (no fitting step), which keeps
+vectors stable across sessions, incremental syncs and the prebuilt index.
+
+Quality is below a neural model but good for lexical-heavy legal retrieval
+(section numbers, defined terms, statute names), and it is fast enough to
+embed large corpora in seconds.
+"""
+
+import re
+import unicodedata
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+from .compat import Embeddings
+
+LOCAL_MODEL_PREFIX = "local-hashed-ngram"
+# Bump when the feature mapping changes so cached/prebuilt vectors are not mixed
+LOCAL_MODEL_VERSION = 1
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Odd 64-bit constants for polynomial rolling hashes and final mixing
+_BASE = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _ngram_hashes(codes: np.ndarray, n: int) -> np.ndarray:
+    """64-bit polynomial hash of every length-n window of `codes`"""
+    windows = len(codes) - n + 1
+    if windows <= 0:
+        return np.empty(0, dtype=np.uint64)
+    h = np.full(windows, np.uint64(n), dtype=np.uint64)
+    for k in range(n):
+        h = h * _BASE + codes[k:k + windows]
+    return h
+
+
+class HashedNgramEmbeddings(Embeddings):
+    """Deterministic feature-hashed character n-gram and word embeddings"""
+
+    def __init__(self, dimensions: int = 768, ngram_range: Tuple[int, int] = (3, 5),
+                 word_weight: float = 2.0):
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.word_weight = word_weight
+        low, high = ngram_range
+        self.model = f"{LOCAL_MODEL_PREFIX}-v{LOCAL_MODEL_VERSION}-{low}{high}"
+
+    def _buckets(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        mixed = (hashes ^ (hashes >> np.uint64(31))) * _MIX
+        index = (mixed >> np.uint64(1)) % np.uint64(self.dimensions)
+        sign = np.where(mixed & np.uint64(1), 1.0, -1.0)
+        return index.astype(np.intp), sign
+
+    def _embed(self, text: str) -> np.ndarray:
+        text = re.sub(r"\s+", " ", unicodedata.normalize("NFC", text).lower()).strip()
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        if not text:
+            return vector.astype(np.float32)
+
+        codes = np.frombuffer(f" {text} ".encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            index, sign = self._buckets(_ngram_hashes(codes, n))
+            vector += np.bincount(index, weights=sign, minlength=self.dimensions)
+
+        words = _WORD_RE.findall(text)
+        if words:
+            hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words),
+                                 dtype=np.uint64, count=len(words))
+            index, sign = self._buckets(hashes | np.uint64(1 << 40))
+            vector += self.word_weight * np.bincount(index, weights=sign, minlength=self.dimensions)
+
+        # Sublinear term frequency, keeping the hash sign
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text).tolist()
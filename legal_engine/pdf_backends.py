@@ -0,0 +1,311 @@
+"""
+Pluggable PDF parsing backends.
+
+Every backend opens a PDF from an `UploadBuffer` (or bytes) and returns the text of one page at a
+time, so the extraction layer can time-box pages individually and skip the
+ones that fail instead of losing the whole file:
+
+    pypdf2    PyPDF2 (the original parser; always installed)
+    pypdf     pypdf, PyPDF2's maintained successor
+    pdfminer  pdfminer.six layout analysis (slow, robust on odd encodings)
+    pymupdf   MuPDF bindings (fast C parser)
+
+`get_backend()` resolves a name (or `LEGAL_ORACLE_PDF_BACKEND`, or the first
+installed backend in `DEFAULT_ORDER`). `choose_backend()` additionally
+consults the per-document-class winners written by
+`benchmarks/bench_pdf_backends.py`.
+"""
+
+import json
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Type, Union
+
+from .uploads import UploadBuffer, as_upload
+
+DEFAULT_ORDER = ("pypdf2", "pypdf", "pymupdf", "pdfminer")
+# Seconds one page may take before it is skipped
+DEFAULT_PAGE_TIMEOUT = 20.0
+# Winners per document class, written to the cache dir by benchmarks/bench_pdf_backends.py
+SELECTION_FILE = "pdf_backends.json"
+
+# Document classes used for backend selection
+SCANNED_CHARS_PER_PAGE = 40
+LONG_DOCUMENT_PAGES = 100
+
+
+class PageTimeout(Exception):
+    """A page exceeded its time budget"""
+
+
+class PdfDocument:
+    """An opened PDF: page count, metadata and per-page text"""
+
+    page_count = 0
+
+    def metadata(self) -> Dict:
+        return {"title": "", "author": ""}
+
+    def page_text(self, index: int) -> str:
+        raise NotImplementedError
+
+
+class PdfBackend:
+    """Factory for `PdfDocument`s of one parsing library"""
+
+    name = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        raise NotImplementedError
+
+    @classmethod
+    def open(cls, source: Union[UploadBuffer, bytes]) -> PdfDocument:
+        """Open without copying: parsers read a stream over the shared buffer"""
+        raise NotImplementedError
+
+
+# ---------- PyPDF2 / pypdf (same API) ----------
+class _ReaderDocument(PdfDocument):
+    def __init__(self, reader):
+        self.reader = reader
+        self.page_count = len(reader.pages)
+
+    def metadata(self) -> Dict:
+        info = {"title": "", "author": ""}
+        try:
+            if self.reader.metadata:
+                for key, name in (("title", "/Title"), ("author", "/Author")):
+                    value = self.reader.metadata.get(name)
+                    # Entries may be indirect references into the open file; resolve
+                    # them to plain strings so metadata pickles out of worker processes
+                    if hasattr(value, "get_object"):
+                        value = value.get_object()
+                    info[key] = str(value or "")
+        except Exception:
+            pass
+        return info
+
+    def page_text(self, index: int) -> str:
+        return self.reader.pages[index].extract_text() or ""
+
+
+class PyPDF2Backend(PdfBackend):
+    name = "pypdf2"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import PyPDF2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @classmethod
+    def open(cls, source: Union[UploadBuffer, bytes]) -> PdfDocument:
+        from PyPDF2 import PdfReader
+        return _ReaderDocument(PdfReader(as_upload(source).stream()))
+
+
+class PypdfBackend(PdfBackend):
+    name = "pypdf"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import pypdf  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @classmethod
+    def open(cls, source: Union[UploadBuffer, bytes]) -> PdfDocument:
+        from pypdf import PdfReader
+        return _ReaderDocument(PdfReader(as_upload(source).stream()))
+
+
+# ---------- pdfminer.six ----------
+class _PdfminerDocument(PdfDocument):
+    def __init__(self, buffer: UploadBuffer):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        self._stream = buffer.stream()
+        self.document = PDFDocument(PDFParser(self._stream))
+        self.pages = list(PDFPage.create_pages(self.document))
+        self.page_count = len(self.pages)
+
+    def metadata(self) -> Dict:
+        info = {"title": "", "author": ""}
+        for entry in self.document.info or []:
+            for key in ("title", "author"):
+                value = entry.get(key.capitalize())
+                if isinstance(value, bytes):
+                    value = value.decode("utf-8", errors="ignore")
+                if value and not info[key]:
+                    info[key] = str(value)
+        return info
+
+    def page_text(self, index: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+
+        out = StringIO()
+        manager = PDFResourceManager()
+        device = TextConverter(manager, out, laparams=LAParams())
+        try:
+            PDFPageInterpreter(manager, device).process_page(self.pages[index])
+        finally:
+            device.close()
+        return out.getvalue()
+
+
+class PdfminerBackend(PdfBackend):
+    name = "pdfminer"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import pdfminer.pdfdocument  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @classmethod
+    def open(cls, source: Union[UploadBuffer, bytes]) -> PdfDocument:
+        return _PdfminerDocument(as_upload(source))
+
+
+# ---------- PyMuPDF ----------
+def _import_pymupdf():
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf  # releases before 1.24.3
+    return pymupdf
+
+
+class _MuPdfDocument(PdfDocument):
+    def __init__(self, buffer: UploadBuffer):
+        pymupdf = _import_pymupdf()
+        if buffer.path:
+            # MuPDF reads the file itself instead of taking a Python buffer
+            self.document = pymupdf.open(buffer.path, filetype="pdf")
+        else:
+            self.document = pymupdf.open(stream=buffer.bytes(), filetype="pdf")
+        self.page_count = self.document.page_count
+
+    def metadata(self) -> Dict:
+        meta = self.document.metadata or {}
+        return {"title": meta.get("title") or "", "author": meta.get("author") or ""}
+
+    def page_text(self, index: int) -> str:
+        return self.document.load_page(index).get_text() or ""
+
+
+class PyMuPdfBackend(PdfBackend):
+    name = "pymupdf"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            _import_pymupdf()
+            return True
+        except ImportError:
+            return False
+
+    @classmethod
+    def open(cls, source: Union[UploadBuffer, bytes]) -> PdfDocument:
+        return _MuPdfDocument(as_upload(source))
+
+
+PDF_BACKENDS: Dict[str, Type[PdfBackend]] = {
+    backend.name: backend
+    for backend in (PyPDF2Backend, PypdfBackend, PdfminerBackend, PyMuPdfBackend)
+}
+
+
+def available_backends() -> List[str]:
+    return [name for name in DEFAULT_ORDER if PDF_BACKENDS[name].available()]
+
+
+def get_backend(name: Optional[str] = None) -> Type[PdfBackend]:
+    """Backend class by name, falling back to the first installed one"""
+    name = (name or os.getenv("LEGAL_ORACLE_PDF_BACKEND") or "").lower()
+    if name:
+        if name not in PDF_BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{name}'. Choose one of {', '.join(PDF_BACKENDS)}")
+        if PDF_BACKENDS[name].available():
+            return PDF_BACKENDS[name]
+    installed = available_backends()
+    if not installed:
+        raise ImportError("No PDF parser installed; install PyPDF2 or pypdf")
+    return PDF_BACKENDS[installed[0]]
+
+
+# ---------- document classes and benchmark-driven selection ----------
+def classify_document(page_count: int, sample_chars: int, sampled_pages: int) -> str:
+    """Coarse document class used to pick a backend: scanned, long or short"""
+    if sampled_pages and sample_chars / sampled_pages < SCANNED_CHARS_PER_PAGE:
+        return "scanned"
+    return "long" if page_count >= LONG_DOCUMENT_PAGES else "short"
+
+
+def selection_path() -> Path:
+    # Imported here: extraction_cache depends on extraction, which depends on this module
+    from .extraction_cache import DEFAULT_CACHE_DIR
+    return DEFAULT_CACHE_DIR / SELECTION_FILE
+
+
+def load_selection(path: Optional[Path] = None) -> Dict[str, str]:
+    path = path or selection_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("winners", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def choose_backend(document_class: str, selection: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """Benchmarked winner for a document class, if one is recorded and installed"""
+    name = (selection if selection is not None else load_selection()).get(document_class)
+    if name in PDF_BACKENDS and PDF_BACKENDS[name].available():
+        return name
+    return None
+
+
+# ---------- per-page time budget ----------
+def can_enforce_budget() -> bool:
+    """Whether page_budget can interrupt work on the calling thread"""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _on_alarm(signum, frame):
+    raise PageTimeout()
+
+
+@contextmanager
+def page_budget(seconds: Optional[float]) -> Iterator[bool]:
+    """Interrupt the body with PageTimeout after `seconds`.
+
+    Uses SIGALRM, so it is only enforced on a process's main thread (always
+    true in extraction workers). Yields whether the budget is enforced.
+    """
+    if not (seconds and can_enforce_budget()):
+        yield False
+        return
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield True
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
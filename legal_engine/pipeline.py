@@ -0,0 +1,317 @@
+"""
+Streaming ingest pipeline.
+
+    upload -> pages -> cleaned text -> chunks -> embedding batches -> index
+
+A producer thread extracts and chunks documents and hands fixed-size batches
+of chunks to the calling thread through a bounded queue. The caller embeds
+each batch (network-bound) and inserts it into the FAISS store while the
+producer is already preparing the next ones (CPU-bound). At most
+`max_pending_batches` batches, and no more than `max_pending_mb` of chunk
+text, are held between the two stages, so memory no longer scales with the
+size of the whole upload and ingest time grows linearly with corpus size.
+"""
+
+import hashlib
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .compat import FAISS
+from .extraction import open_document_pages
+from .extraction_cache import content_hash
+from .text_store import TextStore, compact_store
+
+# Sentinel closing the batch queue
+_DONE = object()
+# Chunk texts returned for display; the rest live only in the index
+PREVIEW_CHUNKS = 5
+
+
+def make_chunk_id(name: str, doc_hash: str, ordinal: int) -> str:
+    """Stable chunk ID: the same file (name and bytes) always yields the same IDs"""
+    prefix = hashlib.sha256(f"{name}\0{doc_hash}".encode("utf-8")).hexdigest()[:16]
+    return f"{prefix}-{ordinal:05d}"
+
+
+ProgressCallback = Callable[[Dict], None]
+
+
+class StreamingChunker:
+    """Split a stream of pages into chunks without holding the whole document.
+
+    Adapts a LangChain text splitter to the chunker interface the pipeline
+    uses (`chunks(pages, doc_id)` yielding `(text, metadata)`); generic
+    splitters know nothing about location, so metadata is empty. `header`
+    (formatted with the document name) is prepended so the name ends up in
+    the chunk text instead.
+    """
+
+    def __init__(self, splitter, joiner: str = "\n", window_chunks: int = 8,
+                 header: Optional[str] = None):
+        self.splitter = splitter
+        self.joiner = joiner
+        self.header = header
+        chunk_size = getattr(splitter, "_chunk_size", 1000)
+        self.window = chunk_size * window_chunks
+
+    def chunks(self, pages: Iterable[str], doc_id: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        for piece in self._pieces(pages, doc_id):
+            yield piece, {}
+
+    def _pieces(self, pages: Iterable[str], doc_id: Optional[str]) -> Iterator[str]:
+        buffer = self.header.format(name=doc_id) + self.joiner if self.header else ""
+        for page in pages:
+            buffer += page + self.joiner
+            if len(buffer) < self.window:
+                continue
+            pieces = self.splitter.split_text(buffer)
+            # The last piece may continue on the next page; carry it forward
+            for piece in pieces[:-1]:
+                yield piece
+            buffer = pieces[-1] + self.joiner if pieces else ""
+        if buffer.strip():
+            yield from self.splitter.split_text(buffer)
+
+
+class _ByteBudget:
+    """Caps the bytes of chunk text waiting between producer and consumer"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.pending = 0
+        self._cond = threading.Condition()
+
+    def reserve(self, nbytes: int, stop: threading.Event) -> bool:
+        with self._cond:
+            # A single oversized batch is always let through so ingest can't deadlock
+            while self.pending and self.pending + nbytes > self.limit:
+                if stop.is_set():
+                    return False
+                self._cond.wait(0.2)
+            self.pending += nbytes
+            return True
+
+    def release(self, nbytes: int):
+        with self._cond:
+            self.pending -= nbytes
+            self._cond.notify_all()
+
+
+def _batch_bytes(batch: List[Tuple[str, Dict]]) -> int:
+    return sum(len(text) for text, _ in batch)
+
+
+class IngestPipeline:
+    """Overlap extraction/chunking with embedding/indexing for a batch of uploads"""
+
+    def __init__(self, embeddings, splitter, batch_size: int = 128,
+                 max_pending_batches: int = 4,
+                 max_pending_mb: float = 64,
+                 clean: Optional[Callable[[str], str]] = None,
+                 joiner: str = "\n",
+                 header: Optional[str] = None,
+                 extractor: Callable = open_document_pages,
+                 thread_hook: Optional[Callable[[threading.Thread], None]] = None,
+                 text_store: Optional[TextStore] = None):
+        self.embeddings = embeddings
+        # Structure-aware chunkers are used as-is; plain text splitters get wrapped
+        if hasattr(splitter, "chunks"):
+            self.chunker = splitter
+        else:
+            self.chunker = StreamingChunker(splitter, joiner=joiner, header=header)
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.max_pending_bytes = int(max_pending_mb * 1024 * 1024)
+        self.clean = clean
+        self.joiner = joiner
+        self.extractor = extractor
+        self.thread_hook = thread_hook
+        self.text_store = text_store
+
+    # ---------- producer (worker thread) ----------
+    def _put(self, q: queue.Queue, item, stop: threading.Event) -> bool:
+        """Put unless the consumer has given up"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _put_batch(self, q: queue.Queue, batch, budget: _ByteBudget, stop: threading.Event) -> bool:
+        nbytes = _batch_bytes(batch)
+        if not budget.reserve(nbytes, stop):
+            return False
+        return self._put(q, batch, stop)
+
+    def _document_pages(self, name: str, pages: Iterable[str], page_count: int, size: int,
+                        kept: List[str], words: List[int], stats: Dict) -> Iterator[str]:
+        done_before = stats["bytes_done"]
+        for i, page in enumerate(pages, 1):
+            if self.clean:
+                page = self.clean(page)
+            kept.append(page)
+            words[0] += len(page.split())
+            stats["pages"] += 1
+            # Attribute input bytes to pages evenly to estimate overall progress
+            stats["bytes_done"] = done_before + size * min(i / max(page_count, 1), 1.0)
+            yield page
+
+    def _produce(self, documents: Iterable[Tuple[str, object]], q: queue.Queue,
+                 budget: _ByteBudget, stop: threading.Event, result: Dict):
+        stats = result["stats"]
+        batch: List[Tuple[str, Dict]] = []
+        try:
+            for name, source in documents:
+                if stop.is_set():
+                    break
+                kept: List[str] = []
+                words = [0]
+                ids: List[str] = []
+                size = len(source)
+                done_before = stats["bytes_done"]
+                try:
+                    doc_hash = content_hash(source)
+                    pages, metadata = self.extractor(name, source)
+                    doc_pages = self._document_pages(name, pages, metadata.get("pages", 1), size, kept, words, stats)
+                    for ordinal, (chunk, location) in enumerate(self.chunker.chunks(doc_pages, name)):
+                        chunk_id = make_chunk_id(name, doc_hash, ordinal)
+                        ids.append(chunk_id)
+                        batch.append((chunk, {"source": name, "chunk_id": chunk_id, **location}))
+                        stats["chunks"] += 1
+                        if len(batch) >= self.batch_size:
+                            if not self._put_batch(q, batch, budget, stop):
+                                return
+                            batch = []
+                    text = self.joiner.join(kept)
+                    result["documents"][name] = self.text_store.put(text) if self.text_store else text
+                    result["metadata"].append(metadata)
+                    result["hashes"][name] = doc_hash
+                    result["words"][name] = words[0]
+                    result["chunk_ids"][name] = ids
+                except Exception as e:
+                    result["errors"].append((name, str(e)))
+                    # Chunks already queued for a failed document are still indexed
+                    result["failed_chunk_ids"].extend(ids)
+                finally:
+                    stats["documents_done"] += 1
+                    stats["bytes_done"] = done_before + size
+            if batch:
+                self._put_batch(q, batch, budget, stop)
+        except BaseException as e:
+            self._put(q, e, stop)
+        finally:
+            self._put(q, _DONE, stop)
+
+    # ---------- consumer (calling thread) ----------
+    def _index_batch(self, store, texts: List[str], metadatas: List[Dict]):
+        vectors = self.embeddings.embed_documents(texts)
+        pairs = list(zip(texts, vectors))
+        ids = [meta["chunk_id"] for meta in metadatas]
+        if store is None:
+            return FAISS.from_embeddings(pairs, self.embeddings, metadatas=metadatas, ids=ids)
+        store.add_embeddings(pairs, metadatas=metadatas, ids=ids)
+        return store
+
+    @staticmethod
+    def _update_estimate(stats: Dict, started: float):
+        """Extrapolate the total chunk count from input consumed so far; derive fraction and ETA"""
+        input_share = stats["bytes_done"] / max(stats["bytes_total"], 1)
+        if input_share > 0:
+            estimate = max(stats["chunks"], round(stats["chunks"] / input_share))
+        else:
+            estimate = stats["chunks"]
+        stats["estimated_chunks"] = estimate
+        stats["fraction"] = min(stats["embedded"] / max(estimate, 1), 1.0)
+        stats["elapsed"] = time.perf_counter() - started
+        stats["chunks_per_second"] = stats["embedded"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        if stats["chunks_per_second"] > 0:
+            stats["eta_seconds"] = (estimate - stats["embedded"]) / stats["chunks_per_second"]
+
+    def run(self, documents: Iterable[Tuple[str, object]],
+            progress: Optional[ProgressCallback] = None,
+            vector_store=None) -> Dict:
+        """Ingest (name, source) pairs and return the built store plus bookkeeping.
+
+        Chunks are appended to `vector_store` when one is given, otherwise a
+        new store is created. The result holds `vector_store` (None when no
+        embeddings were given), `chunk_count` and a `preview` of the first
+        `PREVIEW_CHUNKS` chunk texts (chunk text is not kept twice),
+        per-document cleaned `documents` text (a shared `TextHandle` when the
+        pipeline has a `text_store`, in which case the store's chunks are
+        compacted to offsets into it), `words` per document, content `hashes`
+        and stable `chunk_ids`, extraction `metadata`,
+        per-file `errors` (with `failed_chunk_ids` of partially indexed files),
+        and `stats`. Without an index, `texts_by_id` and
+        `metadatas_by_id` map chunk IDs to chunk text and metadata instead.
+        """
+        documents = list(documents)
+        result = {
+            "vector_store": None,
+            "chunk_count": 0,
+            "preview": [],
+            "documents": {},
+            "hashes": {},
+            "words": {},
+            "chunk_ids": {},
+            "failed_chunk_ids": [],
+            "texts_by_id": {},
+            "metadatas_by_id": {},
+            "metadata": [],
+            "errors": [],
+            "stats": {"documents_total": len(documents), "documents_done": 0,
+                      "bytes_total": sum(len(source) for _, source in documents), "bytes_done": 0,
+                      "pages": 0, "chunks": 0, "estimated_chunks": 0, "embedded": 0,
+                      "fraction": 0.0, "elapsed": 0.0, "eta_seconds": None, "chunks_per_second": 0.0},
+        }
+        stats = result["stats"]
+        build_index = self.embeddings is not None and FAISS is not None
+        started = time.perf_counter()
+
+        q: queue.Queue = queue.Queue(maxsize=self.max_pending_batches)
+        budget = _ByteBudget(self.max_pending_bytes)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(documents, q, budget, stop, result),
+                                    name="ingest-producer", daemon=True)
+        if self.thread_hook:
+            self.thread_hook(producer)
+        producer.start()
+
+        store = vector_store
+        try:
+            while True:
+                item = q.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                budget.release(_batch_bytes(item))
+                texts = [text for text, _ in item]
+                if build_index:
+                    store = self._index_batch(store, texts, [meta for _, meta in item])
+                else:
+                    result["texts_by_id"].update((meta["chunk_id"], text) for text, meta in item)
+                    result["metadatas_by_id"].update((meta["chunk_id"], meta) for _, meta in item)
+                result["chunk_count"] += len(texts)
+                result["preview"].extend(texts[:PREVIEW_CHUNKS - len(result["preview"])])
+                stats["embedded"] += len(texts)
+                self._update_estimate(stats, started)
+                if progress:
+                    progress(stats)
+        finally:
+            stop.set()
+            producer.join()
+
+        if self.text_store is not None and store is not None:
+            # Chunks become offsets into the shared texts instead of private copies
+            compact_store(store, result["documents"], result["chunk_ids"])
+        stats["elapsed"] = time.perf_counter() - started
+        stats["chunks_per_second"] = stats["embedded"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        stats["estimated_chunks"] = stats["chunks"]
+        stats["eta_seconds"] = 0.0
+        stats["fraction"] = 1.0
+        result["vector_store"] = store
+        return result
@@ -0,0 +1,169 @@
+"""
+Prebuilt, versioned knowledge base for the bundled `data/` statute corpus.
+
+`build_index.py` turns the PDFs in `data/` into an artifact directory:
+
+    manifest.json   format version, corpus version, embedding model, documents
+    chunks.jsonl    one {"text", "metadata"} record per vector, in index order
+    vectors.npy     float32 (n, dim) embedding matrix
+    index.faiss     serialized FAISS index over the same vectors (flat, IVF,
+                    HNSW or IVF-PQ; see `ann.py`)
+
+At startup the apps memory-map `vectors.npy` and `index.faiss` and wrap them in
+a LangChain FAISS store, so a cold session can query the statutes without
+extracting or embedding anything.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .ann import apply_search_params, build_index
+from .bm25 import BM25Index
+from .compat import FAISS, Document, InMemoryDocstore, faiss
+from .extraction_cache import content_hash, get_extraction_cache
+from .pipeline import IngestPipeline
+from .uploads import UploadBuffer
+
+FORMAT_VERSION = 1
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DATA_DIR = REPO_ROOT / "data"
+DEFAULT_INDEX_DIR = REPO_ROOT / "index" / "statutes"
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt")
+
+
+def corpus_version(documents: List[Dict], model: str, chunk_size: int, chunk_overlap: int,
+                   chunker: str = "") -> str:
+    """Stable identifier for a (corpus, embedding model, chunking) combination"""
+    digest = hashlib.sha256()
+    for doc in sorted(documents, key=lambda d: d["sha256"]):
+        digest.update(doc["sha256"].encode())
+    digest.update(f"{model}|{chunk_size}|{chunk_overlap}|{chunker}".encode())
+    return digest.hexdigest()[:16]
+
+
+def store_records(store) -> List[Dict]:
+    """Chunk text and metadata of a LangChain FAISS store, in index order"""
+    records = []
+    for i in range(store.index.ntotal):
+        doc = store.docstore.search(store.index_to_docstore_id[i])
+        records.append({"text": doc.page_content, "metadata": doc.metadata})
+    return records
+
+
+def build_corpus_index(embeddings, splitter, model: str,
+                       data_dir: Path = DEFAULT_DATA_DIR,
+                       out_dir: Path = DEFAULT_INDEX_DIR,
+                       progress: Optional[Callable[[Dict], None]] = None,
+                       index_type: str = "auto") -> Dict:
+    """Ingest every supported file under data_dir and write the artifact to out_dir.
+
+    `index_type` is one of `ann.INDEX_TYPES`; parameters follow from the corpus size.
+    """
+    data_dir, out_dir = Path(data_dir), Path(out_dir)
+    files = sorted(p for p in data_dir.iterdir() if p.suffix.lower() in SUPPORTED_SUFFIXES)
+    if not files:
+        raise FileNotFoundError(f"No PDF/DOCX/TXT files found in {data_dir}")
+
+    # Memory-mapped: hashed and parsed in place rather than read into the heap
+    sources = [(p.name, UploadBuffer.from_path(p)) for p in files]
+    cache = get_extraction_cache()
+    pipeline = IngestPipeline(embeddings, splitter, extractor=cache.open_pages)
+    ingest = pipeline.run(sources, progress=progress)
+    store = ingest["vector_store"]
+    if store is None:
+        raise RuntimeError("No text could be extracted from the corpus")
+
+    pages_by_name = {meta["filename"]: meta.get("pages", 1) for meta in ingest["metadata"]}
+    documents = [
+        {"name": name, "sha256": content_hash(data), "pages": pages_by_name[name]}
+        for name, data in sources if name in pages_by_name
+    ]
+    chunk_size = getattr(splitter, "chunk_size", getattr(splitter, "_chunk_size", 0))
+    chunk_overlap = getattr(splitter, "chunk_overlap", getattr(splitter, "_chunk_overlap", 0))
+    vectors = store.index.reconstruct_n(0, store.index.ntotal).astype(np.float32)
+    # Ingest fills an exact flat index; the artifact gets the requested family
+    index, index_params = build_index(vectors, index_type)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "chunks.jsonl", "w", encoding="utf-8") as f:
+        for record in store_records(store):
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    np.save(out_dir / "vectors.npy", vectors)
+    faiss.write_index(index, str(out_dir / "index.faiss"))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "corpus_version": corpus_version(documents, model, chunk_size, chunk_overlap, type(splitter).__name__),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "embedding_model": model,
+        "dimension": int(vectors.shape[1]),
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "chunker": type(splitter).__name__,
+        "chunks": int(vectors.shape[0]),
+        "index": index_params,
+        "documents": documents,
+        "errors": ingest["errors"],
+    }
+    # Written last so a half-built directory is never mistaken for a valid artifact
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def read_manifest(index_dir: Path = DEFAULT_INDEX_DIR) -> Optional[Dict]:
+    """Manifest of a compatible artifact, or None if missing/outdated"""
+    path = Path(index_dir) / "manifest.json"
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _read_index(path: Path):
+    """Memory-map the FAISS index where the build supports it"""
+    try:
+        return faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except Exception:
+        return faiss.read_index(str(path))
+
+
+def load_corpus_index(embeddings, index_dir: Path = DEFAULT_INDEX_DIR) -> Optional[Dict]:
+    """Open a prebuilt artifact as a ready-to-query LangChain FAISS store.
+
+    Returns {"vector_store", "lexical", "vectors", "manifest"} or None when no
+    compatible artifact exists (or FAISS is unavailable). `vectors` is a
+    read-only memory map of the embedding matrix and `lexical` the BM25 index
+    over the same chunks for hybrid retrieval.
+    """
+    index_dir = Path(index_dir)
+    manifest = read_manifest(index_dir)
+    if manifest is None or FAISS is None or faiss is None:
+        return None
+
+    # nprobe / efSearch as chosen at build time; older artifacts are flat
+    index = apply_search_params(_read_index(index_dir / "index.faiss"), manifest.get("index"))
+    vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+    docs = {}
+    index_to_docstore_id = {}
+    with open(index_dir / "chunks.jsonl", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            record = json.loads(line)
+            doc_id = f"{manifest['corpus_version']}-{i}"
+            docs[doc_id] = Document(page_content=record["text"], metadata=record["metadata"])
+            index_to_docstore_id[i] = doc_id
+    if len(docs) != index.ntotal:
+        return None
+
+    store = FAISS(embeddings, index, InMemoryDocstore(docs), index_to_docstore_id)
+    return {"vector_store": store, "lexical": BM25Index.from_vector_store(store),
+            "vectors": vectors, "manifest": manifest}
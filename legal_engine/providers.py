@@ -0,0 +1,76 @@
+"""
+Embedding provider selection.
+
+Every place that needs embeddings (upload ingest, the demo store, the
+document comparator, the prebuilt statute index) asks `make_embeddings` for
+them instead of constructing `OpenAIEmbeddings` directly:
+
+    openai  remote OpenAI embeddings (concurrent client when aiohttp is
+            installed), behind the persistent embedding cache
+    local   `HashedNgramEmbeddings`, computed on the CPU with no network
+    auto    openai when an API key is available, otherwise local
+
+The default comes from the `LEGAL_ORACLE_EMBEDDINGS` environment variable
+and falls back to auto, so the apps keep working without an API key
+(air-gapped deployments, CI) and large internal corpora can opt into local
+embeddings to take remote latency out of ingest.
+"""
+
+import os
+from typing import Optional
+
+from .async_embeddings import concurrent_embeddings
+from .compat import OpenAIEmbeddings
+from .embedding_cache import CachedEmbeddings
+from .local_embeddings import LOCAL_MODEL_PREFIX, HashedNgramEmbeddings
+
+EMBEDDING_PROVIDERS = ("auto", "openai", "local")
+DEFAULT_OPENAI_MODEL = "text-embedding-3-small"
+
+
+def resolve_provider(provider: Optional[str] = None, api_key: Optional[str] = None) -> str:
+    """Concrete provider name ("openai" or "local") for a requested one"""
+    provider = (provider or os.getenv("LEGAL_ORACLE_EMBEDDINGS") or "auto").lower()
+    if provider not in EMBEDDING_PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{provider}'. Choose one of {', '.join(EMBEDDING_PROVIDERS)}")
+    if provider == "auto":
+        return "openai" if api_key or os.getenv("OPENAI_API_KEY") else "local"
+    return provider
+
+
+def make_embeddings(provider: Optional[str] = None, api_key: Optional[str] = None,
+                    model: Optional[str] = None, max_concurrency: int = 4,
+                    dimensions: Optional[int] = None):
+    """LangChain-compatible embeddings for `provider`.
+
+    `max_concurrency` applies to OpenAI requests; `dimensions` sizes local
+    vectors (OpenAI models use their native dimension).
+    """
+    provider = resolve_provider(provider, api_key)
+    if provider == "local":
+        return HashedNgramEmbeddings(dimensions=dimensions) if dimensions else HashedNgramEmbeddings()
+
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OpenAI embeddings need OPENAI_API_KEY; use the local provider to run offline")
+    model = model or DEFAULT_OPENAI_MODEL
+
+    def langchain_embeddings():
+        if OpenAIEmbeddings is None:
+            raise ImportError("Neither aiohttp nor LangChain's OpenAIEmbeddings is installed")
+        return OpenAIEmbeddings(model=model, openai_api_key=api_key)
+
+    # Chunks seen before (same model) are served from the embedding cache
+    return CachedEmbeddings(concurrent_embeddings(langchain_embeddings, api_key=api_key, model=model,
+                                                  max_concurrency=max_concurrency),
+                            model=model)
+
+
+def embeddings_for_model(model: str, dimension: Optional[int] = None, api_key: Optional[str] = None):
+    """Embeddings able to query an index built with `model`, or None if unavailable"""
+    if model.startswith(LOCAL_MODEL_PREFIX):
+        local = HashedNgramEmbeddings(dimensions=dimension) if dimension else HashedNgramEmbeddings()
+        return local if local.model == model else None
+    if not (api_key or os.getenv("OPENAI_API_KEY")):
+        return None
+    return make_embeddings("openai", api_key=api_key, model=model)
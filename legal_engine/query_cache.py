@@ -0,0 +1,115 @@
+"""
+In-memory LRU cache of query embeddings and retrieval results.
+
+Streamlit reruns the whole script on every widget interaction, so Legal Chat
+and Semantic Search see the same questions (and the fixed suggested
+prompts) over and over. `QueryCache` remembers, per normalized query:
+
+    ("embedding", model, query)                          -> query vector
+    ("results", index version, search type, k..., query) -> ranked docstore IDs
+
+Result keys carry an index version, a token that changes whenever the
+corpus behind a vector store changes (`new_index_version`), so a sync can
+never serve results from the previous corpus; `invalidate(version)` also
+drops the old entries eagerly. Embeddings depend only on the model and stay
+valid across corpus changes. Results are stored as docstore IDs, not
+Documents, so cached entries hold no chunk text.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from .embedding_cache import normalize_text
+
+DEFAULT_MAX_ENTRIES = 4096
+_versions = itertools.count(1)
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: NFC, collapsed whitespace, stripped"""
+    return normalize_text(query)
+
+
+class QueryCache:
+    """Thread-safe LRU of query embeddings and result ID lists"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        # kind ("embedding" / "results") -> [hits, misses]
+        self._counts: Dict[str, list] = {"embedding": [0, 0], "results": [0, 0]}
+
+    def get(self, key: tuple):
+        """Cached value for `key` (whose first element is its kind), or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            counts = self._counts.setdefault(key[0], [0, 0])
+            if value is None:
+                counts[1] += 1
+                return None
+            self._entries.move_to_end(key)
+            counts[0] += 1
+            return value
+
+    def put(self, key: tuple, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def embedding_key(self, model: str, query: str) -> tuple:
+        return ("embedding", model, normalize_query(query))
+
+    def results_key(self, version: str, search_type: str, query: str, *params) -> tuple:
+        return ("results", version, search_type, *params, normalize_query(query))
+
+    def invalidate(self, version: Optional[str]):
+        """Drop every result cached for an index version that no longer exists"""
+        if version is None:
+            return
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == "results" and key[1] == version]
+            for key in stale:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(h for h, _ in self._counts.values())
+            lookups = hits + sum(m for _, m in self._counts.values())
+            kinds = {kind: {"hits": h, "misses": m, "hit_ratio": h / (h + m) if h + m else 0.0}
+                     for kind, (h, m) in self._counts.items()}
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "misses": lookups - hits,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                **kinds,
+            }
+
+
+_shared_cache: Optional[QueryCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Process-wide query cache shared by every Streamlit session"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = QueryCache()
+        return _shared_cache
+
+
+def new_index_version(previous: Optional[str] = None) -> str:
+    """Fresh process-unique version token for a session store whose corpus just changed.
+
+    Results cached under `previous` are dropped if it was issued here; versions
+    of shared stores (the statute library) are left for the other sessions.
+    """
+    if previous and previous.startswith("session-"):
+        get_query_cache().invalidate(previous)
+    return f"session-{next(_versions)}"
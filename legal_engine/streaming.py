@@ -0,0 +1,44 @@
+"""
+Streamed LLM answers with time-to-first-token.
+
+A full gpt-4 answer can take 10-30 s, and waiting behind a spinner for all
+of it is what users notice. `stream_answer` consumes a LangChain chat
+model's `stream()` and hands the growing text to a callback (the apps
+render it into a Streamlit placeholder), throttled so a fast model does not
+flood the page with updates. It reports time to first token and total
+time separately, both measured from `started` so retrieval before the
+call counts towards what the user waited.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# Minimum seconds between partial-text callbacks
+DEFAULT_REFRESH_S = 0.05
+
+
+def stream_answer(llm, prompt, on_text: Optional[Callable[[str], None]] = None,
+                  started: Optional[float] = None,
+                  refresh_s: float = DEFAULT_REFRESH_S) -> Tuple[str, Dict[str, float]]:
+    """(answer, {"first_token_s", "total_s"}) for `prompt`, reporting partial text as it arrives.
+
+    `started` is a `time.perf_counter()` reading (default: now). `on_text`
+    receives the text so far, at most every `refresh_s` seconds; the caller
+    renders the returned final answer itself.
+    """
+    started = time.perf_counter() if started is None else started
+    # Joined on demand: repeated `text += piece` would copy the whole answer per token
+    pieces, first_token, last_refresh = [], None, 0.0
+    for chunk in llm.stream(prompt):
+        piece = getattr(chunk, "content", chunk)
+        if not piece:
+            continue
+        now = time.perf_counter()
+        if first_token is None:
+            first_token = now - started
+        pieces.append(piece)
+        if on_text is not None and now - last_refresh >= refresh_s:
+            on_text("".join(pieces))
+            last_refresh = now
+    total = time.perf_counter() - started
+    return "".join(pieces), {"first_token_s": total if first_token is None else first_token, "total_s": total}
@@ -0,0 +1,219 @@
+"""
+Shared, content-addressed store of document text.
+
+Extracted document text is written once per unique content to the cache
+directory and memory-mapped read-only; every session that ingests the same
+document gets a `TextHandle` to the same mapping instead of its own string.
+The pages of a mapping live in the OS page cache, so server memory grows
+with the number of unique documents, not with sessions × copies, and
+mappings are shared with the other server processes on the host.
+
+Text is stored at a fixed width per document, chosen like CPython's own
+string representation (1 byte per character for Latin-1 text, 2 for the
+Basic Multilingual Plane, which includes Devanagari, otherwise 4), so a
+character slice is a byte slice: `handle[a:b]` decodes just that range.
+
+`TextDocstore` lets a FAISS store keep only (handle, offsets, metadata) per
+chunk and rebuild the chunk's `Document` on lookup, so chunk text is not
+held a second time inside every session's index.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .compat import Document, InMemoryDocstore
+from .extraction_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# width -> (file suffix, codec)
+_LAYOUTS = {1: (".t1", "latin-1"), 2: (".t2", "utf-16-le"), 4: (".t4", "utf-32-le")}
+
+
+def _width(text: str) -> int:
+    top = max(text, default="\0")
+    return 1 if top <= "\xff" else 2 if top <= "\uffff" else 4
+
+
+class TextHandle:
+    """Lightweight reference to one stored text; slices decode only their range"""
+
+    __slots__ = ("digest", "width", "length", "_data")
+
+    def __init__(self, digest: str, width: int, data):
+        self.digest = digest
+        self.width = width
+        self.length = len(data) // width
+        self._data = data
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        return self.slice(0, self.length)
+
+    def __getitem__(self, key) -> str:
+        if not isinstance(key, slice):
+            raise TypeError("TextHandle supports slicing only")
+        start, stop, step = key.indices(self.length)
+        if step != 1:
+            return str(self)[key]
+        return self.slice(start, stop)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TextHandle) and other.digest == self.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __repr__(self) -> str:
+        return f"TextHandle({self.digest[:12]}, {self.length:,} chars)"
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> memoryview:
+        """Zero-copy view of the encoded characters [start, stop)"""
+        stop = self.length if stop is None else stop
+        return memoryview(self._data)[start * self.width:stop * self.width]
+
+    def slice(self, start: int, stop: int) -> str:
+        if stop <= start:
+            return ""
+        with self.view(start, stop) as view:
+            return str(view, _LAYOUTS[self.width][1], "surrogatepass")
+
+
+class TextStore:
+    """Directory of fixed-width text files, memory-mapped once per process"""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else DEFAULT_CACHE_DIR / "texts"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._handles: Dict[str, TextHandle] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str, width: int) -> Path:
+        return self.root / (digest + _LAYOUTS[width][0])
+
+    def _map(self, digest: str, width: int, path: Path) -> TextHandle:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        handle = TextHandle(digest, width, data)
+        self._handles[digest] = handle
+        return handle
+
+    def put(self, text: str) -> TextHandle:
+        """Store `text` (once per unique content) and return its shared handle"""
+        digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            handle = self._handles.get(digest)
+            if handle is not None:
+                return handle
+            width = _width(text)
+            path = self._path(digest, width)
+            if not path.exists():
+                # Write then rename so concurrent processes never map a partial file
+                fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(text.encode(_LAYOUTS[width][1], "surrogatepass"))
+                os.replace(tmp, path)
+                self._prune()
+            else:
+                os.utime(path)
+            return self._map(digest, width, path)
+
+    def get(self, digest: str) -> Optional[TextHandle]:
+        """Handle for a stored digest, or None if it is not on disk"""
+        with self._lock:
+            if digest in self._handles:
+                return self._handles[digest]
+            for width in _LAYOUTS:
+                path = self._path(digest, width)
+                if path.exists():
+                    return self._map(digest, width, path)
+        return None
+
+    def _prune(self):
+        """Drop least recently stored files over the byte budget (mapped ones are kept)"""
+        files = []
+        for path in self.root.iterdir():
+            if path.suffix in (".t1", ".t2", ".t4"):
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path.stem in self._handles:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        return {"mapped": len(self._handles),
+                "mapped_bytes": sum(len(h._data) for h in self._handles.values())}
+
+
+_store: Optional[TextStore] = None
+_store_lock = threading.Lock()
+
+
+def get_text_store() -> TextStore:
+    """Process-wide text store shared by all sessions"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TextStore()
+        return _store
+
+
+class _ChunkRef:
+    __slots__ = ("handle", "start", "end", "metadata")
+
+    def __init__(self, handle: TextHandle, start: int, end: int, metadata: Dict):
+        self.handle = handle
+        self.start = start
+        self.end = end
+        self.metadata = metadata
+
+
+class TextDocstore(InMemoryDocstore if InMemoryDocstore is not None else object):
+    """InMemoryDocstore whose chunks can point into a stored text instead of holding it"""
+
+    def compact(self, ids: Iterable[str], handle: TextHandle) -> int:
+        """Replace chunks whose text is handle[start:end] with references; returns the count"""
+        compacted = 0
+        for chunk_id in ids:
+            doc = self._dict.get(chunk_id)
+            metadata = getattr(doc, "metadata", None) or {}
+            start, end = metadata.get("start"), metadata.get("end")
+            if start is None or end is None or end > len(handle):
+                continue
+            if handle[start:end] == doc.page_content:
+                self._dict[chunk_id] = _ChunkRef(handle, start, end, metadata)
+                compacted += 1
+        return compacted
+
+    def search(self, search: str):
+        item = self._dict.get(search)
+        if isinstance(item, _ChunkRef):
+            return Document(page_content=item.handle[item.start:item.end], metadata=item.metadata)
+        return super().search(search)
+
+
+def compact_store(vector_store, documents: Dict[str, object], chunk_ids: Dict[str, list]) -> int:
+    """Point a FAISS store's chunks at the stored texts of `documents` (name -> TextHandle)"""
+    docstore = getattr(vector_store, "docstore", None)
+    if InMemoryDocstore is None or not isinstance(docstore, InMemoryDocstore):
+        return 0
+    if not isinstance(docstore, TextDocstore):
+        docstore = vector_store.docstore = TextDocstore(dict(docstore._dict))
+    return sum(docstore.compact(chunk_ids.get(name, []), handle)
+               for name, handle in documents.items() if isinstance(handle, TextHandle))
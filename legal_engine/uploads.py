@@ -0,0 +1,152 @@
+"""
+Zero-copy upload buffers.
+
+An `UploadBuffer` holds one upload's bytes exactly once and is what the size
+check, the hasher and the parsers all read from:
+
+* Streamlit's `UploadedFile` is a `BytesIO` built from a bytes object, and
+  CPython shares that object instead of copying it: `getvalue()` and
+  `BytesIO(data)` both return/reuse the same buffer. `getbuffer()` on the
+  other hand forces a private copy, and `bytes(memoryview)` copies too, so
+  neither is used here.
+* Files on disk (the statute corpus, spooled streams) are memory-mapped.
+* Parsers get a stream over the shared buffer (`stream()`), never a copy.
+* Process-pool workers receive a path to a spool file (written once,
+  memory-mapped by each worker) rather than a pickled copy of the bytes per
+  worker; small uploads are still sent inline where pickling is cheaper.
+
+The SHA-256 is computed once per buffer and reused by the registry, the
+extraction cache and the pipeline.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Optional, Union
+
+# Uploads at least this large go to process-pool workers through a spool file
+SPOOL_MIN_BYTES = 8 * 1024 * 1024
+_SPOOL_CHUNK = 1024 * 1024
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class UploadBuffer:
+    """One upload's bytes, shared by the size check, the hasher and the parser"""
+
+    def __init__(self, data, name: str = "", path: Optional[str] = None):
+        # data is bytes, a read-only mmap or (rarely) another buffer object
+        self._data = data
+        self.name = name
+        self.path = path
+        self._sha256: Optional[str] = None
+
+    # ---------- constructors ----------
+    @classmethod
+    def from_path(cls, path: Union[str, os.PathLike], name: Optional[str] = None) -> "UploadBuffer":
+        """Memory-map a file read-only"""
+        path = str(path)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        return cls(data, name=name or Path(path).name, path=path)
+
+    @classmethod
+    def spool(cls, stream, name: str = "") -> "UploadBuffer":
+        """Copy a stream to a temporary file in chunks and memory-map it"""
+        fd, path = tempfile.mkstemp(prefix="legal-oracle-", suffix=".spool")
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(_SPOOL_CHUNK)
+                if not chunk:
+                    break
+                out.write(chunk)
+        buffer = cls.from_path(path, name=name)
+        weakref.finalize(buffer, _remove, path)
+        return buffer
+
+    @classmethod
+    def from_upload(cls, upload) -> "UploadBuffer":
+        """Wrap a Streamlit UploadedFile (or any BytesIO / binary file) without copying"""
+        if isinstance(upload, UploadBuffer):
+            return upload
+        name = getattr(upload, "name", "") or ""
+        if hasattr(upload, "getvalue"):
+            # Returns the bytes the BytesIO was built from; no copy is made
+            return cls(upload.getvalue(), name=name)
+        upload.seek(0)
+        return cls.spool(upload, name=name)
+
+    # ---------- access ----------
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    @property
+    def view(self) -> memoryview:
+        """Read-only view of the bytes; release it (or use `with`) when done"""
+        return memoryview(self._data).toreadonly()
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self._data).hexdigest()
+        return self._sha256
+
+    def stream(self) -> io.RawIOBase:
+        """An independent binary stream over the buffer for a parser"""
+        if isinstance(self._data, bytes):
+            return io.BytesIO(self._data)
+        if self.path:
+            return open(self.path, "rb")
+        # Foreign buffer objects: one copy is unavoidable for a seekable stream
+        return io.BytesIO(bytes(self._data))
+
+    def bytes(self) -> bytes:
+        """The content as bytes (free when the buffer already is bytes)"""
+        return self._data if isinstance(self._data, bytes) else bytes(self._data)
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return str(self._data, encoding)
+
+    def worker_source(self) -> Union[str, bytes]:
+        """What to hand a worker process: a file path, or the bytes for small uploads"""
+        if self.path:
+            return self.path
+        if self.size < SPOOL_MIN_BYTES:
+            return self.bytes()
+        fd, path = tempfile.mkstemp(prefix="legal-oracle-", suffix=".spool")
+        with os.fdopen(fd, "wb") as out:
+            out.write(self._data)
+        self.path = path
+        weakref.finalize(self, _remove, path)
+        return path
+
+    @classmethod
+    def from_worker_source(cls, source: Union[str, bytes]) -> "UploadBuffer":
+        return cls.from_path(source) if isinstance(source, str) else cls(source)
+
+
+def as_upload(source) -> UploadBuffer:
+    """Coerce bytes, a path, a file-like object or an UploadBuffer into an UploadBuffer"""
+    if isinstance(source, UploadBuffer):
+        return source
+    if isinstance(source, bytes):
+        return UploadBuffer(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return UploadBuffer(source)
+    if isinstance(source, (str, os.PathLike)):
+        return UploadBuffer.from_path(source)
+    return UploadBuffer.from_upload(source)
@@ -0,0 +1,117 @@
+"""
+Background warm-up of answers to the apps' canned questions.
+
+The quick-question buttons and suggested prompts are what users click
+first, right after a corpus is indexed, and each click used to wait for a
+retrieval and LLM round trip. `WarmupJob` answers those questions on a
+shared thread pool as soon as the corpus is ready and stores the answers
+in the `AnswerCache` under the same scope the chat uses, so the first
+click is a cache hit.
+
+A job belongs to one answer scope (corpus version, model, domain,
+language, prompt kind). When the corpus changes, `restart_warmup` cancels
+the previous job: questions not yet started are dropped, and answers that
+finish after cancellation are discarded rather than stored. Questions
+already cached in the scope are skipped, so reruns and other sessions on
+the same corpus cost nothing.
+
+The `answer` callable runs on a worker thread and must not touch
+Streamlit; the apps close over the store, retriever settings and model
+chosen at ingest time.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .answer_cache import AnswerCache, document_records, get_answer_cache
+
+# Canned questions of every session share one pool, bounding concurrent LLM requests
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="answer-warmup")
+
+
+class WarmupJob:
+    """Concurrent answering of `questions` into the answer cache under `scope`"""
+
+    def __init__(self, scope: str, questions: Sequence[str],
+                 answer: Callable[[str], Tuple[str, List[object]]],
+                 embed: Optional[Callable[[str], object]] = None,
+                 cache: Optional[AnswerCache] = None):
+        self.scope = scope
+        self.questions = list(dict.fromkeys(questions))
+        self.answer = answer
+        self.embed = embed
+        self.cache = cache or get_answer_cache()
+        self.cancelled = threading.Event()
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+        self._futures = []
+        self._outcomes: Dict[str, str] = {}
+
+    def start(self) -> "WarmupJob":
+        pending = []
+        for question in self.questions:
+            if self.cache.contains(self.scope, question):
+                self._outcomes[question] = "cached"
+            else:
+                pending.append(question)
+        if not pending:
+            self.finished = time.time()
+        self._futures = [_executor.submit(self._run, question) for question in pending]
+        return self
+
+    def _run(self, question: str):
+        outcome = "cancelled"
+        try:
+            if not self.cancelled.is_set():
+                text, docs = self.answer(question)
+                if not self.cancelled.is_set():
+                    vector = self.embed(question) if self.embed is not None else None
+                    self.cache.store(self.scope, question, text, document_records(docs), vector)
+                    outcome = "answered"
+        except Exception:
+            outcome = "failed"
+        with self._lock:
+            self._outcomes[question] = outcome
+            if len(self._outcomes) == len(self.questions):
+                self.finished = time.time()
+
+    def cancel(self):
+        """Stop the job: queued questions are dropped and late answers are not stored"""
+        self.cancelled.set()
+        for future in self._futures:
+            future.cancel()
+        with self._lock:
+            self.finished = self.finished or time.time()
+
+    def status(self) -> Dict:
+        """{"total", "ready", "failed", "running", "cancelled", "elapsed"}"""
+        with self._lock:
+            outcomes = list(self._outcomes.values())
+        ready = sum(outcome in ("cached", "answered") for outcome in outcomes)
+        return {
+            "total": len(self.questions),
+            "ready": ready,
+            "failed": outcomes.count("failed"),
+            "running": not self.cancelled.is_set() and len(outcomes) < len(self.questions),
+            "cancelled": self.cancelled.is_set(),
+            "elapsed": (self.finished or time.time()) - self.started,
+        }
+
+
+def restart_warmup(previous: Optional[WarmupJob], scope: str, questions: Sequence[str],
+                   answer: Callable[[str], Tuple[str, List[object]]],
+                   embed: Optional[Callable[[str], object]] = None,
+                   cache: Optional[AnswerCache] = None) -> WarmupJob:
+    """Warm-up job for `scope`, reusing `previous` if it covers the same scope, else cancelling it"""
+    if previous is not None and previous.scope == scope and not previous.cancelled.is_set():
+        return previous
+    cancel_warmup(previous)
+    return WarmupJob(scope, questions, answer, embed, cache).start()
+
+
+def cancel_warmup(job: Optional[WarmupJob]):
+    if job is not None:
+        job.cancel()
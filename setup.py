@@ -36,7 +36,6 @@ def main():
     print("🔧 Installing optional dependencies...")
     
     optional_packages = [
-        ("python-docx", "DOCX file support"),
         ("matplotlib", "Chart generation"),
         ("wordcloud", "Word cloud visualizations")
     ]
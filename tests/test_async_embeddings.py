@@ -0,0 +1,132 @@
+"""
+AsyncEmbeddingClient against a local aiohttp stand-in for the embeddings endpoint.
+
+Each text "t<n>" embeds to [n, 1.0], so results can be checked for order.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from legal_engine import async_embeddings  # noqa: E402
+from legal_engine.async_embeddings import AsyncEmbeddingClient, EmbeddingRequestError  # noqa: E402
+
+
+def vector(text):
+    return [float(text[1:]), 1.0]
+
+
+def texts(n):
+    return [f"t{i}" for i in range(n)]
+
+
+def embed(respond, inputs, **options):
+    """Run aembed_documents against a server whose handler is respond(request_no, inputs)"""
+    requests = []
+    client = options.pop("client", None)
+
+    async def handler(request):
+        batch = (await request.json())["input"]
+        requests.append(batch)
+        return respond(len(requests), batch)
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/v1/embeddings", handler)
+        async with TestServer(app) as server:
+            settings = {"api_key": "test", "base_url": str(server.make_url("/v1")),
+                        "backoff_base": 0.01, "backoff_cap": 0.05, **options}
+            embedder = client or AsyncEmbeddingClient(**settings)
+            # A resumed client talks to this run's server
+            embedder.base_url = settings["base_url"]
+            started = time.monotonic()
+            try:
+                return await embedder.aembed_documents(inputs), embedder, time.monotonic() - started
+            except EmbeddingRequestError as e:
+                return e, embedder, time.monotonic() - started
+
+    result, client, elapsed = asyncio.run(main())
+    return result, client, elapsed, requests
+
+
+def ok(batch):
+    # Items come back out of order; the client must sort them by index
+    data = [{"index": i, "embedding": vector(text)} for i, text in enumerate(batch)]
+    return web.json_response({"data": data[::-1]})
+
+
+def test_429_waits_for_retry_after_ms():
+    def respond(n, batch):
+        if n == 1:
+            return web.json_response({"error": "slow down"}, status=429, headers={"retry-after-ms": "200"})
+        return ok(batch)
+
+    result, client, elapsed, requests = embed(respond, texts(3))
+    assert result == [vector(t) for t in texts(3)]
+    assert client.stats["rate_limited"] == 1
+    assert client.stats["retries"] == 1
+    assert elapsed >= 0.2
+
+
+def test_5xx_is_retried_with_backoff():
+    def respond(n, batch):
+        return web.Response(status=503, text="unavailable") if n <= 2 else ok(batch)
+
+    result, client, _, requests = embed(respond, texts(3))
+    assert result == [vector(t) for t in texts(3)]
+    assert client.stats["retries"] == 2
+    assert len(requests) == 3
+
+
+def test_order_preserved_across_concurrent_retries():
+    failed = set()
+
+    def respond(n, batch):
+        # Every other batch fails once, so batches complete out of order
+        first = batch[0]
+        if int(first[1:]) % 4 == 0 and first not in failed:
+            failed.add(first)
+            return web.Response(status=502)
+        return ok(batch)
+
+    inputs = texts(40)
+    result, client, _, _ = embed(respond, inputs, request_batch_size=2, max_concurrency=4)
+    assert result == [vector(t) for t in inputs]
+    assert client.stats["retries"] == len(failed) == 10
+
+
+def test_resume_after_interruption():
+    inputs = texts(8)
+
+    def broken(n, batch):
+        if "t5" in batch:
+            return web.json_response({"error": "bad input"}, status=400)
+        return ok(batch)
+
+    error, client, _, _ = embed(broken, inputs, request_batch_size=2)
+    assert isinstance(error, EmbeddingRequestError)
+    assert error.status == 400
+    assert (error.completed, error.total) == (6, 8)
+
+    result, client, _, requests = embed(lambda n, batch: ok(batch), inputs, client=client)
+    assert result == [vector(t) for t in inputs]
+    # Only the batch that failed is sent again
+    assert requests == [["t4", "t5"]]
+    assert client.stats["resumed"] == 6
+    assert not client._resume
+
+
+def test_resume_store_is_bounded(monkeypatch):
+    monkeypatch.setattr(async_embeddings, "RESUME_MAX_VECTORS", 4)
+
+    def broken(n, batch):
+        return web.json_response({"error": "bad"}, status=400) if "t9" in batch else ok(batch)
+
+    error, client, _, _ = embed(broken, texts(10), request_batch_size=2)
+    assert isinstance(error, EmbeddingRequestError)
+    assert len(client._resume) == 4
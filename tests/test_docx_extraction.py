@@ -0,0 +1,45 @@
+"""
+Streaming DOCX extraction around page breaks inside paragraphs.
+"""
+
+import io
+import zipfile
+
+from legal_engine.docx_extraction import iter_docx_pages
+
+_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+RENDERED_BREAK = "<w:r><w:lastRenderedPageBreak/></w:r>"
+PAGE_BREAK = '<w:r><w:br w:type="page"/></w:r>'
+
+
+def docx(body):
+    package = io.BytesIO()
+    with zipfile.ZipFile(package, "w") as z:
+        z.writestr("word/document.xml", f'<?xml version="1.0"?><w:document {_NS}><w:body>{body}</w:body></w:document>')
+    return package.getvalue()
+
+
+def p(*runs):
+    return "<w:p>" + "".join(runs) + "</w:p>"
+
+
+def r(text):
+    return f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def test_rendered_break_inside_paragraph_keeps_words_apart():
+    pages = list(iter_docx_pages(docx(p(r("First para")) + p(r("More"), RENDERED_BREAK, r("still para")) + p(r("Next")))))
+    assert pages == ["First para\nMore still para", "Next"]
+
+
+def test_existing_whitespace_is_not_doubled():
+    assert list(iter_docx_pages(docx(p(r("More "), RENDERED_BREAK, r("still"))))) == ["More still"]
+
+
+def test_explicit_page_break_inside_paragraph_starts_a_new_line():
+    assert list(iter_docx_pages(docx(p(r("A"), PAGE_BREAK, r("B")) + p(r("C"))))) == ["A\nB", "C"]
+
+
+def test_break_inside_table_cell():
+    table = "<w:tbl><w:tr><w:tc>" + p(r("x"), RENDERED_BREAK, r("y")) + "</w:tc></w:tr></w:tbl>"
+    assert list(iter_docx_pages(docx(p(RENDERED_BREAK, r("Top")) + table))) == ["Top\nx y"]
@@ -0,0 +1,41 @@
+"""
+PDF extraction off the main thread, where pages are parsed in an isolated worker.
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from legal_engine.extraction import extract_pdf_pages  # noqa: E402
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+
+def extract_in_thread(path):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["value"] = extract_pdf_pages(path)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def test_indirect_metadata_survives_worker_isolation():
+    # Its /Title is an indirect reference, which used to fail to pickle out of the worker
+    path = DATA / "Working-from-Home-Policy.pdf"
+    pages, metadata = extract_in_thread(path)
+    assert len(pages) == metadata["pages"] > 0
+    assert metadata["title"] == "Working from Home Policy"
+    assert isinstance(metadata["author"], str)
+    assert pages == extract_pdf_pages(path, workers=1)[0]